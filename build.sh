@@ -9,6 +9,21 @@ echo "🏗️  Building DevDB CLI package..."
 echo "🧹 Cleaning previous builds..."
 rm -rf build/ dist/ *.egg-info/
 
+# Shared modules are copied verbatim into the project scripts; keep the copies identical
+echo "🔍 Checking shared modules..."
+for module in devdb_sql.py devdb_trace.py devdb_index.py; do
+    if ! cmp -s "src/$module" "src/templates/advanced/.devdb/scripts/$module"; then
+        echo "❌ src/$module and src/templates/advanced/.devdb/scripts/$module differ"
+        exit 1
+    fi
+done
+
+# devdb init copies the files src/templates/manifest.json lists; it must match the templates
+echo "🔍 Checking template manifest..."
+if ! python3 src/devdb_manifest.py --check; then
+    exit 1
+fi
+
 # Build the package
 echo "📦 Building package..."
 python3 setup.py sdist bdist_wheel
@@ -23,6 +23,7 @@ setup(
             'templates/**/*',
             'templates/**/**/*',
             'templates/**/**/**/*',
+            'sql_export/*.sql',
         ],
     },
     include_package_data=True,
@@ -31,6 +32,8 @@ setup(
     ],
     extras_require={
         'ai': ['google-generativeai>=0.3.0'],
+        'db': ['pymssql>=2.2.0'],
+        'yaml': ['PyYAML>=5.1'],
     },
     entry_points={
         'console_scripts': [
@@ -3,32 +3,102 @@
 DevDB CLI - SQL Server Development Database Management Tool
 """
 
+import time
+
+# Taken before anything else is imported; see --profile-startup
+_CLI_START = time.perf_counter()
+_CLI_START_CPU = time.process_time()
+
+import os
 import sys
 import argparse
-from pathlib import Path
+import builtins
+import importlib
 
 try:
     # Try relative imports first (when installed as package)
-    from .devdb_init import DevDBInit
     from .devdb_utils import print_error, print_success, print_info
     from . import __version__
 except ImportError:
     # Fallback to direct imports (development mode)
-    from devdb_init import DevDBInit
     from devdb_utils import print_error, print_success, print_info
     __version__ = "1.0.0"
 
+_CLI_IMPORTED = time.perf_counter()
+
+class StartupProfiler:
+    """Records how long each newly loaded module took to import (devdb --profile-startup)"""
+
+    def __init__(self):
+        self.entries = []
+        self.depth = 0
+        self.original_import = builtins.__import__
+
+    def __enter__(self):
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self.original_import
+
+    def timed_import(self, name, import_function, *args):
+        loaded = len(sys.modules)
+        # Reserve the entry now so the report lists imports in the order they started
+        index = len(self.entries)
+        self.entries.append(None)
+        start = time.perf_counter()
+        self.depth += 1
+        try:
+            return import_function(*args)
+        finally:
+            self.depth -= 1
+            self.entries[index] = (self.depth, name, time.perf_counter() - start, len(sys.modules) > loaded)
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        display = "." * level + name
+        return self.timed_import(display, self.original_import, name, globals, locals, fromlist, level)
+
+    def report(self, command_seconds, out=sys.stderr):
+        out.write("Startup profile:\n")
+        out.write(f"  {'interpreter startup (CPU time)':<44}{_CLI_START_CPU * 1000:9.1f} ms\n")
+        out.write(f"  {'cli module imports':<44}{(_CLI_IMPORTED - _CLI_START) * 1000:9.1f} ms\n")
+        # Imports of modules that are already loaded are dictionary lookups; only report real loads
+        for depth, name, seconds, loaded in self.entries:
+            if not loaded:
+                continue
+            out.write(f"  {'  ' * depth + name:<44}{seconds * 1000:9.1f} ms\n")
+        out.write(f"  {'command (including the imports above)':<44}{command_seconds * 1000:9.1f} ms\n")
+        out.write(f"  {'total since cli import':<44}{(time.perf_counter() - _CLI_START) * 1000:9.1f} ms\n")
+
+_profiler = None
+
+def load_command(module_name):
+    """Import a command's module when the command runs, so 'devdb version' loads none of them"""
+    if __package__:
+        args = (f".{module_name}", __package__)
+    else:
+        args = (module_name,)
+    if _profiler:
+        return _profiler.timed_import(module_name, importlib.import_module, *args)
+    return importlib.import_module(*args)
+
 def main():
     parser = argparse.ArgumentParser(
         description="DevDB - SQL Server Development Database Management Tool",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Print how long startup and module imports took, to stderr')
+    parser.add_argument('--trace', metavar='FILE', default=None,
+                        help='Record timing spans and counters to FILE: Chrome trace format, '
+                             'or JSON lines if it ends in .jsonl')
+    
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Init command
     init_parser = subparsers.add_parser('init', help='Initialize a new DevDB project')
-    init_parser.add_argument('project_name', nargs='?', default='devdb-project', 
+    init_parser.add_argument('project_name', nargs='?', default=None, 
                            help='Name of the project to create (default: devdb-project)')
     init_parser.add_argument('--path', '-p', default='.', 
                            help='Directory to create the project in (default: current directory)')
@@ -36,6 +106,168 @@ def main():
                            help='Project template to use (default: advanced)')
     init_parser.add_argument('--force', '-f', action='store_true',
                            help='Force creation even if directory exists')
+    init_parser.add_argument('--from-file', default=None, metavar='FILE',
+                           help='Create every project listed in a JSON or YAML file')
+    init_parser.add_argument('--jobs', '-j', type=int, default=None,
+                           help='Projects to create concurrently with --from-file (default: 4)')
+    
+    # Exec command
+    exec_parser = subparsers.add_parser('exec', help='Execute SQL files against the project database')
+    exec_parser.add_argument('files', nargs='+', help='SQL files to execute, in order')
+    exec_parser.add_argument('--database', '-d', default=None,
+                           help='Database to run in (default: master)')
+    exec_parser.add_argument('--continue-on-error', action='store_true',
+                           help='Keep going after a file fails')
+    exec_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Query command
+    query_parser = subparsers.add_parser('query', help='Execute an ad-hoc SQL query')
+    query_parser.add_argument('sql', help='SQL to execute')
+    query_parser.add_argument('--database', '-d', default=None,
+                           help='Database to run in (default: master)')
+    query_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Schema command
+    schema_parser = subparsers.add_parser('schema', help='Deploy schemas/*.sql, in parallel where dependencies allow')
+    schema_parser.add_argument('--jobs', '-j', type=int, default=None,
+                           help='Objects to deploy concurrently (default: DEVDB_POOL_SIZE or 4)')
+    schema_parser.add_argument('--dry-run', action='store_true',
+                           help='Show the deployment waves without connecting')
+    schema_parser.add_argument('--full', action='store_true',
+                           help='Redeploy every object, ignoring the deployment ledger')
+    schema_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Test command
+    test_parser = subparsers.add_parser('test', help='Run tSQLt test classes in parallel')
+    test_parser.add_argument('paths', nargs='*', help='Test files or directories (default: tests/)')
+    test_parser.add_argument('--jobs', '-j', type=int, default=None,
+                           help='Test classes to run concurrently, each in its own database copy '
+                                '(default: DEVDB_POOL_SIZE or 4)')
+    test_parser.add_argument('--junit', default=None,
+                           help='Where to write the JUnit XML report (default: output/test-results.xml)')
+    test_parser.add_argument('--slowest', type=int, default=None,
+                           help='Number of slowest tests to report (default: 10)')
+    test_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Verify command
+    verify_parser = subparsers.add_parser('verify', help='Check that every object in schemas/*.sql exists')
+    verify_parser.add_argument('--manifest', default=None,
+                           help='JSON file listing the expected objects (default: derived from schemas/*.sql)')
+    verify_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Index command
+    index_parser = subparsers.add_parser('index', help='Index the objects, parameters and tables in schemas/*.sql')
+    index_parser.add_argument('--rebuild', action='store_true',
+                           help='Parse every file again instead of only the changed ones')
+    index_parser.add_argument('--json', action='store_true',
+                           help='Print the index entries as JSON')
+    index_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # E2E command
+    e2e_parser = subparsers.add_parser('e2e', help='Run the end-to-end checks against a warm environment')
+    e2e_parser.add_argument('--cold', action='store_true',
+                           help='Recreate the environment with ./devdb.sh down and up first')
+    e2e_parser.add_argument('--expect-fail', action='append', default=[], metavar='FILE',
+                           help='A test file that must fail, by name or glob (repeatable)')
+    e2e_parser.add_argument('--smoke', default=None,
+                           help='SQL script to run and roll back (default: .devdb/e2e_smoke.sql)')
+    e2e_parser.add_argument('--jobs', '-j', type=int, default=None,
+                           help='Concurrent units and test classes (default: DEVDB_POOL_SIZE or 4)')
+    e2e_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Snapshot command
+    snapshot_parser = subparsers.add_parser('snapshot', help='Save and restore snapshots of the project databases')
+    snapshot_subparsers = snapshot_parser.add_subparsers(dest='snapshot_command', help='Snapshot commands',
+                                                      required=True)
+    snapshot_save_parser = snapshot_subparsers.add_parser('save', help='Back up every user database')
+    snapshot_save_parser.add_argument('name', nargs='?', default=None,
+                           help='Snapshot name (default: baseline)')
+    snapshot_save_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    snapshot_restore_parser = snapshot_subparsers.add_parser('restore', help='Restore a snapshot in place')
+    snapshot_restore_parser.add_argument('name', nargs='?', default=None,
+                           help='Snapshot name (default: baseline)')
+    snapshot_restore_parser.add_argument('--if-current', action='store_true',
+                           help='Only restore if schemas/*.sql are unchanged since the snapshot')
+    snapshot_restore_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    snapshot_list_parser = snapshot_subparsers.add_parser('list', help='List saved snapshots')
+    snapshot_list_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Wait command
+    wait_parser = subparsers.add_parser('wait', help='Wait until SQL Server accepts logins')
+    wait_parser.add_argument('--timeout', type=int, default=None,
+                           help='Seconds to wait before giving up (default: 180)')
+    wait_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Image command
+    image_parser = subparsers.add_parser('image', help='Build container images with the schemas already deployed')
+    image_subparsers = image_parser.add_subparsers(dest='image_command', help='Image commands', required=True)
+    image_build_parser = image_subparsers.add_parser('build', help='Provision a container and commit it as an image')
+    image_build_parser.add_argument('--jobs', '-j', type=int, default=None,
+                           help='Objects to deploy concurrently (default: DEVDB_POOL_SIZE or 4)')
+    image_build_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    image_resolve_parser = image_subparsers.add_parser('resolve',
+                           help='Print the provisioned image matching the project, if one exists')
+    image_resolve_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Export command
+    export_parser = subparsers.add_parser('export', help='Export a database as deployable scripts')
+    export_parser.add_argument('database', help='Database to export')
+    export_parser.add_argument('--output', '-o', default=None,
+                           help='Directory to write the scripts to (default: exported_database)')
+    export_parser.add_argument('--server', '-S', default=None, metavar='HOST[,PORT]',
+                           help="Export from another server (default: the project's; needs pymssql or pyodbc)")
+    export_parser.add_argument('--user', '-U', default='sa',
+                           help='Login for --server; the password is read from DEVDB_EXPORT_PASSWORD or prompted for')
+    export_parser.add_argument('--data', action='store_true',
+                           help='Also export table data as INSERT statements')
+    export_parser.add_argument('--jobs', '-j', type=int, default=None,
+                           help='Extractions to run concurrently (default: all of them)')
+    export_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Data command
+    data_parser = subparsers.add_parser('data', help='Export and import table data in bulk')
+    data_subparsers = data_parser.add_subparsers(dest='data_command', help='Data commands', required=True)
+    data_export_parser = data_subparsers.add_parser('export', help='Export tables as bcp native files')
+    data_export_parser.add_argument('database', help='Database to export from')
+    data_export_parser.add_argument('--output', '-o', default=None,
+                           help='Directory to write to (default: output/data/<database>)')
+    data_export_parser.add_argument('--table', '-t', action='append', dest='tables', metavar='SCHEMA.TABLE',
+                           help='Only export matching tables; wildcards allowed, repeatable')
+    data_export_parser.add_argument('--jobs', '-j', type=int, default=None,
+                           help='Tables to export concurrently (default: 4)')
+    data_export_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    data_import_parser = data_subparsers.add_parser('import', help='Load a data export with BULK INSERT')
+    data_import_parser.add_argument('directory', help="Directory written by 'devdb data export'")
+    data_import_parser.add_argument('--database', '-d', default=None,
+                           help='Database to load into (default: the one exported from)')
+    data_import_parser.add_argument('--replace', action='store_true',
+                           help='Empty the tables before loading them')
+    data_import_parser.add_argument('--jobs', '-j', type=int, default=None,
+                           help='Tables to load concurrently (default: 4)')
+    data_import_parser.add_argument('--project-dir', default=None,
+                           help='DevDB project directory (default: nearest parent containing .devdb)')
+    
+    # Cache command
+    cache_parser = subparsers.add_parser('cache', help='Inspect the artifact cache shared by all projects')
+    cache_subparsers = cache_parser.add_subparsers(dest='cache_command', help='Cache commands', required=True)
+    cache_subparsers.add_parser('info', help='Show where the cache is and how much it holds')
+    cache_subparsers.add_parser('verify', help='Rehash every artifact and remove corrupt ones')
+    cache_subparsers.add_parser('clear', help='Delete the cache')
     
     # Version command
     version_parser = subparsers.add_parser('version', help='Show DevDB version')
@@ -46,11 +278,46 @@ def main():
         parser.print_help()
         return 1
     
+    if not args.profile_startup:
+        return run_traced(args, parser)
+    
+    global _profiler
+    start = time.perf_counter()
+    with StartupProfiler() as _profiler:
+        result = run_traced(args, parser)
+    _profiler.report(time.perf_counter() - start)
+    return result
+
+def run_traced(args, parser):
+    """Run the command under a root span when --trace or DEVDB_TRACE asks for a trace"""
+    # The tracer is only loaded when asked for, like the commands themselves
+    if not (args.trace or os.environ.get("DEVDB_TRACE")):
+        return run_command(args, parser)
+    trace = load_command('devdb_trace')
+    trace.start(args.trace, process_name=f"devdb {args.command}")
+    with trace.span(f"devdb {args.command}", argv=" ".join(sys.argv[1:])):
+        return run_command(args, parser)
+
+def run_command(args, parser):
+    """Dispatch a parsed command line to the module implementing the command"""
     try:
         if args.command == 'init':
-            initializer = DevDBInit()
+            init = load_command('devdb_init')
+            if args.from_file:
+                if args.project_name:
+                    parser.error("init: give a project name or --from-file, not both")
+                try:
+                    projects = init.load_project_list(args.from_file, path=args.path, template=args.template,
+                                                      force=args.force)
+                except ValueError as e:
+                    print_error(str(e))
+                    return 1
+                success = init.DevDBInit().create_projects(projects, jobs=args.jobs)
+                return 0 if success else 1
+            
+            initializer = init.DevDBInit()
             success = initializer.create_project(
-                project_name=args.project_name,
+                project_name=args.project_name or 'devdb-project',
                 target_path=args.path,
                 template=args.template,
                 force=args.force,
@@ -58,6 +325,101 @@ def main():
             )
             return 0 if success else 1
             
+        elif args.command == 'exec':
+            success = load_command('devdb_query').execute_files(
+                args.files,
+                database=args.database,
+                project_dir=args.project_dir,
+                continue_on_error=args.continue_on_error
+            )
+            return 0 if success else 1
+            
+        elif args.command == 'query':
+            success = load_command('devdb_query').run_query(args.sql, database=args.database, project_dir=args.project_dir)
+            return 0 if success else 1
+            
+        elif args.command == 'schema':
+            success = load_command('devdb_schema').deploy_schemas(
+                project_dir=args.project_dir, jobs=args.jobs, dry_run=args.dry_run, full=args.full
+            )
+            return 0 if success else 1
+            
+        elif args.command == 'test':
+            success = load_command('devdb_test').run_tests(
+                args.paths, project_dir=args.project_dir, jobs=args.jobs, junit_file=args.junit, slowest=args.slowest
+            )
+            return 0 if success else 1
+            
+        elif args.command == 'verify':
+            success = load_command('devdb_verify').verify_objects(project_dir=args.project_dir, manifest_file=args.manifest)
+            return 0 if success else 1
+            
+        elif args.command == 'index':
+            success = load_command('devdb_schema').index_schemas(
+                project_dir=args.project_dir, rebuild=args.rebuild, as_json=args.json
+            )
+            return 0 if success else 1
+            
+        elif args.command == 'e2e':
+            success = load_command('devdb_e2e').run_e2e(
+                project_dir=args.project_dir, cold=args.cold, expect_fail=args.expect_fail,
+                smoke_file=args.smoke, jobs=args.jobs
+            )
+            return 0 if success else 1
+            
+        elif args.command == 'snapshot':
+            snapshot = load_command('devdb_snapshot')
+            if args.snapshot_command == 'save':
+                success = snapshot.save_snapshot(args.name, project_dir=args.project_dir)
+            elif args.snapshot_command == 'restore':
+                success = snapshot.restore_snapshot(args.name, project_dir=args.project_dir, if_current=args.if_current)
+            else:
+                success = snapshot.list_snapshots(project_dir=args.project_dir)
+            return 0 if success else 1
+            
+        elif args.command == 'wait':
+            success = load_command('devdb_wait').wait_for_server(project_dir=args.project_dir, timeout=args.timeout)
+            return 0 if success else 1
+            
+        elif args.command == 'image':
+            image = load_command('devdb_image')
+            if args.image_command == 'build':
+                success = image.build_image(project_dir=args.project_dir, jobs=args.jobs)
+            else:
+                success = image.resolve_image(project_dir=args.project_dir)
+            return 0 if success else 1
+            
+        elif args.command == 'export':
+            success = load_command('devdb_export').export_database(
+                args.database, output_dir=args.output, project_dir=args.project_dir, server=args.server,
+                user=args.user, jobs=args.jobs, include_data=args.data
+            )
+            return 0 if success else 1
+            
+        elif args.command == 'data':
+            data = load_command('devdb_data')
+            if args.data_command == 'export':
+                success = data.export_data(
+                    args.database, output_dir=args.output, tables=args.tables, project_dir=args.project_dir,
+                    jobs=args.jobs
+                )
+            else:
+                success = data.import_data(
+                    args.directory, database=args.database, project_dir=args.project_dir, jobs=args.jobs,
+                    replace=args.replace
+                )
+            return 0 if success else 1
+            
+        elif args.command == 'cache':
+            cache = load_command('devdb_cache')
+            if args.cache_command == 'info':
+                success = cache.cache_info()
+            elif args.cache_command == 'verify':
+                success = cache.verify_cache()
+            else:
+                success = cache.clear_cache()
+            return 0 if success else 1
+            
         elif args.command == 'version':
             print_info(f"DevDB version {__version__}")
             return 0
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+DevDB Artifact Cache
+A content-addressed store under ~/.cache/devdb shared by every project on the machine. Large files
+that projects never edit (the tSQLt framework and its dacpacs) are kept there once, keyed by SHA-256,
+and projects get reflinks or hardlinks to them instead of copies.
+"""
+
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_utils import print_error, print_success, print_info, print_warning
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_utils import print_error, print_success, print_info, print_warning
+
+# linux/fs.h: clone a whole file, sharing its extents until either copy is written to (btrfs, XFS)
+FICLONE = 0x40049409
+
+class ArtifactError(Exception):
+    """An artifact is missing from the store or does not match its checksum"""
+    pass
+
+def cache_dir():
+    """$DEVDB_CACHE_DIR, else $XDG_CACHE_HOME/devdb, else ~/.cache/devdb"""
+    if os.environ.get("DEVDB_CACHE_DIR"):
+        return Path(os.environ["DEVDB_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "devdb"
+
+# Objects whose content this process has hashed and found intact; each is checked once per process
+_verified = set()
+_verified_lock = threading.Lock()
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ArtifactStore:
+    """Files stored by SHA-256 under <cache>/objects/sha256/<first two hex digits>/<hash>
+
+    Objects are read-only: a hardlinked project file shares its inode with the
+    object, so writing to it in place would change every project linked to it.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else cache_dir()
+        self.objects_dir = self.root / "objects" / "sha256"
+
+    def object_path(self, sha256):
+        return self.objects_dir / sha256[:2] / sha256
+
+    def add(self, src_path, sha256, size=None):
+        """Store src_path under sha256 unless it is there already; the content is verified first
+
+        The checksum is the version pin: a file whose content differs from it
+        is rejected rather than stored under the wrong key.
+        """
+        object_path = self.object_path(sha256)
+        if self._is_intact(object_path, sha256, size):
+            return object_path
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        # Copy to a temporary name and rename, so concurrent inits never see half an object
+        fd, temp_name = tempfile.mkstemp(dir=object_path.parent, prefix=".tmp-")
+        try:
+            digest = hashlib.sha256()
+            with open(src_path, 'rb') as src, os.fdopen(fd, 'wb') as dest:
+                for block in iter(lambda: src.read(1024 * 1024), b""):
+                    digest.update(block)
+                    dest.write(block)
+            if digest.hexdigest() != sha256:
+                raise ArtifactError(f"{src_path} does not match its pinned checksum {sha256[:12]}...")
+            os.chmod(temp_name, 0o444)
+            # A corrupt object is replaced by a new inode; projects linked to the old one keep it
+            os.replace(temp_name, object_path)
+            with _verified_lock:
+                _verified.add(object_path)
+        except BaseException:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+        return object_path
+
+    def _is_intact(self, object_path, sha256, size):
+        """True if the object exists with the expected content; a corrupt one is reported and replaced by add
+
+        Objects are hardlinked into projects, so a file edited in one project
+        (after a chmod) would otherwise spread to every later init.
+        """
+        with _verified_lock:
+            if object_path in _verified:
+                return True
+        try:
+            if size is not None and object_path.stat().st_size != size:
+                intact = False
+            else:
+                intact = _file_sha256(object_path) == sha256
+        except FileNotFoundError:
+            return False
+        if not intact:
+            print_warning(f"Replacing corrupt artifact: {sha256[:12]}...")
+            return False
+        with _verified_lock:
+            _verified.add(object_path)
+        return True
+
+    def link(self, sha256, dest_path):
+        """Materialise an object at dest_path: reflink, else hardlink, else copy; returns which"""
+        object_path = self.object_path(sha256)
+        if not object_path.exists():
+            raise ArtifactError(f"Artifact {sha256[:12]}... is not in {self.root}")
+        if dest_path.exists() or dest_path.is_symlink():
+            dest_path.unlink()
+        if _reflink(object_path, dest_path):
+            return "reflink"
+        try:
+            os.link(object_path, dest_path)
+            return "hardlink"
+        except OSError:
+            # Another filesystem than the cache, or one without hardlinks
+            shutil.copyfile(object_path, dest_path)
+            return "copy"
+
+    def objects(self):
+        if not self.objects_dir.exists():
+            return []
+        return sorted(p for p in self.objects_dir.glob("*/*") if not p.name.startswith(".tmp-"))
+
+def _reflink(src_path, dest_path):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src_path, 'rb') as src, open(dest_path, 'wb') as dest:
+            fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+        # A reflink is a private copy; give it the usual permissions rather than the object's
+        os.chmod(dest_path, 0o644)
+        return True
+    except OSError:
+        if dest_path.exists():
+            dest_path.unlink()
+        return False
+
+def cache_info():
+    """Print where the store is, and how many objects and bytes it holds"""
+    store = ArtifactStore()
+    objects = store.objects()
+    size = sum(p.stat().st_size for p in objects)
+    print_info(f"Artifact cache: {store.root}")
+    print_info(f"{len(objects)} object(s), {size / (1024 * 1024):.1f} MB")
+    return True
+
+def verify_cache():
+    """Rehash every object and remove the ones whose content no longer matches their name"""
+    store = ArtifactStore()
+    corrupt = 0
+    for object_path in store.objects():
+        if _file_sha256(object_path) != object_path.name:
+            print_warning(f"Removing corrupt artifact: {object_path.name}")
+            object_path.unlink()
+            corrupt += 1
+    if corrupt:
+        print_warning(f"{corrupt} corrupt artifact(s) removed; they are stored again on the next 'devdb init'")
+    else:
+        print_success(f"All {len(store.objects())} artifact(s) match their checksums")
+    return True
+
+def clear_cache():
+    """Delete the store; projects keep their hardlinked files, which are simply no longer shared"""
+    store = ArtifactStore()
+    if not store.root.exists():
+        print_info("Artifact cache is empty")
+        return True
+    try:
+        for object_path in store.objects():
+            os.chmod(object_path, 0o644)
+        shutil.rmtree(store.root)
+    except OSError as e:
+        print_error(f"Cannot clear {store.root}: {e}")
+        return False
+    print_success(f"Cleared {store.root}")
+    return True
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+DevDB Table Data
+'devdb data export/import': moves table data in SQL Server's native bulk format. Tables are exported
+with bcp in parallel inside the container and loaded with server-side BULK INSERT, instead of
+generating and replaying an INSERT statement per row.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import fnmatch
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import BCP_PATH, ConnectionSettings, DatabaseError, find_project_root, open_executor, quote_name
+    from .devdb_schema import sql_literal
+    from .devdb_snapshot import BACKUP_DIR
+    from .devdb_utils import print_error, print_success, print_info, print_warning
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import BCP_PATH, ConnectionSettings, DatabaseError, find_project_root, open_executor, quote_name
+    from devdb_schema import sql_literal
+    from devdb_snapshot import BACKUP_DIR
+    from devdb_utils import print_error, print_success, print_info, print_warning
+
+DATA_FORMAT = "bcp-native"
+MANIFEST_FILE = "manifest.json"
+DEFAULT_JOBS = 4
+
+# Rows BULK INSERT commits at a time, so a large table is not loaded in one transaction
+BATCH_ROWS = 100000
+
+# Largest TDS packet bcp may use; fewer round trips for wide rows
+BCP_PACKET_SIZE = 65535
+
+BCP_ROWS_RE = re.compile(r"(\d+) rows copied")
+
+# Framework and bookkeeping tables are recreated by provisioning, not seeded
+EXCLUDED_SCHEMAS = ("tSQLt", "devdb")
+
+TABLE_COLUMNS_SQL = (
+    "SELECT s.name, t.name, c.name FROM sys.tables t "
+    "JOIN sys.schemas s ON s.schema_id = t.schema_id "
+    "JOIN sys.columns c ON c.object_id = t.object_id "
+    "WHERE t.is_ms_shipped = 0 AND s.name NOT IN (" + ", ".join(f"'{name}'" for name in EXCLUDED_SCHEMAS) + ") "
+    "ORDER BY s.name, t.name, c.column_id"
+)
+
+def _table_columns(executor, database):
+    """{(schema, table): [column, ...]} for the user tables of database"""
+    tables = {}
+    for schema, table, column in executor.fetch(TABLE_COLUMNS_SQL, database=database):
+        tables.setdefault((schema, table), []).append(column)
+    return tables
+
+def _docker(arguments, settings=None):
+    command = ["docker"] + arguments
+    env = None
+    if settings:
+        # bcp has no password variable of its own; the shell below passes this one on inside the container
+        env = dict(os.environ, SQLCMDPASSWORD=settings.password)
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, env=env)
+    except FileNotFoundError:
+        raise DatabaseError("Docker is not installed or not in your PATH.")
+    if result.returncode != 0:
+        raise DatabaseError(f"docker {arguments[0]} failed: {(result.stderr or result.stdout).strip()}")
+    return result
+
+def _make_container_dir(settings, directory):
+    """Create a directory on the backups volume that SQL Server can read and write"""
+    _docker(["exec", "-u", "0", settings.container, "sh", "-c",
+             f"mkdir -p '{directory}' && chown mssql '{BACKUP_DIR}' '{directory}'"])
+
+def _remove_container_dir(settings, directory):
+    try:
+        _docker(["exec", "-u", "0", settings.container, "rm", "-rf", directory])
+    except DatabaseError as e:
+        print_warning(f"Could not remove {directory} from {settings.container}: {e}")
+
+def _bcp_out(settings, database, schema, table, data_file):
+    """Export one table in native format; returns the row count bcp reports"""
+    query = f"SELECT * FROM {quote_name(schema)}.{quote_name(table)}"
+    result = _docker([
+        "exec", "-e", "SQLCMDPASSWORD", settings.container, "sh", "-c",
+        f'exec {BCP_PATH} "$0" queryout "$1" -n -d "$2" -S localhost -U "$3" -P "$SQLCMDPASSWORD" -u '
+        f'-a {BCP_PACKET_SIZE}',
+        query, data_file, database, settings.user
+    ], settings)
+    match = BCP_ROWS_RE.search(result.stdout)
+    return int(match.group(1)) if match else 0
+
+def _throughput(rows, size, seconds):
+    seconds = max(seconds, 1e-6)
+    return (f"{rows:,} rows, {size / (1024 * 1024):.1f} MB in {seconds:.1f}s "
+            f"({rows / seconds:,.0f} rows/s, {size / (1024 * 1024) / seconds:.1f} MB/s)")
+
+def export_data(database, output_dir=None, tables=None, project_dir=None, jobs=None):
+    """Export the user tables of database to output_dir as bcp native files, several tables at a time
+
+    tables are optional schema.table patterns (fnmatch, case-insensitive);
+    output_dir defaults to output/data/<database> in the project.
+    """
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        settings = ConnectionSettings.from_project(project_root)
+        with open_executor(project_root, pool_size=1) as executor:
+            columns = _table_columns(executor, database)
+    except DatabaseError as e:
+        print_error(str(e))
+        return False
+
+    if tables:
+        patterns = [pattern.lower() for pattern in tables]
+        columns = {
+            key: value for key, value in columns.items()
+            if any(fnmatch.fnmatchcase(f"{key[0]}.{key[1]}".lower(), pattern) for pattern in patterns)
+        }
+    if not columns:
+        print_warning(f"No tables to export from {database}")
+        return False
+
+    output_dir = Path(output_dir) if output_dir else project_root / "output" / "data" / database
+    container_dir = f"{BACKUP_DIR}/data-{uuid.uuid4().hex[:12]}"
+    keys = sorted(columns)
+    print_info(f"Exporting {len(keys)} table(s) from {database} with {jobs or DEFAULT_JOBS} bcp worker(s)...")
+
+    entries = []
+    failed = 0
+    try:
+        _make_container_dir(settings, container_dir)
+
+        def export_table(number, key):
+            table_start = time.monotonic()
+            rows = _bcp_out(settings, database, key[0], key[1], f"{container_dir}/{number:04d}.bcp")
+            return rows, time.monotonic() - table_start
+
+        with ThreadPoolExecutor(max_workers=jobs or DEFAULT_JOBS) as pool:
+            futures = [(number, key, pool.submit(export_table, number, key)) for number, key in enumerate(keys, 1)]
+            for number, key, future in futures:
+                name = f"{key[0]}.{key[1]}"
+                try:
+                    rows, seconds = future.result()
+                except DatabaseError as e:
+                    print_error(f"{name}: {e}")
+                    failed += 1
+                    continue
+                print_info(f"{name}: {rows:,} rows in {seconds:.1f}s")
+                entries.append({
+                    "schema": key[0], "table": key[1], "file": f"{number:04d}.bcp",
+                    "rows": rows, "columns": columns[key]
+                })
+
+        # One tar stream out of the container for every file
+        output_dir.mkdir(parents=True, exist_ok=True)
+        _docker(["cp", f"{settings.container}:{container_dir}/.", str(output_dir)])
+    except (DatabaseError, OSError) as e:
+        print_error(f"Data export failed: {e}")
+        return False
+    finally:
+        _remove_container_dir(settings, container_dir)
+
+    manifest = {
+        "format": DATA_FORMAT,
+        "database": database,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "tables": entries
+    }
+    try:
+        with open(output_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    except OSError as e:
+        print_error(f"Cannot write {output_dir / MANIFEST_FILE}: {e}")
+        return False
+
+    size = sum((output_dir / entry["file"]).stat().st_size for entry in entries)
+    summary = _throughput(sum(entry["rows"] for entry in entries), size, time.monotonic() - start)
+    if failed:
+        print_warning(f"Exported {len(entries)} of {len(keys)} table(s) to {output_dir}: {summary}")
+        return False
+    print_success(f"Exported {len(entries)} table(s) to {output_dir}: {summary}")
+    return True
+
+def _bulk_insert_sql(schema, table, data_file):
+    # Without CHECK_CONSTRAINTS and FIRE_TRIGGERS tables load in any order, as fast as the server writes;
+    # the constraints are validated once per table after every table is in
+    return (
+        f"BULK INSERT {quote_name(schema)}.{quote_name(table)} FROM {sql_literal(data_file)} "
+        f"WITH (DATAFILETYPE = 'native', TABLOCK, KEEPIDENTITY, KEEPNULLS, BATCHSIZE = {BATCH_ROWS});\n"
+        "SELECT @@ROWCOUNT;"
+    )
+
+def _empty_table_sql(schema, table):
+    name = f"{quote_name(schema)}.{quote_name(table)}"
+    # TRUNCATE is minimally logged but refused for tables a foreign key points at, even a disabled one
+    return (
+        f"IF EXISTS (SELECT 1 FROM sys.foreign_keys WHERE referenced_object_id = OBJECT_ID({sql_literal(name)})) "
+        f"DELETE FROM {name} ELSE TRUNCATE TABLE {name};"
+    )
+
+def _referencing_foreign_keys(executor, database, names):
+    """(table, foreign key) of the enabled foreign keys that point at the named tables from tables outside them"""
+    ids = ", ".join(f"OBJECT_ID({sql_literal(name)})" for name in names)
+    rows = executor.fetch(
+        "SELECT s.name, t.name, fk.name FROM sys.foreign_keys fk "
+        "JOIN sys.tables t ON t.object_id = fk.parent_object_id "
+        "JOIN sys.schemas s ON s.schema_id = t.schema_id "
+        f"WHERE fk.is_disabled = 0 AND fk.referenced_object_id IN ({ids}) AND fk.parent_object_id NOT IN ({ids}) "
+        "ORDER BY s.name, t.name, fk.name",
+        database=database
+    )
+    return [(f"{quote_name(schema)}.{quote_name(table)}", quote_name(key)) for schema, table, key in rows]
+
+def _check_constraints(executor, database, names, foreign_keys=()):
+    """Re-enable and validate every constraint of the named tables; returns (table, error) per violation
+
+    WITH CHECK re-checks the existing rows, so foreign keys and check
+    constraints end up trusted again; a table whose rows violate one keeps
+    its constraints enabled for new rows but untrusted. foreign_keys are
+    (table, foreign key) pairs of other tables, re-enabled the same way.
+    """
+    targets = [(name, "ALL", name) for name in names]
+    targets += [(table, key, f"{table} ({key})") for table, key in foreign_keys]
+    violations = []
+    for table, constraint, label in targets:
+        try:
+            executor.run_script(
+                f"ALTER TABLE {table} WITH CHECK CHECK CONSTRAINT {constraint};\n", database=database, out=None
+            )
+        except DatabaseError as e:
+            violations.append((label, e))
+            try:
+                executor.run_script(f"ALTER TABLE {table} CHECK CONSTRAINT {constraint};\n", database=database, out=None)
+            except DatabaseError:
+                pass
+    return violations
+
+def import_data(data_dir, database=None, project_dir=None, jobs=None, replace=False):
+    """Load a 'devdb data export' directory with BULK INSERT, several tables at a time
+
+    database defaults to the one the data was exported from. With replace,
+    the tables are emptied first, with their constraints, and the foreign
+    keys other tables hold on them, disabled meanwhile. Constraints are validated against the loaded rows afterwards, and a
+    violation fails the import.
+    """
+    start = time.monotonic()
+    data_dir = Path(data_dir)
+    try:
+        with open(data_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print_error(f"Not a devdb data export: {data_dir} ({e})")
+        return False
+    if manifest.get("format") != DATA_FORMAT:
+        print_error(f"Unsupported data format in {data_dir}: {manifest.get('format')}")
+        return False
+    database = database or manifest["database"]
+
+    try:
+        project_root = find_project_root(project_dir)
+        settings = ConnectionSettings.from_project(project_root)
+        executor = open_executor(project_root, pool_size=jobs or DEFAULT_JOBS)
+    except DatabaseError as e:
+        print_error(str(e))
+        return False
+
+    container_dir = f"{BACKUP_DIR}/data-{uuid.uuid4().hex[:12]}"
+    with executor:
+        try:
+            columns = _table_columns(executor, database)
+        except DatabaseError as e:
+            print_error(str(e))
+            return False
+
+        entries = []
+        for entry in manifest["tables"]:
+            name = f"{entry['schema']}.{entry['table']}"
+            target = columns.get((entry["schema"], entry["table"]))
+            if target is None:
+                print_warning(f"Skipping {name}: no such table in {database}")
+            elif [c.lower() for c in target] != [c.lower() for c in entry["columns"]]:
+                # Native files carry no column names; a different layout would load into the wrong columns
+                print_warning(f"Skipping {name}: its columns differ from the exported ones")
+            else:
+                entries.append(entry)
+        if not entries:
+            print_warning("No tables to import")
+            return False
+
+        names = [f"{quote_name(e['schema'])}.{quote_name(e['table'])}" for e in entries]
+        loaded = {}
+        violations = []
+        foreign_keys = []
+        changed = False
+        try:
+            if replace:
+                # Rows of tables outside the import may point at the rows about to be deleted
+                foreign_keys = _referencing_foreign_keys(executor, database, names)
+            _make_container_dir(settings, container_dir)
+            print_info(f"Copying {data_dir} into {settings.container}...")
+            _docker(["cp", f"{data_dir}/.", f"{settings.container}:{container_dir}"])
+
+            changed = True
+            if replace:
+                print_info(f"Emptying {len(entries)} table(s)...")
+                for table, key in foreign_keys:
+                    print_warning(f"Disabling {key} on {table}, which is not imported, while the tables are replaced")
+                executor.run_script(
+                    "".join(f"ALTER TABLE {name} NOCHECK CONSTRAINT ALL;\n" for name in names) +
+                    "".join(f"ALTER TABLE {table} NOCHECK CONSTRAINT {key};\n" for table, key in foreign_keys) +
+                    "".join(_empty_table_sql(e["schema"], e["table"]) + "\n" for e in entries),
+                    database=database, out=None
+                )
+
+            def load_table(entry):
+                table_start = time.monotonic()
+                rows = executor.fetch(
+                    _bulk_insert_sql(entry["schema"], entry["table"], f"{container_dir}/{entry['file']}"),
+                    database=database
+                )
+                return int(rows[-1][0]) if rows else 0, time.monotonic() - table_start
+
+            print_info(f"Loading {len(entries)} table(s) into {database} over {executor.description}...")
+            with ThreadPoolExecutor(max_workers=executor.size) as pool:
+                # Biggest tables first, so one large table does not start last and hold up the end
+                ordered = sorted(entries, key=lambda e: e["rows"], reverse=True)
+                futures = [(entry, pool.submit(load_table, entry)) for entry in ordered if entry["rows"]]
+                for entry, future in futures:
+                    name = f"{entry['schema']}.{entry['table']}"
+                    try:
+                        rows, seconds = future.result()
+                    except DatabaseError as e:
+                        print_error(f"{name}: {e}")
+                        continue
+                    loaded[name] = rows
+                    print_info(f"{name}: {rows:,} rows in {seconds:.1f}s")
+        except DatabaseError as e:
+            print_error(f"Data import failed: {e}")
+            return False
+        finally:
+            if changed:
+                print_info(f"Checking the constraints of {len(names)} table(s)...")
+                violations = _check_constraints(executor, database, names, foreign_keys)
+                for name, e in violations:
+                    print_error(f"{name}: rows violate its constraints - {e}")
+            _remove_container_dir(settings, container_dir)
+
+    expected = [e for e in entries if e["rows"]]
+    size = sum((data_dir / e["file"]).stat().st_size for e in expected)
+    summary = _throughput(sum(loaded.values()), size, time.monotonic() - start)
+    if violations:
+        print_error(f"Data import failed: {len(violations)} table(s) hold rows that violate their constraints")
+        return False
+    if len(loaded) < len(expected):
+        print_warning(f"Imported {len(loaded)} of {len(expected)} table(s) into {database}: {summary}")
+        return False
+    print_success(f"Imported {len(loaded)} table(s) into {database}: {summary}")
+    return True
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+DevDB Database Access
+Runs SQL against a project's SQL Server container over pooled driver connections,
+falling back to sqlcmd inside the container when no driver is installed
+"""
+
+import os
+import re
+import sys
+import importlib
+import threading
+import subprocess
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_sql import split_batches
+    from . import devdb_trace as trace
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_sql import split_batches
+    import devdb_trace as trace
+
+CONTAINER_NAME = "devdb-sqlserver"
+SQLCMD_PATH = "/opt/mssql-tools18/bin/sqlcmd"
+BCP_PATH = "/opt/mssql-tools18/bin/bcp"
+DEFAULT_DATABASE = "master"
+DEFAULT_POOL_SIZE = 4
+LOGIN_TIMEOUT = 15
+
+# Rows fetched at a time when streaming result sets to a file
+STREAM_ROWS = 500
+
+# Drivers in order of preference; install one with: pip install devdb-cli[db]
+DRIVERS = ("pymssql", "pyodbc")
+
+# Container mount points from .devdb/docker-compose.yml and the project paths behind them
+CONTAINER_MOUNTS = {
+    "/docker-entrypoint-initdb.d": "schemas",
+    "/host_tests": "tests",
+    "/tsqlt": ".devdb/tSQLt",
+}
+
+# sqlcmd ":r <file>" include directive, alone on its line
+INCLUDE_RE = re.compile(r"^[ \t]*:r[ \t]+(\"[^\"]+\"|\S+)[ \t]*\r?$", re.IGNORECASE | re.MULTILINE)
+MAX_INCLUDE_DEPTH = 16
+
+# Repeat count of a "GO <n>" separator
+GO_COUNT_RE = re.compile(r"GO[ \t]+(\d+)", re.IGNORECASE)
+
+class DatabaseError(Exception):
+    """A SQL batch failed, or the database could not be reached"""
+
+def find_project_root(project_dir=None):
+    """Return the DevDB project directory: project_dir, or the nearest parent of cwd containing .devdb/"""
+    if project_dir:
+        root = Path(project_dir).resolve()
+        if not (root / ".devdb").is_dir():
+            raise DatabaseError(f"Not a DevDB project (no .devdb directory): {root}")
+        return root
+
+    current = Path.cwd().resolve()
+    for candidate in [current] + list(current.parents):
+        if (candidate / ".devdb" / "docker-compose.yml").exists():
+            return candidate
+    raise DatabaseError("Not inside a DevDB project (no .devdb/docker-compose.yml found). Use --project-dir.")
+
+def load_env(env_file):
+    """Parse the KEY=VALUE lines of a .env file"""
+    values = {}
+    with open(env_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+                value = value[1:-1]
+            values[key.strip()] = value
+    return values
+
+def quote_name(name):
+    """Quote an identifier for T-SQL"""
+    return "[" + name.replace("]", "]]") + "]"
+
+class ConnectionSettings:
+    """Where and how to log in to a project's SQL Server"""
+
+    def __init__(self, project_root, host, port, user, password, database=DEFAULT_DATABASE, container=CONTAINER_NAME):
+        self.project_root = Path(project_root)
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.container = container
+
+    @classmethod
+    def from_project(cls, project_root):
+        """Read connection settings from the project's .devdb/.env"""
+        env_file = Path(project_root) / ".devdb" / ".env"
+        if not env_file.exists():
+            raise DatabaseError(f".env file not found at {env_file}. Please copy .env.example to .env and configure it.")
+        env = load_env(env_file)
+        if not env.get("SA_PASSWORD"):
+            raise DatabaseError(f"SA_PASSWORD is not set in {env_file}")
+        return cls(
+            project_root,
+            host=os.getenv("DB_HOST", env.get("DB_HOST", "localhost")),
+            port=int(os.getenv("DB_PORT", env.get("DB_PORT", "1433"))),
+            user="sa",
+            password=env["SA_PASSWORD"],
+            container=os.getenv("DEVDB_CONTAINER", CONTAINER_NAME)
+        )
+
+def expand_includes(sql_content, project_root, depth=0):
+    """Inline sqlcmd ':r' includes, mapping container mount points to project paths"""
+    if depth > MAX_INCLUDE_DEPTH:
+        raise DatabaseError(f":r includes nested more than {MAX_INCLUDE_DEPTH} levels deep")
+
+    def include(match):
+        path = match.group(1).strip('"')
+        for mount, local in CONTAINER_MOUNTS.items():
+            if path == mount or path.startswith(mount + "/"):
+                path = str(Path(project_root) / local) + path[len(mount):]
+                break
+        full_path = Path(project_root) / path
+        try:
+            content = full_path.read_text(encoding='utf-8-sig')
+        except OSError as e:
+            raise DatabaseError(f"Cannot include {match.group(1)}: {e}")
+        content = expand_includes(content, project_root, depth + 1)
+        return content if content.endswith("\n") else content + "\n"
+
+    if ":r" not in sql_content and ":R" not in sql_content:
+        return sql_content
+    return INCLUDE_RE.sub(include, sql_content)
+
+def iter_batches(sql_content):
+    """Yield (batch, repeat count, first line number) for each non-empty batch of a script"""
+    line = 1
+    for batch, separator in split_batches(sql_content):
+        count_match = GO_COUNT_RE.search(separator)
+        if batch.strip():
+            yield batch, int(count_match.group(1)) if count_match else 1, line
+        line += batch.count("\n") + separator.count("\n")
+
+def format_result_set(columns, rows):
+    """Render a result set as a plain text table, the way sqlcmd does"""
+    cells = [["NULL" if value is None else str(value) for value in row] for row in rows]
+    widths = [len(str(column)) for column in columns]
+    for row in cells:
+        widths = [max(width, len(value)) for width, value in zip(widths, row)]
+
+    lines = [
+        " ".join(str(column).ljust(width) for column, width in zip(columns, widths)).rstrip(),
+        " ".join("-" * width for width in widths)
+    ]
+    for row in cells:
+        lines.append(" ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+    lines.append("")
+    lines.append(f"({len(rows)} row{'' if len(rows) == 1 else 's'} affected)")
+    return "\n".join(lines)
+
+def format_stream_row(row):
+    """One row as 'sqlcmd -h -1 -W' prints it: values separated by spaces, NULL for nulls"""
+    return " ".join("NULL" if value is None else str(value) for value in row) + "\n"
+
+def load_driver():
+    """Return (name, module) of the first usable SQL Server driver, or (None, None)"""
+    for name in DRIVERS:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        if name == "pyodbc" and not _odbc_driver_name(module):
+            continue
+        return name, module
+    return None, None
+
+def _odbc_driver_name(pyodbc):
+    """Newest installed Microsoft ODBC driver for SQL Server, if any"""
+    drivers = [name for name in pyodbc.drivers() if "SQL Server" in name]
+    return sorted(drivers, key=lambda name: ("ODBC Driver" in name, name))[-1] if drivers else None
+
+class _Connection:
+    """A driver connection together with the informational messages (PRINT output) it received"""
+
+    def __init__(self, driver_name, module, settings):
+        self.driver_name = driver_name
+        self.messages = []
+        if driver_name == "pymssql":
+            self.raw = module.connect(
+                server=settings.host, port=settings.port, user=settings.user, password=settings.password,
+                database=settings.database, login_timeout=LOGIN_TIMEOUT, autocommit=True
+            )
+            # Older pymssql releases cannot surface PRINT output
+            set_msghandler = getattr(getattr(self.raw, "_conn", None), "set_msghandler", None)
+            if set_msghandler:
+                set_msghandler(self._on_message)
+        else:
+            password = settings.password.replace("}", "}}")
+            self.raw = module.connect(
+                f"DRIVER={{{_odbc_driver_name(module)}}};SERVER={settings.host},{settings.port};"
+                f"DATABASE={settings.database};UID={settings.user};PWD={{{password}}};"
+                "Encrypt=yes;TrustServerCertificate=yes",
+                autocommit=True, timeout=LOGIN_TIMEOUT
+            )
+
+    def _on_message(self, msgstate, severity, srvname, procname, line, msgtext):
+        if severity <= 10:
+            self.messages.append(msgtext.decode('utf-8', 'replace') if isinstance(msgtext, bytes) else msgtext)
+
+    def take_messages(self, cursor):
+        """Return and clear the messages received since the last call"""
+        messages, self.messages = self.messages, []
+        for _, text in getattr(cursor, "messages", None) or []:
+            # pyodbc prefixes messages with the driver and server names
+            messages.append(text.rsplit("]", 1)[-1])
+        return messages
+
+    def is_alive(self):
+        """Roll back anything a failed batch left open and check the session still works"""
+        try:
+            cursor = self.raw.cursor()
+            cursor.execute("IF @@TRANCOUNT > 0 ROLLBACK; SELECT 1")
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.raw.close()
+        except Exception:
+            pass
+
+class PooledExecutor:
+    """Runs SQL over a pool of persistent driver connections
+
+    Connections are opened lazily up to the pool size and reused for every
+    batch, so a script or a run of queries pays for one login instead of a
+    process, a container exec, a TLS handshake and a login per statement.
+    """
+
+    def __init__(self, settings, driver_name, module, size=DEFAULT_POOL_SIZE):
+        self.settings = settings
+        self.driver_name = driver_name
+        self.module = module
+        self.size = size
+        # Idle connections, most recently used last; guarded, with opened, by available
+        self.idle = []
+        self.opened = 0
+        # Notified whenever a connection goes back to idle or a slot to open one frees up
+        self.available = threading.Condition()
+
+    @property
+    def description(self):
+        return f"{self.driver_name} connection pool (up to {self.size} connections)"
+
+    def _acquire(self):
+        """Take an idle connection, open one while under the pool size, or wait for either"""
+        with self.available:
+            while not self.idle and self.opened >= self.size:
+                self.available.wait()
+            if self.idle:
+                return self.idle.pop()
+            self.opened += 1
+        try:
+            with trace.span("db.connect", driver=self.driver_name, host=self.settings.host):
+                return _Connection(self.driver_name, self.module, self.settings)
+        except Exception as e:
+            self._forget()
+            raise DatabaseError(f"Cannot connect to SQL Server at {self.settings.host}:{self.settings.port}: {e}")
+
+    def _forget(self):
+        """Give up the slot of a connection that is gone, so a waiting caller can open another"""
+        with self.available:
+            self.opened -= 1
+            self.available.notify()
+
+    def _release(self, connection, healthy=True):
+        if healthy or connection.is_alive():
+            with self.available:
+                self.idle.append(connection)
+                self.available.notify()
+        else:
+            connection.close()
+            self._forget()
+
+    @contextmanager
+    def connection(self, database=None):
+        """Check out a connection switched to database; it returns to the pool afterwards"""
+        connection = self._acquire()
+        healthy = False
+        try:
+            cursor = connection.raw.cursor()
+            cursor.execute(f"USE {quote_name(database or self.settings.database)}")
+            connection.take_messages(cursor)
+            yield connection
+            healthy = True
+        finally:
+            self._release(connection, healthy)
+
+    def _run_batch(self, connection, batch, out):
+        cursor = connection.raw.cursor()
+        cursor.execute(batch)
+        trace.count("sql.batches")
+        rows = []
+        while True:
+            for message in connection.take_messages(cursor):
+                if out:
+                    out.write(message + "\n")
+            if cursor.description:
+                result = cursor.fetchall()
+                rows.extend(result)
+                if out:
+                    out.write(format_result_set([column[0] for column in cursor.description], result) + "\n")
+            elif cursor.rowcount > 0:
+                trace.count("sql.rows_affected", cursor.rowcount)
+            if not cursor.nextset():
+                break
+        for message in connection.take_messages(cursor):
+            if out:
+                out.write(message + "\n")
+        if rows:
+            trace.count("sql.rows", len(rows))
+        return rows
+
+    def _stream_batch(self, connection, batch, out, on_rows):
+        cursor = connection.raw.cursor()
+        cursor.execute(batch)
+        count = 0
+        while True:
+            for message in connection.take_messages(cursor):
+                out.write(message + "\n")
+            if cursor.description:
+                while True:
+                    rows = cursor.fetchmany(STREAM_ROWS)
+                    if not rows:
+                        break
+                    out.write("".join(format_stream_row(row) for row in rows))
+                    count += len(rows)
+                    if on_rows:
+                        on_rows(len(rows))
+            if not cursor.nextset():
+                break
+        for message in connection.take_messages(cursor):
+            out.write(message + "\n")
+        trace.count("sql.batches")
+        trace.count("sql.rows", count)
+        return count
+
+    def stream_script(self, sql_content, out, database=None, on_rows=None):
+        """Run a script, writing PRINT output and rows to out as they arrive; returns the row count
+
+        Rows are written like 'sqlcmd -h -1 -W' writes them: no headers, one
+        line per row. on_rows is called with the size of each chunk written.
+        """
+        count = 0
+        with self.connection(database) as connection:
+            for batch, repeat, line in iter_batches(sql_content):
+                for _ in range(repeat):
+                    try:
+                        count += self._stream_batch(connection, batch, out, on_rows)
+                    except self.module.Error as e:
+                        raise DatabaseError(f"Batch starting at line {line} failed: {e}")
+        return count
+
+    def run_script(self, sql_content, database=None, out=sys.stdout):
+        """Run a script batch by batch on one connection; stops at the first failing batch"""
+        with self.connection(database) as connection:
+            for batch, count, line in iter_batches(sql_content):
+                for _ in range(count):
+                    try:
+                        self._run_batch(connection, batch, out)
+                    except self.module.Error as e:
+                        raise DatabaseError(f"Batch starting at line {line} failed: {e}")
+
+    def fetch(self, sql, database=None):
+        """Run a single batch and return the rows of its result sets, values as text"""
+        with self.connection(database) as connection:
+            try:
+                rows = self._run_batch(connection, sql, None)
+            except self.module.Error as e:
+                raise DatabaseError(str(e))
+        return [tuple(None if value is None else str(value) for value in row) for row in rows]
+
+    def close(self):
+        """Close every idle connection"""
+        with self.available:
+            idle, self.idle = self.idle, []
+            self.opened -= len(idle)
+            self.available.notify_all()
+        for connection in idle:
+            connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SqlcmdExecutor:
+    """Runs SQL through sqlcmd inside the container; used when no Python driver is installed"""
+
+    def __init__(self, settings, size=DEFAULT_POOL_SIZE):
+        self.settings = settings
+        self.size = size
+
+    @property
+    def description(self):
+        return f"sqlcmd in the {self.settings.container} container (install pymssql or pyodbc for pooled connections)"
+
+    def _run(self, database, arguments, sql_content):
+        command = [
+            "docker", "exec", "-i", "-e", "SQLCMDPASSWORD", self.settings.container, SQLCMD_PATH,
+            "-S", "localhost", "-U", self.settings.user, "-d", database or self.settings.database,
+            "-C", "-b"
+        ] + arguments
+        env = dict(os.environ, SQLCMDPASSWORD=self.settings.password)
+        try:
+            # Each call is a container exec and a login; the span shows what that costs
+            with trace.span("sqlcmd", container=self.settings.container, bytes_sent=len(sql_content)):
+                return subprocess.run(command, input=sql_content, capture_output=True, text=True, env=env)
+        except FileNotFoundError:
+            raise DatabaseError("Docker is not installed or not in your PATH.")
+
+    def run_script(self, sql_content, database=None, out=sys.stdout):
+        """Run a script with sqlcmd; stops at the first failing batch"""
+        result = self._run(database, ["-i", "/dev/stdin"], sql_content)
+        if out:
+            out.write(result.stdout)
+        if result.returncode != 0:
+            raise DatabaseError((result.stderr or result.stdout).strip() or f"sqlcmd exited with {result.returncode}")
+
+    def stream_script(self, sql_content, out, database=None, on_rows=None):
+        """Run a script with 'sqlcmd -h -1 -W', copying its output to out line by line; returns the line count"""
+        command = [
+            "docker", "exec", "-i", "-e", "SQLCMDPASSWORD", self.settings.container, SQLCMD_PATH,
+            "-S", "localhost", "-U", self.settings.user, "-d", database or self.settings.database,
+            "-C", "-b", "-h", "-1", "-W", "-i", "/dev/stdin"
+        ]
+        env = dict(os.environ, SQLCMDPASSWORD=self.settings.password)
+        count = 0
+        try:
+            process = subprocess.Popen(
+                command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, errors='replace', env=env
+            )
+        except FileNotFoundError:
+            raise DatabaseError("Docker is not installed or not in your PATH.")
+        # The script is small; write it all before reading, then follow the output
+        process.stdin.write(sql_content)
+        process.stdin.close()
+        for line in process.stdout:
+            out.write(line)
+            count += 1
+            if on_rows:
+                on_rows(1)
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise DatabaseError(stderr.strip() or f"sqlcmd exited with {process.returncode}")
+        return count
+
+    def fetch(self, sql, database=None):
+        """Run a single batch and return the rows of its result sets, values as text"""
+        result = self._run(database, ["-h", "-1", "-W", "-s", "\t", "-i", "/dev/stdin"], "SET NOCOUNT ON;\n" + sql)
+        if result.returncode != 0:
+            raise DatabaseError((result.stderr or result.stdout).strip() or f"sqlcmd exited with {result.returncode}")
+        return [
+            tuple(None if value == "NULL" else value for value in line.split("\t"))
+            for line in result.stdout.splitlines() if line.strip()
+        ]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_executor(project_dir=None, pool_size=None, settings=None):
+    """Open an executor for a project: pooled driver connections, or sqlcmd when no driver is installed
+
+    settings, when given, replace the project's connection settings.
+    """
+    settings = settings or ConnectionSettings.from_project(find_project_root(project_dir))
+    size = pool_size or int(os.getenv("DEVDB_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+    driver_name, module = load_driver()
+    if driver_name:
+        return PooledExecutor(settings, driver_name, module, size)
+    return SqlcmdExecutor(settings, size)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+DevDB End-to-End Harness
+'devdb e2e': brings the project's container up (reusing it when it is already running), deploys the
+schemas, then checks every deployed object with one catalog query, runs the smoke script and the
+tSQLt tests concurrently, and reports how long each stage took against the previous run
+"""
+
+import json
+import time
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import ConnectionSettings, DatabaseError, find_project_root, open_executor
+    from .devdb_schema import deploy_schemas
+    from .devdb_test import execute_tests
+    from .devdb_verify import describe, find_missing, load_expected
+    from .devdb_wait import wait_for_server
+    from .devdb_utils import print_error, print_success, print_info, print_warning, print_header
+    from . import devdb_trace as trace
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import ConnectionSettings, DatabaseError, find_project_root, open_executor
+    from devdb_schema import deploy_schemas
+    from devdb_test import execute_tests
+    from devdb_verify import describe, find_missing, load_expected
+    from devdb_wait import wait_for_server
+    from devdb_utils import print_error, print_success, print_info, print_warning, print_header
+    import devdb_trace as trace
+
+DEFAULT_SMOKE_FILE = ".devdb/e2e_smoke.sql"
+
+# Stage durations from the previous run, to show which stage got slower
+TIMINGS_FILE = ".devdb/cache/e2e-timings.json"
+
+# The smoke script runs in a transaction that is always rolled back, so it leaves no data behind
+SMOKE_BEGIN = "BEGIN TRANSACTION;\nGO\n"
+SMOKE_END = "\nGO\nIF @@TRANCOUNT > 0 ROLLBACK;\n"
+
+class StageFailed(Exception):
+    """A stage ran but its checks did not pass"""
+    pass
+
+class Stage:
+    """The outcome and duration of one harness stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = None
+        self.error = None
+        self.detail = ""
+        self.skipped = False
+
+    @property
+    def passed(self):
+        return self.seconds is not None and self.error is None
+
+def _run_stage(stage, func, *args):
+    start = time.monotonic()
+    try:
+        with trace.span(f"e2e.{stage.name}"):
+            stage.detail = func(*args) or ""
+    except (StageFailed, DatabaseError, OSError) as e:
+        stage.error = str(e)
+    stage.seconds = time.monotonic() - start
+    if stage.error:
+        print_error(f"{stage.name} failed after {stage.seconds:.1f}s: {stage.error}")
+    else:
+        print_success(f"{stage.name} passed in {stage.seconds:.1f}s" + (f" - {stage.detail}" if stage.detail else ""))
+    return stage
+
+def _container_running(container):
+    try:
+        result = subprocess.run(
+            ["docker", "inspect", "--format", "{{.State.Running}}", container], capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        raise StageFailed("Docker is not installed or not in your PATH.")
+    return result.returncode == 0 and result.stdout.strip() == "true"
+
+def _devdb_sh(project_root, command):
+    script = project_root / "devdb.sh"
+    if not script.exists():
+        raise StageFailed(f"devdb.sh not found at {script}")
+    if subprocess.run([str(script), command], cwd=project_root).returncode != 0:
+        raise StageFailed(f"./devdb.sh {command} failed")
+
+def environment_stage(project_root, cold):
+    """Reuse the running container; start it if it is down, or recreate it with cold"""
+    container = ConnectionSettings.from_project(project_root).container
+    if cold:
+        print_info("Cold start: recreating the environment...")
+        _devdb_sh(project_root, "down")
+        _devdb_sh(project_root, "up")
+        reused = False
+    else:
+        reused = _container_running(container)
+        if not reused:
+            print_info(f"{container} is not running; starting it...")
+            _devdb_sh(project_root, "up")
+    if not wait_for_server(project_root):
+        raise StageFailed("SQL Server is not accepting logins")
+    return f"reused {container}" if reused else f"started {container}"
+
+def schema_stage(project_root, jobs):
+    if not deploy_schemas(project_root, jobs):
+        raise StageFailed("schema deployment failed")
+
+def catalog_stage(project_root, executor):
+    objects = load_expected(project_root)
+    missing = find_missing(executor, objects)
+    if missing:
+        for entry in missing:
+            print_error(f"Missing {describe(entry)}")
+        raise StageFailed(f"{len(missing)} of {len(objects)} object(s) missing")
+    return f"{len(objects)} object(s) present"
+
+def smoke_stage(smoke_path, executor):
+    sql_content = smoke_path.read_text(encoding='utf-8-sig')
+    executor.run_script(SMOKE_BEGIN + sql_content + SMOKE_END, out=None)
+    return smoke_path.name
+
+def _matches(test_file, patterns):
+    return any(test_file.name == pattern or test_file.match(pattern) for pattern in patterns)
+
+def tests_stage(project_root, jobs, expect_fail):
+    """Run every test file once; the ones in expect_fail must fail, the others must pass"""
+    classes, cases = execute_tests(project_root, jobs=jobs)
+    if not classes:
+        return "no test classes found"
+    files = {test_class.name: test_class.file_path for test_class in classes}
+    failed_files = {files[case.class_name] for case in cases if case.failed and case.class_name in files}
+
+    problems = []
+    for test_file in sorted(set(files.values())):
+        expected = _matches(test_file, expect_fail)
+        if expected and test_file not in failed_files:
+            problems.append(f"{test_file.name} should have failed but passed")
+        elif expected:
+            print_success(f"{test_file.name} failed as expected")
+        elif test_file in failed_files:
+            problems.append(f"{test_file.name} failed")
+    for case in cases:
+        if case.failed and not _matches(files.get(case.class_name, Path(case.class_name)), expect_fail):
+            print_error(f"{case.result}: [{case.class_name}].[{case.name}] - {case.message}")
+    if problems:
+        raise StageFailed("; ".join(problems))
+    return f"{len(cases)} test(s) in {len(set(files.values()))} file(s)"
+
+def load_timings(project_root):
+    try:
+        with open(Path(project_root) / TIMINGS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_timings(project_root, stages):
+    path = Path(project_root) / TIMINGS_FILE
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({stage.name: round(stage.seconds, 3) for stage in stages if stage.passed}, f, indent=1)
+    except OSError as e:
+        print_warning(f"Cannot save stage timings: {e}")
+
+def report(stages, previous, seconds):
+    print_header("E2E Stage Timings")
+    for stage in stages:
+        if stage.seconds is None:
+            print(f"  {'skipped' if stage.skipped else 'not run':>8}  {stage.name}")
+            continue
+        change = ""
+        if stage.name in previous:
+            change = f"  ({stage.seconds - previous[stage.name]:+.1f}s)"
+        status = "ok" if stage.passed else "FAILED"
+        print(f"  {stage.seconds:7.1f}s  {stage.name:<12} {status}{change}")
+    print(f"  {seconds:7.1f}s  total")
+
+def run_e2e(project_dir=None, cold=False, expect_fail=None, smoke_file=None, jobs=None):
+    """Run the end-to-end stages against the project; True if all of them pass
+
+    The environment and schema stages run in order. The catalog check only
+    reads the catalog, so it runs alongside the smoke script; the tests run
+    last, on their own, since the smoke script's open transaction would
+    block tSQLt.FakeTable on the same tables and make both timings vary.
+    """
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+    except DatabaseError as e:
+        print_error(str(e))
+        return False
+    smoke_path = Path(smoke_file) if smoke_file else project_root / DEFAULT_SMOKE_FILE
+    previous = load_timings(project_root)
+
+    stages = [Stage("environment"), Stage("schema"), Stage("catalog"), Stage("smoke"), Stage("tests")]
+    environment, schema, catalog, smoke, tests = stages
+
+    print_header("E2E: environment")
+    if _run_stage(environment, environment_stage, project_root, cold).passed:
+        print_header("E2E: schema")
+        _run_stage(schema, schema_stage, project_root, jobs)
+
+    if schema.passed:
+        print_header("E2E: catalog and smoke")
+        try:
+            executor = open_executor(project_root, pool_size=2)
+        except DatabaseError as e:
+            print_error(str(e))
+            executor = None
+        if executor:
+            with executor:
+                with ThreadPoolExecutor(max_workers=2) as pool:
+                    futures = [pool.submit(_run_stage, catalog, catalog_stage, project_root, executor)]
+                    if smoke_path.exists():
+                        futures.append(pool.submit(_run_stage, smoke, smoke_stage, smoke_path, executor))
+                    else:
+                        print_warning(f"No smoke script at {smoke_path}; skipping the smoke stage")
+                        smoke.skipped = True
+                    for future in futures:
+                        future.result()
+                print_header("E2E: tests")
+                _run_stage(tests, tests_stage, project_root, jobs, expect_fail or [])
+
+    seconds = time.monotonic() - start
+    report(stages, previous, seconds)
+    save_timings(project_root, stages)
+
+    failed = [stage.name for stage in stages if not (stage.passed or stage.skipped)]
+    if failed:
+        print_error(f"E2E failed or did not run: {', '.join(failed)}")
+        return False
+    print_success(f"E2E passed in {seconds:.1f}s")
+    return True
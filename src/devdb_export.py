@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+DevDB Database Export
+'devdb export': extracts a database's schema, views, functions, procedures, triggers and permissions
+as deployable scripts, running the extractions concurrently and streaming rows to the files as they arrive
+"""
+
+import os
+import sys
+import time
+import getpass
+import threading
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import ConnectionSettings, DatabaseError, find_project_root, load_driver, open_executor
+    from .devdb_utils import print_error, print_success, print_info, print_warning
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import ConnectionSettings, DatabaseError, find_project_root, load_driver, open_executor
+    from devdb_utils import print_error, print_success, print_info, print_warning
+
+SCRIPTS_DIR = Path(__file__).parent / "sql_export"
+DEFAULT_OUTPUT = "exported_database"
+
+# (extraction script, output file, description), in deployment order
+EXPORTS = [
+    ("export_database_schema.sql", "01_schema.sql", "Database Schema (Tables, Constraints, Indexes)"),
+    ("export_views.sql", "02_views.sql", "Views"),
+    ("export_functions.sql", "03_functions.sql", "Functions"),
+    ("export_procedures.sql", "04_procedures.sql", "Stored Procedures"),
+    ("export_triggers.sql", "05_triggers.sql", "Triggers"),
+    ("export_permissions.sql", "06_permissions.sql", "Permissions and Security"),
+]
+DATA_EXPORT = ("export_data.sql", "07_data.sql", "Table Data")
+
+# Password for --server; prompted for when unset
+PASSWORD_ENV = "DEVDB_EXPORT_PASSWORD"
+
+PROGRESS_INTERVAL = 1.0
+
+class _CountingWriter:
+    """Writes to a file and counts the characters written, for the progress report"""
+
+    def __init__(self, f):
+        self.f = f
+        self.chars = 0
+
+    def write(self, text):
+        self.chars += len(text)
+        return self.f.write(text)
+
+class ExportProgress:
+    """Rows and characters written per output file, reported while the exports run"""
+
+    def __init__(self, out=sys.stderr):
+        self.out = out
+        self.rows = {}
+        self.writers = {}
+        self.running = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.start = time.monotonic()
+
+    def begin(self, name, writer):
+        with self.lock:
+            self.rows[name] = 0
+            self.writers[name] = writer
+            self.running.add(name)
+
+    def add_rows(self, name, count):
+        with self.lock:
+            self.rows[name] += count
+
+    def end(self, name):
+        with self.lock:
+            self.running.discard(name)
+
+    def line(self):
+        with self.lock:
+            rows = sum(self.rows.values())
+            chars = sum(writer.chars for writer in self.writers.values())
+            running = len(self.running)
+        elapsed = max(time.monotonic() - self.start, 1e-6)
+        return (f"{rows:,} rows, {chars / (1024 * 1024):.1f} MB in {elapsed:.0f}s "
+                f"({rows / elapsed:,.0f} rows/s), {running} extraction(s) running")
+
+    def _report(self):
+        while not self.stopped.wait(PROGRESS_INTERVAL):
+            self.out.write("\r\033[K  " + self.line())
+            self.out.flush()
+        self.out.write("\r\033[K")
+        self.out.flush()
+
+    def __enter__(self):
+        # A live line only makes sense on a terminal; logs get the summary alone
+        if self.out.isatty():
+            threading.Thread(target=self._report, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+
+def _remote_settings(server, user, project_dir):
+    """Connection settings for --server HOST[,PORT]"""
+    host, _, port = server.replace(":", ",").partition(",")
+    password = os.getenv(PASSWORD_ENV)
+    if password is None:
+        password = getpass.getpass(f"Password for {user} on {host}: ")
+    try:
+        project_root = find_project_root(project_dir)
+    except DatabaseError:
+        project_root = Path.cwd()
+    return ConnectionSettings(project_root, host=host, port=int(port or 1433), user=user, password=password)
+
+def _export_one(executor, database, output_dir, export, progress):
+    script, output_file, description = export
+    sql = (SCRIPTS_DIR / script).read_text(encoding='utf-8')
+    output_path = output_dir / output_file
+    start = time.monotonic()
+    # newline='' keeps the CHAR(13) line breaks the extraction scripts generate as they are
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = _CountingWriter(f)
+        progress.begin(output_file, writer)
+        try:
+            rows = executor.stream_script(
+                sql, writer, database=database, on_rows=lambda count: progress.add_rows(output_file, count)
+            )
+        finally:
+            progress.end(output_file)
+    return rows, output_path.stat().st_size, time.monotonic() - start
+
+def _deploy_script(database, server, exports):
+    steps = []
+    for number, (_, output_file, description) in enumerate(exports, 1):
+        steps.append(
+            f"-- Step {number}: {description}\n"
+            f"PRINT 'Step {number}: {description}...';\n"
+            f":r {output_file}\n"
+        )
+    return (
+        "/*\n"
+        "    DevDB Database Migration Script\n"
+        f"    Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"    Source Database: {database}\n"
+        f"    Source Server: {server}\n"
+        "*/\n\n"
+        "USE [DevDB];\nGO\n\n"
+        "PRINT 'Starting database migration...';\n"
+        f"PRINT 'Source: {database} on {server}';\n"
+        "PRINT 'Target: DevDB Docker Environment';\n"
+        "PRINT '';\n\n" +
+        "\n".join(steps) +
+        "\nPRINT '';\n"
+        "PRINT 'Database migration completed successfully!';\n"
+        "PRINT 'Review the individual script files for any manual adjustments needed.';\n"
+    )
+
+def _readme(database, server, exports):
+    files = "\n".join(
+        f"{number}. **{output_file}** - {description}"
+        for number, (_, output_file, description) in enumerate(exports, 2)
+    )
+    return (
+        "# DevDB Database Export\n\n"
+        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"**Source Database:** {database}\n"
+        f"**Source Server:** {server}\n\n"
+        "## Files Generated\n\n"
+        "1. **00_deploy_all.sql** - Master deployment script that runs all components in order\n"
+        f"{files}\n\n"
+        "## Deployment\n\n"
+        "Start your DevDB environment with `./devdb.sh up`, then run `00_deploy_all.sql` from this directory,\n"
+        "or each numbered script in order. Review each script first: some permissions may need manual\n"
+        "adjustment for the Docker environment.\n"
+    )
+
+def export_database(database, output_dir=None, project_dir=None, server=None, user="sa", jobs=None,
+                    include_data=False):
+    """Export database as deployment scripts into output_dir, one extraction per pooled connection
+
+    By default the project's server is exported from; server (HOST[,PORT])
+    and user point at another one, with the password taken from
+    DEVDB_EXPORT_PASSWORD or prompted for.
+    """
+    exports = EXPORTS + ([DATA_EXPORT] if include_data else [])
+    output_dir = Path(output_dir or DEFAULT_OUTPUT)
+    try:
+        if server:
+            # sqlcmd inside the project container can only reach the project's own server
+            if load_driver()[0] is None:
+                raise DatabaseError("Exporting from --server needs pymssql or pyodbc (pip install devdb-cli[db])")
+            settings = _remote_settings(server, user, project_dir)
+        else:
+            settings = ConnectionSettings.from_project(find_project_root(project_dir))
+        executor = open_executor(project_dir, pool_size=jobs or len(exports), settings=settings)
+        output_dir.mkdir(parents=True, exist_ok=True)
+    except (DatabaseError, OSError) as e:
+        print_error(str(e))
+        return False
+
+    server_name = f"{settings.host},{settings.port}"
+    print_info(f"Exporting {database} from {server_name} to {output_dir}/ over {executor.description}")
+
+    results = {}
+    with executor, ExportProgress() as progress:
+        with ThreadPoolExecutor(max_workers=executor.size) as pool:
+            futures = [
+                (export, pool.submit(_export_one, executor, database, output_dir, export, progress))
+                for export in exports
+            ]
+            for export, future in futures:
+                try:
+                    results[export[1]] = future.result()
+                except (DatabaseError, OSError) as e:
+                    results[export[1]] = e
+
+    elapsed = time.monotonic() - progress.start
+    total_rows = total_bytes = 0
+    for _, output_file, description in exports:
+        result = results[output_file]
+        if isinstance(result, Exception):
+            print_error(f"{output_file}: {description} failed: {result}")
+            continue
+        rows, size, seconds = result
+        total_rows += rows
+        total_bytes += size
+        print_success(f"{output_file}: {description} - {rows:,} rows, {size:,} bytes in {seconds:.1f}s")
+
+    try:
+        (output_dir / "00_deploy_all.sql").write_text(_deploy_script(database, server_name, exports), encoding='utf-8')
+        (output_dir / "README.md").write_text(_readme(database, server_name, exports), encoding='utf-8')
+    except OSError as e:
+        print_error(f"Cannot write the deployment script: {e}")
+        return False
+
+    failed = sum(1 for result in results.values() if isinstance(result, Exception))
+    throughput = total_bytes / (1024 * 1024) / max(elapsed, 1e-6)
+    summary = f"{total_rows:,} rows, {total_bytes / (1024 * 1024):.1f} MB in {elapsed:.1f}s ({throughput:.1f} MB/s)"
+    if failed:
+        print_warning(f"Exported with {failed} failed extraction(s): {summary}")
+        return False
+    print_success(f"Exported {database}: {summary}")
+    print_info(f"See {output_dir / 'README.md'} for how to deploy it")
+    return True
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+DevDB Provisioned Images
+'devdb image': commit a container with the project's schemas and tSQLt already deployed,
+so 'devdb.sh up' on a new machine or CI runner can skip provisioning
+"""
+
+import os
+import re
+import time
+import socket
+import hashlib
+import subprocess
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import CONTAINER_MOUNTS, ConnectionSettings, DatabaseError, find_project_root
+    from .devdb_schema import deploy_schemas, find_schema_files, schema_hash
+    from .devdb_wait import wait_for_server
+    from .devdb_utils import print_error, print_success, print_info
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import CONTAINER_MOUNTS, ConnectionSettings, DatabaseError, find_project_root
+    from devdb_schema import deploy_schemas, find_schema_files, schema_hash
+    from devdb_wait import wait_for_server
+    from devdb_utils import print_error, print_success, print_info
+
+# Keep in step with the image in .devdb/docker-compose.yml
+BASE_IMAGE = "mcr.microsoft.com/mssql/server:2022-latest"
+
+IMAGE_REPOSITORY = "devdb-provisioned"
+BUILD_CONTAINER = "devdb-image-build"
+TSQLT_FILE = ".devdb/tSQLt/tSQLt.class.sql"
+
+# Image labels; the content hash identifies an image even where the base image was never pulled
+CONTENT_HASH_LABEL = "devdb.content-hash"
+BASE_IMAGE_LABEL = "devdb.base-image"
+
+def _docker(arguments, check=True):
+    try:
+        result = subprocess.run(["docker"] + arguments, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise DatabaseError("Docker is not installed or not in your PATH.")
+    if check and result.returncode != 0:
+        raise DatabaseError(f"docker {arguments[0]} failed: {(result.stderr or result.stdout).strip()}")
+    return result
+
+def base_image_digest(pull=False):
+    """Repository digest of the base image, or None when it is not available locally"""
+    if pull:
+        print_info(f"Pulling {BASE_IMAGE}...")
+        _docker(["pull", "--quiet", BASE_IMAGE])
+    result = _docker(["image", "inspect", "--format", "{{index .RepoDigests 0}}", BASE_IMAGE], check=False)
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+def content_hash(project_root, settings):
+    """Hash of everything provisioning depends on, apart from the base image
+
+    The SA password is part of it: the password is set when an instance is
+    first started, so an image only works with the one it was built with.
+    """
+    digest = hashlib.sha256()
+    digest.update(schema_hash(find_schema_files(project_root), project_root).encode('ascii'))
+    tsqlt_file = project_root / TSQLT_FILE
+    if tsqlt_file.exists():
+        digest.update(hashlib.sha256(tsqlt_file.read_bytes()).digest())
+    digest.update(hashlib.sha256(settings.password.encode('utf-8')).digest())
+    return digest.hexdigest()
+
+def image_tag(project_root, content, base_digest):
+    """devdb-provisioned/<project>:<hash of content and base image>"""
+    project = re.sub(r"[^a-z0-9_.-]+", "-", project_root.name.lower()).strip("-._") or "project"
+    tag = hashlib.sha256(f"{content}\n{base_digest}".encode('utf-8')).hexdigest()[:16]
+    return f"{IMAGE_REPOSITORY}/{project}:{tag}"
+
+def find_image(project_root):
+    """A local provisioned image for the project as it is now, or None"""
+    settings = ConnectionSettings.from_project(project_root)
+    content = content_hash(project_root, settings)
+    base_digest = base_image_digest()
+    if base_digest:
+        tag = image_tag(project_root, content, base_digest)
+        if _docker(["image", "inspect", tag], check=False).returncode == 0:
+            return tag
+        return None
+    # Without the base image (e.g. a CI runner that only pulled the provisioned image) match on content
+    result = _docker([
+        "images", "--filter", f"label={CONTENT_HASH_LABEL}={content}", "--format", "{{.Repository}}:{{.Tag}}"
+    ], check=False)
+    tags = [line for line in result.stdout.splitlines() if line and "<none>" not in line]
+    return tags[0] if tags else None
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def build_image(project_dir=None, jobs=None):
+    """Provision a throwaway container from the base image and commit it as the project's image"""
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        settings = ConnectionSettings.from_project(project_root)
+        content = content_hash(project_root, settings)
+        base_digest = base_image_digest(pull=True)
+    except (DatabaseError, OSError) as e:
+        print_error(str(e))
+        return False
+    if not base_digest:
+        print_error(f"Cannot determine the digest of {BASE_IMAGE}")
+        return False
+
+    tag = image_tag(project_root, content, base_digest)
+    if _docker(["image", "inspect", tag], check=False).returncode == 0:
+        print_success(f"Provisioned image is up to date: {tag}")
+        return True
+
+    port = _free_port()
+    mounts = []
+    for mount, local in CONTAINER_MOUNTS.items():
+        mounts += ["-v", f"{project_root / local}:{mount}:ro"]
+    overrides = {"DB_HOST": "localhost", "DB_PORT": str(port), "DEVDB_CONTAINER": BUILD_CONTAINER}
+    saved_env = {key: os.environ.get(key) for key in overrides}
+
+    _docker(["rm", "--force", BUILD_CONTAINER], check=False)
+    try:
+        print_info(f"Starting {BUILD_CONTAINER} from {base_digest}...")
+        # The password is passed through the environment, not the command line
+        env = dict(os.environ, MSSQL_SA_PASSWORD=settings.password)
+        result = subprocess.run(
+            ["docker", "run", "--detach", "--name", BUILD_CONTAINER, "-e", "ACCEPT_EULA=Y", "-e", "MSSQL_SA_PASSWORD",
+             "-p", f"127.0.0.1:{port}:1433"] + mounts + [base_digest],
+            capture_output=True, text=True, env=env
+        )
+        if result.returncode != 0:
+            raise DatabaseError(f"docker run failed: {result.stderr.strip()}")
+
+        # Point the readiness wait and the deployment at the build container
+        os.environ.update(overrides)
+        if not wait_for_server(project_root) or not deploy_schemas(project_root, jobs=jobs):
+            raise DatabaseError("Provisioning failed; see above")
+
+        # A clean shutdown checkpoints every database into the image's data files
+        print_info("Stopping SQL Server and committing the image...")
+        _docker(["stop", "--time", "60", BUILD_CONTAINER])
+        _docker([
+            "commit",
+            "--change", f"LABEL {CONTENT_HASH_LABEL}={content}",
+            "--change", f"LABEL {BASE_IMAGE_LABEL}={base_digest}",
+            # docker run -e values end up in the image config; do not ship the password
+            "--change", "ENV MSSQL_SA_PASSWORD=",
+            BUILD_CONTAINER, tag
+        ])
+    except DatabaseError as e:
+        print_error(f"Image build failed: {e}")
+        return False
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        _docker(["rm", "--force", BUILD_CONTAINER], check=False)
+
+    print_success(f"Built {tag} in {time.monotonic() - start:.1f}s")
+    print_info("'./devdb.sh up' uses it for new containers while schemas/, tSQLt and the SA password are unchanged")
+    return True
+
+def resolve_image(project_dir=None):
+    """Print the provisioned image matching the project, for DEVDB_IMAGE; False when there is none"""
+    try:
+        tag = find_image(find_project_root(project_dir))
+    except (DatabaseError, OSError):
+        return False
+    if not tag:
+        return False
+    print(tag)
+    return True
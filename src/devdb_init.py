@@ -7,35 +7,114 @@ Creates a complete DevDB project scaffolding similar to 'airflow init'
 import os
 import shutil
 import sys
+import json
+import time
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 try:
-    import pkg_resources
+    # Python 3.9+; unlike pkg_resources it does not scan every installed distribution on import
+    from importlib.resources import files as resource_files
 except ImportError:
-    pkg_resources = None
+    resource_files = None
 try:
     # Try relative imports first (when installed as package)
     from .devdb_utils import (
         print_success, print_error, print_warning, print_info, print_header,
         check_docker, check_python_dependencies, generate_strong_password,
-        copy_and_process_template, get_git_user_info, download_tsqlt
+        copy_and_process_template, copy_file_contents, get_git_user_info, download_tsqlt
     )
+    from .devdb_manifest import load_manifest
+    from .devdb_cache import ArtifactError, ArtifactStore
+    from . import devdb_trace as trace
 except ImportError:
     # Fallback to direct imports (development mode)
     from devdb_utils import (
         print_success, print_error, print_warning, print_info, print_header,
         check_docker, check_python_dependencies, generate_strong_password,
-        copy_and_process_template, get_git_user_info, download_tsqlt
+        copy_and_process_template, copy_file_contents, get_git_user_info, download_tsqlt
     )
+    from devdb_manifest import load_manifest
+    from devdb_cache import ArtifactError, ArtifactStore
+    import devdb_trace as trace
+
+# Template files copied at once
+COPY_WORKERS = 16
+
+# Projects scaffolded at once by 'devdb init --from-file'
+BATCH_WORKERS = 4
+
+PROJECT_FIELDS = {"name", "path", "template", "force"}
+
+def load_project_list(file_path, path=".", template="advanced", force=False):
+    """Read the projects for 'devdb init --from-file' from a JSON or YAML file
+
+    The file is either a list of projects or a mapping with a 'projects' list
+    and defaults for path, template and force. A project is a name, or a
+    mapping with a name and any of the same fields. Raises ValueError when
+    the file cannot be used.
+    """
+    file_path = Path(file_path)
+    try:
+        text = file_path.read_text(encoding='utf-8')
+    except OSError as e:
+        raise ValueError(f"Cannot read {file_path}: {e}")
+    
+    if file_path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("Reading YAML needs PyYAML (pip install pyyaml); or list the projects in JSON")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in {file_path}: {e}")
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON in {file_path}: {e}")
+    
+    defaults = {"path": path, "template": template, "force": force}
+    if isinstance(data, dict):
+        defaults.update({key: data[key] for key in ("path", "template", "force") if key in data})
+        data = data.get("projects")
+    if not isinstance(data, list) or not data:
+        raise ValueError(f"{file_path} lists no projects")
+    
+    projects = []
+    for item in data:
+        project = dict(defaults)
+        if isinstance(item, str):
+            project["name"] = item
+        elif isinstance(item, dict):
+            unknown = set(item) - PROJECT_FIELDS
+            if unknown:
+                raise ValueError(f"Unknown project fields: {', '.join(sorted(unknown))}")
+            project.update(item)
+        else:
+            raise ValueError(f"Not a project: {item!r}")
+        if not isinstance(project.get("name"), str) or not project["name"].strip():
+            raise ValueError(f"Project without a name: {item!r}")
+        if project["template"] not in ("basic", "advanced"):
+            raise ValueError(f"Unknown template for {project['name']}: {project['template']}")
+        project["path"] = os.path.expanduser(str(project["path"]))
+        project["force"] = bool(project["force"])
+        projects.append(project)
+    return projects
 
 class DevDBInit:
     def __init__(self):
-        # Try to use pkg_resources for installed package, fallback to file system
-        if pkg_resources:
+        # Per-step progress messages; off while a batch scaffolds projects concurrently
+        self.progress = True
+        
+        # Use the package's resources when installed, fallback to file system
+        if resource_files and __package__:
             try:
-                # When installed as package, use pkg_resources
-                templates_path = pkg_resources.resource_filename('src', 'templates')
-                self.templates_dir = Path(templates_path)
+                templates = resource_files(__package__) / "templates"
+                if not templates.is_dir():
+                    raise FileNotFoundError(str(templates))
+                self.templates_dir = Path(str(templates))
             except Exception:
                 # Fallback to filesystem-based discovery
                 self._init_filesystem_templates()
@@ -79,27 +158,103 @@ class DevDBInit:
         if not self._setup_dependencies(target_dir):
             return False
             
-        # Set permissions
-        self._set_permissions(target_dir)
-        
         # Success message
         self._print_success_message(target_dir, project_name)
         return True
     
+    def create_projects(self, projects, jobs=None, test_mode=False):
+        """Create several projects at once (devdb init --from-file)
+
+        projects are dicts with name, path, template and force, as returned by
+        load_project_list. The environment is validated once; the projects are
+        then scaffolded concurrently and summarised with their timings.
+        """
+        
+        print_header(f"Creating {len(projects)} DevDB projects")
+        start = time.monotonic()
+        
+        print_info("Validating system requirements...")
+        if not self._validate_environment(test_mode):
+            return False
+        
+        target_dirs = [Path(project["path"]).resolve() / project["name"] for project in projects]
+        duplicates = sorted({str(d) for d in target_dirs if target_dirs.count(d) > 1})
+        if duplicates:
+            print_error(f"Projects listed more than once: {', '.join(duplicates)}")
+            return False
+        
+        def scaffold(project, target_dir):
+            project_start = time.monotonic()
+            with trace.span("init.project", project=project["name"], template=project["template"]):
+                success = (
+                    self._validate_target(target_dir, project["force"]) and
+                    self._create_project_structure(target_dir, project["template"],
+                                                   self._prepare_variables(project["name"])) and
+                    self._setup_dependencies(target_dir)
+                )
+            return success, time.monotonic() - project_start
+        
+        # Warm the memoized git probe before the workers all ask for it at once
+        get_git_user_info()
+        
+        self.progress = False
+        results = {}
+        with ThreadPoolExecutor(max_workers=jobs or BATCH_WORKERS) as pool:
+            futures = {
+                pool.submit(scaffold, project, target_dir): (project, target_dir)
+                for project, target_dir in zip(projects, target_dirs)
+            }
+            for future in as_completed(futures):
+                project, target_dir = futures[future]
+                try:
+                    success, seconds = future.result()
+                except Exception as e:
+                    print_error(f"{project['name']}: {e}")
+                    success, seconds = False, 0.0
+                results[project["name"]] = (success, seconds)
+                if success:
+                    print_success(f"{project['name']} ({project['template']}): {target_dir} in {seconds:.2f}s")
+                else:
+                    print_error(f"{project['name']}: failed after {seconds:.2f}s")
+        self.progress = True
+        
+        created = sum(1 for success, _ in results.values() if success)
+        print("\n" + "="*60)
+        print_header("Summary:")
+        for project, target_dir in zip(projects, target_dirs):
+            success, seconds = results[project["name"]]
+            print(f"   {'✓' if success else '✗'} {project['name']:<30} {seconds:6.2f}s  {target_dir}")
+        elapsed = time.monotonic() - start
+        if created == len(projects):
+            print_success(f"Created {created} projects in {elapsed:.1f}s")
+            return True
+        print_error(f"Created {created} of {len(projects)} projects in {elapsed:.1f}s")
+        return False
+    
     def _validate_setup(self, target_dir, force, test_mode=False):
         """Validate system requirements and target directory"""
         
         print_info("Validating system requirements...")
         
-        # Check Docker (skip in test mode)
-        if not test_mode and not check_docker():
-            return False
-            
-        # Check Python dependencies
-        if not check_python_dependencies():
-            return False
-            
-        # Check target directory
+        return self._validate_environment(test_mode) and self._validate_target(target_dir, force)
+    
+    def _validate_environment(self, test_mode=False):
+        """Check the tools every project needs; the checks are memoized, so batches pay for them once"""
+        
+        with trace.span("init.validate"):
+            # Check Docker (skip in test mode)
+            if not test_mode and not check_docker():
+                return False
+                
+            # Check Python dependencies
+            if not check_python_dependencies():
+                return False
+        
+        return True
+    
+    def _validate_target(self, target_dir, force):
+        """Check the target directory, clearing it with force"""
+        
         if target_dir.exists():
             if not force:
                 if any(target_dir.iterdir()):
@@ -131,7 +286,8 @@ class DevDBInit:
     def _create_project_structure(self, target_dir, template, variables):
         """Create the complete project directory structure"""
         
-        print_info("Creating project structure...")
+        if self.progress:
+            print_info("Creating project structure...")
         
         try:
             # Create base directories
@@ -163,60 +319,67 @@ class DevDBInit:
             return False
     
     def _copy_template_files(self, template_path, target_dir, variables):
-        """Copy and process all template files"""
-        
-        # Template files to copy and process
-        template_files = [
-            ('devdb.sh', 'devdb.sh'),
-            ('e2e_test.sh', 'e2e_test.sh'),
-            ('test_connection.sh', 'test_connection.sh'),
-            ('.gitignore', '.gitignore'),
-            ('README.md', 'README.md'),
-            ('CLAUDE.md', 'CLAUDE.md'),
-            ('.devdb/docker-compose.yml', '.devdb/docker-compose.yml'),
-            ('.devdb/.env.example', '.devdb/.env.example'),
-            ('.devdb/.env', '.devdb/.env'),
-            ('.devdb/scripts/code_polisher.py', '.devdb/scripts/code_polisher.py'),
-        ]
-        
-        # Schema files
-        schema_files = [
-            ('schemas/01_tables.sql', 'schemas/01_tables.sql'),
-            ('schemas/02_sprocs_and_views.sql', 'schemas/02_sprocs_and_views.sql'),
-            ('schemas/03_functions.sql', 'schemas/03_functions.sql'),
-            ('schemas/04_advanced_views.sql', 'schemas/04_advanced_views.sql'),
-            ('schemas/05_stored_procedures.sql', 'schemas/05_stored_procedures.sql'),
-            ('schemas/99_install_tsqlt.sql', 'schemas/99_install_tsqlt.sql'),
-        ]
-        
-        # Test files
-        test_files = [
-            ('tests/test_functions.sql', 'tests/test_functions.sql'),
-            ('tests/test_stored_procedures.sql', 'tests/test_stored_procedures.sql'),
-            ('tests/test_views.sql', 'tests/test_views.sql'),
-            ('tests/test_user_creation.sql', 'tests/test_user_creation.sql'),
-            ('tests/test_product_stock_fail.sql', 'tests/test_product_stock_fail.sql'),
-        ]
-        
-        all_files = template_files + schema_files + test_files
-        
-        for src_file, dest_file in all_files:
-            src_path = template_path / src_file
-            dest_path = target_dir / dest_file
-            
-            if src_path.exists():
+        """Copy and process all template files, as listed in the template manifest
+
+        Raises OSError once every copy has finished if any of them failed.
+        """
+        
+        with trace.span("init.manifest", template=template_path.name):
+            entries = load_manifest(self.templates_dir, template_path.name)
+        
+        # Create every directory up front, so the copies below never race to create one
+        for directory in sorted({(target_dir / entry["path"]).parent for entry in entries}):
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        store = ArtifactStore()
+        
+        def copy_entry(entry):
+            src_path = template_path / entry["path"]
+            dest_path = target_dir / entry["path"]
+            if entry.get("shared"):
+                try:
+                    store.add(src_path, entry["sha256"], entry["size"])
+                    # Hardlinks share the read-only mode of the cached object; leave it alone
+                    if store.link(entry["sha256"], dest_path) == "hardlink":
+                        return
+                    dest_path.chmod(int(entry["mode"], 8))
+                    return
+                except (ArtifactError, OSError) as e:
+                    print_warning(f"Not using the artifact cache for {entry['path']}: {e}")
+            if entry["render"]:
                 copy_and_process_template(src_path, dest_path, variables)
             else:
-                print_warning(f"Template file not found: {src_path}")
+                copy_file_contents(src_path, dest_path)
+            dest_path.chmod(int(entry["mode"], 8))
+        
+        # Copies are I/O bound; on network filesystems most of their time is round trips
+        failed = []
+        with trace.span("init.copy", files=len(entries)), ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+            futures = {pool.submit(copy_entry, entry): entry for entry in entries}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    trace.count("files.copied")
+                    trace.count("bytes.copied", futures[future]["size"])
+                except OSError as e:
+                    print_error(f"Template file not copied: {futures[future]['path']} ({e})")
+                    failed.append(futures[future]["path"])
+        
+        # Every copy has finished by now, so the project is left as complete as it can be
+        if failed:
+            raise OSError(f"{len(failed)} of {len(entries)} template file(s) could not be copied")
     
     def _setup_dependencies(self, target_dir):
         """Download and setup project dependencies"""
         
-        print_info("Setting up project dependencies...")
+        if self.progress:
+            print_info("Setting up project dependencies...")
         
         try:
             # Download tSQLt framework
-            if not download_tsqlt(target_dir):
+            with trace.span("init.tsqlt"):
+                tsqlt_ready = download_tsqlt(target_dir)
+            if not tsqlt_ready:
                 print_warning("Failed to download tSQLt - using placeholders")
                 
             return True
@@ -225,21 +388,6 @@ class DevDBInit:
             print_error(f"Failed to setup dependencies: {e}")
             return False
     
-    def _set_permissions(self, target_dir):
-        """Set appropriate file permissions"""
-        
-        # Make shell scripts executable
-        script_files = [
-            'devdb.sh',
-            'e2e_test.sh', 
-            'test_connection.sh'
-        ]
-        
-        for script in script_files:
-            script_path = target_dir / script
-            if script_path.exists():
-                script_path.chmod(0o755)
-    
     def _print_success_message(self, target_dir, project_name):
         """Print success message with next steps"""
         
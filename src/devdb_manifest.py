@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+DevDB Template Manifest
+Lists every file of each project template with its mode, checksum, whether it has placeholders and
+whether it comes from the artifact cache, so 'devdb init' copies the templates without scanning them.
+Regenerate it after editing a template:
+
+    python3 src/devdb_manifest.py
+"""
+
+import os
+import sys
+import json
+import stat
+import hashlib
+from pathlib import Path
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_utils import TEMPLATE_VARIABLE_BYTES_RE
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_utils import TEMPLATE_VARIABLE_BYTES_RE
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 2
+
+# Files under these directories are never edited in a project; init links them from the artifact cache
+SHARED_DIRS = (".devdb/tSQLt/",)
+
+EXCLUDED_DIRS = {"__pycache__"}
+EXCLUDED_SUFFIXES = {".pyc"}
+
+def _template_files(template_path):
+    for root, dirs, files in os.walk(template_path):
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+        for name in sorted(files):
+            if os.path.splitext(name)[1] not in EXCLUDED_SUFFIXES:
+                yield Path(root) / name
+
+def _file_entry(template_path, file_path):
+    data = file_path.read_bytes()
+    # Git only tracks the executable bit; shell scripts are executable whatever their checkout says
+    executable = file_path.stat().st_mode & stat.S_IXUSR or file_path.suffix == ".sh"
+    path = file_path.relative_to(template_path).as_posix()
+    render = bool(TEMPLATE_VARIABLE_BYTES_RE.search(data))
+    return {
+        "path": path,
+        "mode": "0755" if executable else "0644",
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "render": render,
+        "shared": not render and path.startswith(SHARED_DIRS)
+    }
+
+def build_manifest(templates_dir):
+    """Describe every template under templates_dir"""
+    templates = {}
+    for template_path in sorted(p for p in Path(templates_dir).iterdir() if p.is_dir() and p.name not in EXCLUDED_DIRS):
+        templates[template_path.name] = [
+            _file_entry(template_path, file_path) for file_path in _template_files(template_path)
+        ]
+    return {"version": MANIFEST_VERSION, "templates": templates}
+
+def load_manifest(templates_dir, template):
+    """The manifest entries of one template
+
+    A source checkout may not have a generated manifest yet (or one for a
+    template added since); the template is then described from the files.
+    """
+    try:
+        with open(Path(templates_dir) / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION and template in manifest["templates"]:
+            return manifest["templates"][template]
+    except (OSError, ValueError, KeyError):
+        pass
+    template_path = Path(templates_dir) / template
+    return [_file_entry(template_path, file_path) for file_path in _template_files(template_path)]
+
+def write_manifest(templates_dir):
+    manifest_path = Path(templates_dir) / MANIFEST_FILE
+    with open(manifest_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(build_manifest(templates_dir), f, indent=1)
+        f.write("\n")
+    return manifest_path
+
+def main(argv=None):
+    """Write src/templates/manifest.json; with --check, fail if it is out of date instead"""
+    argv = sys.argv[1:] if argv is None else argv
+    templates_dir = Path(__file__).parent / "templates"
+    if "--check" in argv:
+        try:
+            with open(templates_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            current = None
+        if current != build_manifest(templates_dir):
+            print(f"{templates_dir / MANIFEST_FILE} is out of date; run python3 src/devdb_manifest.py")
+            return 1
+        return 0
+    print(f"Wrote {write_manifest(templates_dir)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+DevDB Query Commands
+'devdb exec' and 'devdb query': run SQL files and ad-hoc queries against a project database
+"""
+
+from pathlib import Path
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import DatabaseError, expand_includes, find_project_root, open_executor
+    from .devdb_utils import print_error, print_success, print_info, print_warning
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import DatabaseError, expand_includes, find_project_root, open_executor
+    from devdb_utils import print_error, print_success, print_info, print_warning
+
+def run_query(sql, database=None, project_dir=None):
+    """Execute an ad-hoc query and print its results"""
+    try:
+        with open_executor(project_dir) as executor:
+            print_info("Executing query...")
+            executor.run_script(sql, database)
+        return True
+    except DatabaseError as e:
+        print_error(f"Query failed: {e}")
+        return False
+
+def execute_files(files, database=None, project_dir=None, continue_on_error=False):
+    """Execute SQL files in order over one executor, expanding sqlcmd ':r' includes"""
+    try:
+        project_root = find_project_root(project_dir)
+        executor = open_executor(project_root)
+    except DatabaseError as e:
+        print_error(str(e))
+        return False
+
+    failed = []
+    with executor:
+        print_info(f"Using {executor.description}")
+        for file_path in files:
+            print_info(f"Executing: {file_path}")
+            try:
+                sql_content = Path(file_path).read_text(encoding='utf-8-sig')
+                executor.run_script(expand_includes(sql_content, project_root), database)
+                print_success(f"Executed: {file_path}")
+            except (DatabaseError, OSError) as e:
+                failed.append(file_path)
+                if not continue_on_error:
+                    print_error(f"Failed: {file_path} - {e}")
+                    return False
+                print_warning(f"Failed: {file_path} - {e}")
+
+    if failed:
+        print_warning(f"{len(failed)} of {len(files)} file(s) failed")
+        return False
+    return True
@@ -0,0 +1,634 @@
+#!/usr/bin/env python3
+"""
+DevDB Schema Deployment
+Applies schemas/*.sql as a dependency graph of objects, running independent objects concurrently
+and skipping objects the deployment ledger shows are already in place
+"""
+
+import io
+import re
+import json
+import time
+import heapq
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import (
+        DEFAULT_DATABASE, DatabaseError, PooledExecutor, expand_includes, find_project_root, open_executor,
+        quote_name
+    )
+    from .devdb_sql import (
+        CREATE_OBJECT_RE, find_database, find_objects, find_references, mask_comments_and_strings, split_batches
+    )
+    from .devdb_index import SqlIndex, describe_object
+    from .devdb_utils import print_error, print_success, print_info, print_warning
+    from . import devdb_trace as trace
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import (
+        DEFAULT_DATABASE, DatabaseError, PooledExecutor, expand_includes, find_project_root, open_executor,
+        quote_name
+    )
+    from devdb_sql import (
+        CREATE_OBJECT_RE, find_database, find_objects, find_references, mask_comments_and_strings, split_batches
+    )
+    from devdb_index import SqlIndex, describe_object
+    from devdb_utils import print_error, print_success, print_info, print_warning
+    import devdb_trace as trace
+
+SCHEMA_DIR = "schemas"
+
+# Every database a deployment touches records what was applied to it here
+LEDGER_TABLE = "devdb.DeploymentLedger"
+ENSURE_LEDGER_SQL = """IF SCHEMA_ID(N'devdb') IS NULL EXEC(N'CREATE SCHEMA devdb');
+GO
+IF OBJECT_ID(N'devdb.DeploymentLedger', N'U') IS NULL
+    CREATE TABLE devdb.DeploymentLedger (
+        UnitKey NVARCHAR(450) NOT NULL PRIMARY KEY,
+        FileName NVARCHAR(260) NOT NULL,
+        UnitHash CHAR(64) NOT NULL,
+        AppliedAt DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+    );
+"""
+
+# What a database deployed before it had a ledger already holds, by the kinds find_objects reports
+_EXISTING_OBJECTS_SQL = (
+    "SELECT N'OBJECT', s.name, o.name FROM {db}.sys.objects o JOIN {db}.sys.schemas s ON s.schema_id = o.schema_id "
+    "WHERE o.is_ms_shipped = 0 "
+    "UNION ALL SELECT N'SCHEMA', NULL, name FROM {db}.sys.schemas "
+    "UNION ALL SELECT N'TYPE', s.name, t.name FROM {db}.sys.types t JOIN {db}.sys.schemas s ON s.schema_id = t.schema_id "
+    "WHERE t.is_user_defined = 1"
+)
+
+# Objects a changed definition can be re-applied to with CREATE OR ALTER; anything
+# else (tables, types, ...) holds data or dependents and is never rebuilt in place
+ALTERABLE_KINDS = {"PROCEDURE", "VIEW", "FUNCTION", "TRIGGER"}
+
+# Statements that only set up the session. Batches made of nothing else do not become
+# units of their own: PRINTs travel with the next unit, USE and SET options carry over
+# to every later unit of the same file, as they would in a sqlcmd session.
+_PRINT_RE = re.compile(r"\bPRINT\b[^;\n]*;?", re.IGNORECASE)
+_USE_RE = re.compile(r"\bUSE\s+(?:\[[^\]]+\]|\"[^\"]+\"|[\w@#$]+)\s*;?", re.IGNORECASE)
+_SET_OPTION_RE = re.compile(
+    r"\bSET\s+(ANSI_NULLS|ANSI_PADDING|ANSI_WARNINGS|ARITHABORT|CONCAT_NULL_YIELDS_NULL|QUOTED_IDENTIFIER|"
+    r"NUMERIC_ROUNDABORT|NOCOUNT|XACT_ABORT)\s+(?:ON|OFF)\b\s*;?",
+    re.IGNORECASE
+)
+
+class DeployUnit:
+    """One object-creating batch of a schema file, plus the PRINT batches leading up to it
+
+    Batches that create no object (seed data, ALTERs, configuration) are
+    barriers: they wait for everything before them, and everything after
+    them waits for them.
+    """
+
+    def __init__(self, index, file_name, ordinal, database, session, batches, objects, file_hash=None):
+        self.index = index
+        self.file_name = file_name
+        # Hash of the whole file with its includes expanded, so a changed include changes it too
+        self.file_hash = file_hash
+        self.ordinal = ordinal
+        self.database = database
+        self.session = session
+        self.batches = batches
+        self.objects = objects
+        self.barrier = not objects
+        # Among the barriers of the file with the same script, which one this is
+        self.occurrence = 1
+        self.depends_on = set()
+        # Set when a changed module is redeployed over its previous version
+        self.alter = False
+
+    @property
+    def label(self):
+        if self.barrier:
+            return f"{self.file_name} (statement #{self.ordinal})"
+        return ", ".join(name if schema is None else f"{schema}.{name}" for _, schema, name in self.objects)
+
+    @property
+    def key(self):
+        """Ledger key: the objects created, or the file and script hash of a barrier
+
+        Barriers are keyed on their content rather than their position, so
+        adding or removing another batch of the file does not make them look
+        new and run again.
+        """
+        if self.barrier:
+            key = f"{self.file_name}#{self.hash}"
+            return key if self.occurrence == 1 else f"{key}#{self.occurrence}"
+        key = ",".join(f"{kind}:{schema}.{name}" for kind, schema, name in self.objects)
+        return key if len(key) <= 400 else "sha256:" + hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    @property
+    def hash(self):
+        return hashlib.sha256(self.script.encode('utf-8')).hexdigest()
+
+    @property
+    def alterable(self):
+        return not self.barrier and all(kind in ALTERABLE_KINDS for kind, _, _ in self.objects)
+
+    @property
+    def script(self):
+        """The unit's batches, preceded by the file's session options"""
+        preamble = "\n".join(self.session) + "\nGO\n" if self.session else ""
+        return preamble + "".join(self.batches)
+
+    def deploy_script(self):
+        """The script to run: CREATE becomes CREATE OR ALTER when replacing a deployed module"""
+        script = self.script
+        if not self.alter:
+            return script
+        masked = mask_comments_and_strings(script)
+        pieces = []
+        last = 0
+        for match in CREATE_OBJECT_RE.finditer(masked):
+            if not re.match(r"CREATE\s+OR\s+ALTER\b", masked[match.start():], re.IGNORECASE):
+                pieces.append(script[last:match.start()] + "CREATE OR ALTER")
+                last = match.start() + len("CREATE")
+        return "".join(pieces) + script[last:]
+
+def find_schema_files(project_root):
+    """Schema files in deployment order"""
+    return sorted((Path(project_root) / SCHEMA_DIR).glob("*.sql"))
+
+def schema_hash(schema_files, project_root):
+    """One hash over the names and contents of the schema files, includes expanded"""
+    digest = hashlib.sha256()
+    for schema_file in schema_files:
+        sql_content = expand_includes(schema_file.read_text(encoding='utf-8-sig'), project_root)
+        digest.update(schema_file.name.encode('utf-8') + b"\0")
+        digest.update(hashlib.sha256(sql_content.encode('utf-8')).digest())
+    return digest.hexdigest()
+
+def load_schema_index(project_root, schema_files, rebuild=False):
+    """The project's SQL object index, brought up to date for the schema files and saved
+
+    Returns the index and the entries of schema_files, in order.
+    """
+    index = SqlIndex(project_root)
+    entries = index.update(schema_files, rebuild)
+    try:
+        index.save()
+    except OSError as e:
+        print_warning(f"Cannot save {index.path}: {e}")
+    return index, entries
+
+def plan_deployment(schema_files, project_root):
+    """Split schema files into deploy units and work out the dependencies between them
+
+    A unit depends on the latest earlier unit that creates an object it
+    mentions (or the database it runs in) and on the last barrier before it.
+    Edges only ever point backwards in file order, so the graph is acyclic and
+    a sequential run in file order is always a valid schedule.
+    """
+    units = []
+    for schema_file in schema_files:
+        sql_content = expand_includes(Path(schema_file).read_text(encoding='utf-8-sig'), project_root)
+        file_hash = hashlib.sha256(sql_content.encode('utf-8')).hexdigest()
+        database = DEFAULT_DATABASE
+        session = {}
+        pending = []
+        ordinal = 0
+        for batch, separator in split_batches(sql_content):
+            if not batch.strip():
+                continue
+            text = batch + (separator or "\n")
+            objects = find_objects(batch)
+            masked = mask_comments_and_strings(batch)
+            leftover = _SET_OPTION_RE.sub("", _USE_RE.sub("", _PRINT_RE.sub("", masked)))
+
+            if not objects and not leftover.strip(" \t\r\n;"):
+                for match in _SET_OPTION_RE.finditer(masked):
+                    session[match.group(1).upper()] = batch[match.start():match.end()].strip()
+                if _PRINT_RE.search(masked):
+                    pending.append(text)
+                database = find_database(batch) or database
+                continue
+
+            ordinal += 1
+            units.append(DeployUnit(
+                len(units), Path(schema_file).name, ordinal, database, list(session.values()), pending + [text], objects,
+                file_hash
+            ))
+            pending = []
+            database = find_database(batch) or database
+
+        # Trailing PRINTs belong to the file's last unit
+        if pending and units and units[-1].file_name == Path(schema_file).name:
+            units[-1].batches.extend(pending)
+
+    occurrences = {}
+    for unit in units:
+        if unit.barrier:
+            occurrences[unit.file_name, unit.hash] = unit.occurrence = occurrences.get((unit.file_name, unit.hash), 0) + 1
+
+    definers = {}
+    last_barrier = None
+    since_barrier = []
+    for unit in units:
+        if unit.barrier:
+            unit.depends_on.update(since_barrier)
+        else:
+            for reference in find_references("".join(unit.batches)) | {unit.database.lower()}:
+                if reference in definers:
+                    unit.depends_on.add(definers[reference])
+        if last_barrier is not None:
+            unit.depends_on.add(last_barrier)
+
+        for _, _, name in unit.objects:
+            definers[name.lower()] = unit.index
+        if unit.barrier:
+            last_barrier = unit.index
+            since_barrier = []
+        else:
+            since_barrier.append(unit.index)
+
+    return units
+
+def deployment_waves(units):
+    """Group units into waves that could run side by side"""
+    level = {}
+    waves = []
+    for unit in units:
+        level[unit.index] = 1 + max((level[dep] for dep in unit.depends_on), default=-1)
+        if level[unit.index] == len(waves):
+            waves.append([])
+        waves[level[unit.index]].append(unit)
+    return waves
+
+def sql_literal(value):
+    """Quote a string as a T-SQL Unicode literal"""
+    return "N'" + value.replace("'", "''") + "'"
+
+class Ledger:
+    """The devdb.DeploymentLedger tables of the databases a deployment touches
+
+    Each applied unit is recorded with the hash of its script in the database
+    it runs in, so dropping or recreating a database forgets its history.
+    Files are recorded too, once every unit in them is in place, which lets
+    unchanged files be skipped without comparing their units one by one.
+
+    A database that exists but has no ledger yet was deployed before the
+    ledger was introduced; the objects it already holds are read instead, so
+    they can be adopted rather than created again.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.entries = {}
+        self.databases = set()
+        # database -> (kind, schema, name) of what it holds, for databases without a ledger
+        self.existing = {}
+        self.ensured = set()
+        self.lock = threading.Lock()
+
+    def load(self, databases):
+        """Read the ledgers of the given databases; missing databases read as empty"""
+        self.databases = {row[0].lower() for row in self.executor.fetch("SELECT name FROM sys.databases")}
+        for database in databases:
+            table = f"{quote_name(database)}.{LEDGER_TABLE}"
+            ledger_sql = f"SELECT N'LEDGER', NULL, NULL UNION ALL SELECT N'UNIT', UnitKey, UnitHash FROM {table}"
+            existing_sql = _EXISTING_OBJECTS_SQL.format(db=quote_name(database))
+            rows = self.executor.fetch(
+                f"IF DB_ID({sql_literal(database)}) IS NOT NULL AND OBJECT_ID({sql_literal(table)}, N'U') IS NOT NULL\n"
+                f"    EXEC({sql_literal(ledger_sql)});\n"
+                f"ELSE IF DB_ID({sql_literal(database)}) IS NOT NULL\n"
+                f"    EXEC({sql_literal(existing_sql)});"
+            )
+            if not rows or rows[0][0] == "LEDGER":
+                self.entries[database.lower()] = {key: unit_hash for tag, key, unit_hash in rows if tag == "UNIT"}
+            else:
+                self.entries[database.lower()] = {}
+                self.existing[database.lower()] = {
+                    (kind, (schema or "").lower(), name.lower()) for kind, schema, name in rows
+                }
+
+    def deployed_hash(self, database, key):
+        return self.entries.get(database.lower(), {}).get(key)
+
+    def exists(self, unit):
+        """True if unit's database has no ledger but already holds every object unit creates"""
+        existing = self.existing.get(unit.database.lower())
+        if not existing or unit.barrier:
+            return False
+        for kind, schema, name in unit.objects:
+            if kind == "DATABASE":
+                found = name.lower() in self.databases
+            elif kind in ("SCHEMA", "TYPE"):
+                found = (kind, (schema or "dbo").lower() if kind == "TYPE" else "", name.lower()) in existing
+            else:
+                found = ("OBJECT", (schema or "dbo").lower(), name.lower()) in existing
+            if not found:
+                return False
+        return True
+
+    def deployed_before_ledger(self, unit, file_units):
+        """True if a barrier's database has no ledger but holds user objects, every object of the file among them"""
+        existing = self.existing.get(unit.database.lower(), ())
+        return any(kind == "OBJECT" for kind, _, _ in existing) and all(
+            self.exists(other) for other in file_units if not other.barrier
+        )
+
+    def recorded_by_position(self, unit):
+        """True if a barrier was recorded under the position-based key earlier releases used"""
+        legacy_key = re.compile(re.escape(unit.file_name) + r"#\d+")
+        return any(
+            unit_hash == unit.hash and legacy_key.fullmatch(key)
+            for key, unit_hash in self.entries.get(unit.database.lower(), {}).items()
+        )
+
+    def file_is_current(self, file_name, file_hash, units):
+        """True if every database the file deploys to recorded this version of it"""
+        return all(self.deployed_hash(unit.database, f"file:{file_name}") == file_hash for unit in units)
+
+    def unit_is_current(self, unit):
+        if self.deployed_hash(unit.database, unit.key) != unit.hash:
+            return False
+        # A database dropped since it was created has to be created again
+        return all(name.lower() in self.databases for kind, _, name in unit.objects if kind == "DATABASE")
+
+    def ensure(self, database):
+        """Create the ledger table in a database the first time a unit is applied there"""
+        with self.lock:
+            if database.lower() in self.ensured:
+                return
+            self.executor.run_script(ENSURE_LEDGER_SQL, database, out=None)
+            self.ensured.add(database.lower())
+
+    @staticmethod
+    def record_sql(database, entries):
+        """Upserts recording (key, file name, hash) entries in a database's ledger"""
+        table = f"{quote_name(database)}.{LEDGER_TABLE}"
+        statements = ["SET NOCOUNT ON;"]
+        for key, file_name, unit_hash in entries:
+            statements.append(
+                f"UPDATE {table} SET FileName = {sql_literal(file_name)}, UnitHash = '{unit_hash}', "
+                f"AppliedAt = SYSUTCDATETIME() WHERE UnitKey = {sql_literal(key)};\n"
+                f"IF @@ROWCOUNT = 0 INSERT INTO {table} (UnitKey, FileName, UnitHash) "
+                f"VALUES ({sql_literal(key)}, {sql_literal(file_name)}, '{unit_hash}');"
+            )
+        return "\n".join(statements) + "\n"
+
+    def record(self, entries_by_database):
+        """Record entries in each database's ledger, one round trip per database"""
+        for database, entries in entries_by_database.items():
+            if entries:
+                self.ensure(database)
+                self.executor.run_script(self.record_sql(database, entries), DEFAULT_DATABASE, out=None)
+
+def plan_changes(units, ledger, full=False):
+    """Split units into those to apply, those already deployed and those blocked
+
+    Changed modules are redeployed with CREATE OR ALTER. Changed tables and
+    other stateful objects are not touched; they are returned separately so
+    the caller can warn about them. A barrier runs only when its own script
+    is not in the ledger. Units already in place but not yet recorded under
+    their key (deployed before the database had a ledger, or barriers
+    recorded by position) are returned as adopted: the caller records them
+    without running them. Existing modules are re-applied with CREATE OR
+    ALTER instead, which is cheap and brings them up to date.
+    """
+    pending = []
+    current = []
+    blocked = []
+    adopted = []
+    by_file = {}
+    for unit in units:
+        by_file.setdefault(unit.file_name, []).append(unit)
+
+    for file_name, file_units in by_file.items():
+        file_current = not full and ledger.file_is_current(file_name, file_units[0].file_hash, file_units)
+        for unit in file_units:
+            deployed = ledger.deployed_hash(unit.database, unit.key)
+            if full:
+                unit.alter = unit.alterable and (deployed is not None or ledger.exists(unit))
+                pending.append(unit)
+            elif ledger.unit_is_current(unit):
+                current.append(unit)
+            elif unit.barrier:
+                if ledger.recorded_by_position(unit) or ledger.deployed_before_ledger(unit, file_units):
+                    adopted.append(unit)
+                else:
+                    pending.append(unit)
+            elif deployed is None and ledger.exists(unit):
+                if unit.alterable:
+                    unit.alter = True
+                    pending.append(unit)
+                else:
+                    adopted.append(unit)
+            elif deployed is None or deployed == unit.hash or file_current:
+                # New, or in place once but its database was dropped since
+                pending.append(unit)
+            elif unit.alterable:
+                unit.alter = True
+                pending.append(unit)
+            else:
+                blocked.append(unit)
+    return pending, current, blocked, adopted
+
+def run_units(executor, units, jobs, ledger=None):
+    """Apply units over the pool as soon as their dependencies are in; stops at the first failure
+
+    Dependencies on units outside the list count as satisfied. Each applied
+    unit is recorded in the ledger in the same round trip as its script.
+    Returns the number of units applied and the failed unit, if any.
+    """
+    by_index = {unit.index: unit for unit in units}
+    dependents = {unit.index: [] for unit in units}
+    waiting = {}
+    ready = []
+    for unit in units:
+        depends_on = [dep for dep in unit.depends_on if dep in by_index]
+        waiting[unit.index] = len(depends_on)
+        for dep in depends_on:
+            dependents[dep].append(unit.index)
+        if not depends_on:
+            heapq.heappush(ready, unit.index)
+
+    def apply(unit):
+        # Buffer output so concurrent units do not interleave
+        output = io.StringIO()
+        try:
+            with trace.span("schema.unit", unit=unit.label, file=unit.file_name, database=unit.database):
+                script = unit.deploy_script()
+                if ledger:
+                    ledger.ensure(unit.database)
+                    script += "\nGO\n" + ledger.record_sql(unit.database, [(unit.key, unit.file_name, unit.hash)])
+                executor.run_script(script, unit.database, out=output)
+            return output.getvalue(), None
+        except DatabaseError as e:
+            return output.getvalue(), e
+
+    applied = 0
+    failed = None
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while ready or running:
+            while ready and failed is None and len(running) < jobs:
+                unit = by_index[heapq.heappop(ready)]
+                running[pool.submit(apply, unit)] = unit
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                unit = running.pop(future)
+                output, error = future.result()
+                if output.strip():
+                    print(output.rstrip())
+                if error:
+                    print_error(f"Failed: {unit.label} ({unit.file_name}) - {error}")
+                    failed = failed or unit
+                    continue
+                applied += 1
+                print_success(f"{'Altered' if unit.alter else 'Applied'}: {unit.label}")
+                for index in dependents[unit.index]:
+                    waiting[index] -= 1
+                    if waiting[index] == 0:
+                        heapq.heappush(ready, index)
+
+    return applied, failed
+
+def deploy_schemas(project_dir=None, jobs=None, dry_run=False, full=False):
+    """Deploy the project's schemas/*.sql, in parallel where dependencies allow
+
+    Only units that are new or changed since the last deployment are applied,
+    unless full is set.
+    """
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        schema_files = find_schema_files(project_root)
+        if not schema_files:
+            print_warning(f"No schema files found in {project_root / SCHEMA_DIR}")
+            return True
+        with trace.span("schema.plan", files=len(schema_files)):
+            # Refreshing the index here keeps it current for the other tools after every 'up'
+            load_schema_index(project_root, schema_files)
+            units = plan_deployment(schema_files, project_root)
+    except (DatabaseError, OSError) as e:
+        print_error(str(e))
+        return False
+
+    waves = deployment_waves(units)
+    print_info(f"Planned {len(units)} unit(s) from {len(schema_files)} file(s) in {len(waves)} wave(s)")
+    if dry_run:
+        for number, wave in enumerate(waves, 1):
+            print_info(f"Wave {number}: " + "; ".join(unit.label for unit in wave))
+        return True
+
+    try:
+        executor = open_executor(project_root, pool_size=jobs)
+    except DatabaseError as e:
+        print_error(str(e))
+        return False
+
+    with executor:
+        ledger = Ledger(executor)
+        try:
+            with trace.span("schema.ledger"):
+                ledger.load(sorted({unit.database for unit in units}, key=str.lower))
+        except DatabaseError as e:
+            print_error(f"Cannot read the deployment ledger: {e}")
+            return False
+
+        pending, current, blocked, adopted = plan_changes(units, ledger, full)
+        for unit in blocked:
+            print_warning(
+                f"{unit.label} ({unit.file_name}) changed since it was deployed and is not altered in place. "
+                "Rebuild with './devdb.sh reset' or 'devdb schema --full' on a fresh database."
+            )
+        if adopted:
+            # Already in place: recorded, not run again
+            print_info(f"Recording {len(adopted)} unit(s) already deployed in the ledger")
+            entries = {}
+            for unit in adopted:
+                entries.setdefault(unit.database, []).append((unit.key, unit.file_name, unit.hash))
+            try:
+                ledger.record(entries)
+            except DatabaseError as e:
+                print_error(f"Cannot record deployed units in the ledger: {e}")
+                return False
+        if not pending:
+            print_success("Schema is up to date - nothing to deploy")
+            return True
+        print_info(f"Deploying {len(pending)} of {len(units)} unit(s); {len(current) + len(adopted)} unchanged")
+
+        if not isinstance(executor, PooledExecutor) and len(pending) == len(units):
+            # Every sqlcmd call is a container exec; one per file beats one per object
+            print_warning(f"Using {executor.description}; deploying file by file")
+            for schema_file in schema_files:
+                print_info(f"Executing schema: {schema_file.name}")
+                file_units = [unit for unit in units if unit.file_name == schema_file.name]
+                entries = {}
+                for unit in file_units:
+                    entries.setdefault(unit.database, []).append((unit.key, unit.file_name, unit.hash))
+                try:
+                    with trace.span("schema.file", file=schema_file.name):
+                        sql_content = expand_includes(schema_file.read_text(encoding='utf-8-sig'), project_root)
+                        executor.run_script(sql_content)
+                        ledger.record(entries)
+                except (DatabaseError, OSError) as e:
+                    print_error(f"Schema failed: {schema_file.name} - {e}")
+                    return False
+                print_success(f"Schema applied: {schema_file.name}")
+            applied, failed = len(units), None
+        else:
+            print_info(f"Using {executor.description}")
+            applied, failed = run_units(executor, pending, executor.size, ledger)
+
+        if failed:
+            print_error(f"Schema deployment stopped: {applied} of {len(pending)} unit(s) applied")
+            return False
+
+        # Files whose units are all in place can be skipped wholesale next time
+        blocked_files = {unit.file_name for unit in blocked}
+        file_entries = {}
+        for unit in units:
+            if unit.file_name not in blocked_files:
+                entry = (f"file:{unit.file_name}", unit.file_name, unit.file_hash)
+                if entry not in file_entries.setdefault(unit.database, []):
+                    file_entries[unit.database].append(entry)
+        try:
+            ledger.record(file_entries)
+        except DatabaseError as e:
+            print_warning(f"Could not record deployed files in the ledger: {e}")
+
+    print_success(f"Schema deployment completed: {applied} unit(s) in {time.monotonic() - start:.1f}s")
+    return True
+
+def index_schemas(project_dir=None, rebuild=False, as_json=False):
+    """Bring the SQL object index of schemas/*.sql up to date and print it, or dump it as JSON"""
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        schema_files = find_schema_files(project_root)
+        index, entries = load_schema_index(project_root, schema_files, rebuild)
+    except (DatabaseError, OSError, UnicodeDecodeError) as e:
+        print_error(str(e))
+        return False
+
+    if as_json:
+        print(json.dumps({index.key(path): entry for path, entry in zip(schema_files, entries)}, indent=1))
+        return True
+    if not schema_files:
+        print_warning(f"No schema files found in {project_root / SCHEMA_DIR}")
+        return True
+
+    objects = 0
+    for schema_file, entry in zip(schema_files, entries):
+        print_info(f"{index.key(schema_file)}: {len(entry['batches'])} batch(es), {len(entry['objects'])} object(s)")
+        for obj in entry["objects"]:
+            print(f"  {obj['line']:>5}  {describe_object(obj)}")
+        objects += len(entry["objects"])
+    print_success(
+        f"Indexed {objects} object(s) in {len(schema_files)} file(s) in {time.monotonic() - start:.2f}s: "
+        f"{index.parsed} parsed, {index.reused} unchanged"
+    )
+    print_info(f"Index: {index.path}")
+    return True
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+DevDB Snapshots
+'devdb snapshot': back up a provisioned project's databases and restore them in place,
+so a reset does not have to recreate the container and replay every schema
+"""
+
+import re
+import json
+import time
+import subprocess
+from datetime import datetime, timezone
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import ConnectionSettings, DatabaseError, find_project_root, open_executor, quote_name
+    from .devdb_schema import find_schema_files, schema_hash, sql_literal
+    from .devdb_utils import print_error, print_success, print_info, print_warning
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import ConnectionSettings, DatabaseError, find_project_root, open_executor, quote_name
+    from devdb_schema import find_schema_files, schema_hash, sql_literal
+    from devdb_utils import print_error, print_success, print_info, print_warning
+
+# Backups are written to the devdb-backups volume (see .devdb/docker-compose.yml), which
+# outlives the container; the manifest describing each snapshot stays with the project
+BACKUP_DIR = "/var/opt/mssql/backup"
+MANIFEST_DIR = ".devdb/snapshots"
+
+# The snapshot './devdb.sh up' saves after provisioning a new container and 'reset' restores
+BASELINE_SNAPSHOT = "baseline"
+
+SNAPSHOT_NAME_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+USER_DATABASES_SQL = "SELECT name FROM sys.databases WHERE database_id > 4 AND state_desc = 'ONLINE' ORDER BY name"
+
+def _manifest_path(project_root, name):
+    return project_root / MANIFEST_DIR / f"{name}.json"
+
+def _load_manifest(project_root, name):
+    try:
+        with open(_manifest_path(project_root, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise DatabaseError(f"Snapshot not found: {name}")
+    except (OSError, ValueError) as e:
+        raise DatabaseError(f"Cannot read snapshot '{name}': {e}")
+
+def _prepare_backup_dir(settings, directory):
+    """Create a backup directory in the container, writable by the SQL Server process"""
+    command = [
+        "docker", "exec", "-u", "0", settings.container, "sh", "-c",
+        f"mkdir -p '{directory}' && chown mssql '{BACKUP_DIR}' '{directory}'"
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise DatabaseError("Docker is not installed or not in your PATH.")
+    if result.returncode != 0:
+        raise DatabaseError(f"Cannot create {directory} in {settings.container}: {result.stderr.strip()}")
+
+def _current_schema_hash(project_root):
+    return schema_hash(find_schema_files(project_root), project_root)
+
+def _single_user(executor, database, statement):
+    """Run statement against database with everyone else disconnected
+
+    The database is put back in MULTI_USER afterwards even when statement
+    fails (a missing or unreadable backup, a full disk), so a failed restore
+    or drop never leaves it locked to one session.
+    """
+    name = quote_name(database)
+    exists = f"IF DB_ID({sql_literal(database)}) IS NOT NULL"
+    try:
+        # One script, so no other session can take the single slot between the two batches
+        executor.run_script(
+            f"{exists} ALTER DATABASE {name} SET SINGLE_USER WITH ROLLBACK IMMEDIATE;\nGO\n{statement}\n", out=None
+        )
+    finally:
+        try:
+            executor.run_script(f"{exists} ALTER DATABASE {name} SET MULTI_USER;", out=None)
+        except DatabaseError as e:
+            print_warning(f"Could not set {database} back to MULTI_USER: {e}")
+
+def _restore_database(executor, database, backup_file):
+    """Replace a database with a backup, disconnecting anyone using it"""
+    _single_user(
+        executor, database,
+        f"RESTORE DATABASE {quote_name(database)} FROM DISK = {sql_literal(backup_file)} WITH REPLACE;"
+    )
+
+def _drop_database(executor, database):
+    _single_user(executor, database, f"DROP DATABASE {quote_name(database)};")
+
+def save_snapshot(name=None, project_dir=None):
+    """Back up every user database of the project's server as snapshot name (default: baseline)"""
+    name = name or BASELINE_SNAPSHOT
+    if not SNAPSHOT_NAME_RE.match(name):
+        print_error(f"Invalid snapshot name: {name} (use letters, digits, '.', '_' and '-')")
+        return False
+
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        settings = ConnectionSettings.from_project(project_root)
+        current_hash = _current_schema_hash(project_root)
+        executor = open_executor(project_root, pool_size=1)
+    except (DatabaseError, OSError) as e:
+        print_error(str(e))
+        return False
+
+    directory = f"{BACKUP_DIR}/{name}"
+    entries = []
+    with executor:
+        try:
+            databases = [row[0] for row in executor.fetch(USER_DATABASES_SQL)]
+            if not databases:
+                print_warning("No user databases to snapshot")
+                return False
+            _prepare_backup_dir(settings, directory)
+            for number, database in enumerate(databases, 1):
+                # Files are numbered, since database names need not be valid file names
+                backup_file = f"{directory}/{number:03d}.bak"
+                print_info(f"Backing up: {database}")
+                executor.run_script(
+                    f"BACKUP DATABASE {quote_name(database)} TO DISK = {sql_literal(backup_file)} "
+                    "WITH COPY_ONLY, INIT, FORMAT;",
+                    out=None
+                )
+                entries.append({"database": database, "file": backup_file})
+        except DatabaseError as e:
+            print_error(f"Snapshot failed: {e}")
+            return False
+
+    manifest = {
+        "name": name,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "schema_hash": current_hash,
+        "databases": entries
+    }
+    manifest_path = _manifest_path(project_root, name)
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    except OSError as e:
+        print_error(f"Cannot write {manifest_path}: {e}")
+        return False
+
+    print_success(f"Snapshot '{name}' saved: {len(entries)} database(s) in {time.monotonic() - start:.1f}s")
+    return True
+
+def restore_snapshot(name=None, project_dir=None, if_current=False):
+    """Restore snapshot name (default: baseline) in place, without restarting the container
+
+    User databases created after the snapshot was taken are dropped, so the
+    server ends up as it was when the snapshot was saved. With if_current,
+    nothing is restored when schemas/*.sql changed since the snapshot.
+    """
+    name = name or BASELINE_SNAPSHOT
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        manifest = _load_manifest(project_root, name)
+        current_hash = _current_schema_hash(project_root)
+    except (DatabaseError, OSError) as e:
+        print_error(str(e))
+        return False
+
+    if manifest.get("schema_hash") != current_hash:
+        message = f"Schema files changed since snapshot '{name}' was saved"
+        if if_current:
+            print_warning(f"{message}; not restoring it")
+            return False
+        print_warning(f"{message}; restoring it anyway")
+
+    try:
+        executor = open_executor(project_root, pool_size=1)
+    except DatabaseError as e:
+        print_error(str(e))
+        return False
+
+    entries = manifest.get("databases", [])
+    with executor:
+        try:
+            snapshot_databases = {entry["database"].lower() for entry in entries}
+            for (database,) in executor.fetch(USER_DATABASES_SQL):
+                if database.lower() not in snapshot_databases:
+                    print_info(f"Dropping: {database}")
+                    _drop_database(executor, database)
+            for entry in entries:
+                print_info(f"Restoring: {entry['database']}")
+                _restore_database(executor, entry["database"], entry["file"])
+        except DatabaseError as e:
+            print_error(f"Restore failed: {e}")
+            return False
+
+    print_success(f"Snapshot '{name}' restored: {len(entries)} database(s) in {time.monotonic() - start:.1f}s")
+    return True
+
+def list_snapshots(project_dir=None):
+    """Print the project's snapshots and whether they match the current schema files"""
+    try:
+        project_root = find_project_root(project_dir)
+        current_hash = _current_schema_hash(project_root)
+    except (DatabaseError, OSError) as e:
+        print_error(str(e))
+        return False
+
+    manifests = sorted((project_root / MANIFEST_DIR).glob("*.json"))
+    if not manifests:
+        print_info("No snapshots saved")
+        return True
+    for manifest_path in manifests:
+        try:
+            manifest = _load_manifest(project_root, manifest_path.stem)
+        except DatabaseError as e:
+            print_warning(str(e))
+            continue
+        databases = ", ".join(entry["database"] for entry in manifest.get("databases", []))
+        state = "current" if manifest.get("schema_hash") == current_hash else "schema changed since"
+        print_info(f"{manifest_path.stem}: {manifest.get('created')} [{state}] - {databases}")
+    return True
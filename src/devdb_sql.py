@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+SQL Text Utilities for DevDB
+Batch splitting, tokenizing and lightweight parsing of T-SQL scripts
+"""
+
+import re
+
+# A batch separator: GO alone on its line, optionally with a repeat count and a trailing comment
+GO_LINE_RE = re.compile(r"[ \t]*GO(?:[ \t]+\d+)?[ \t]*(?:--[^\r\n]*)?(?:\r?\n|$)", re.IGNORECASE)
+
+# CREATE [OR ALTER] <kind> <optionally qualified, optionally quoted name>
+_NAME_PART = r'(?:\[[^\]]+\]|"[^"]+"|[\w@#$]+)'
+CREATE_OBJECT_RE = re.compile(
+    r"\bCREATE\s+(?:OR\s+ALTER\s+)?(TABLE|VIEW|PROCEDURE|PROC|FUNCTION|TRIGGER|SCHEMA|TYPE|SYNONYM|SEQUENCE|DATABASE)\s+"
+    r"(" + _NAME_PART + r"(?:\s*\.\s*" + _NAME_PART + r"){0,2})",
+    re.IGNORECASE
+)
+
+# Any identifier, optionally qualified, and USE <database>
+IDENTIFIER_RE = re.compile(_NAME_PART + r"(?:\s*\.\s*" + _NAME_PART + r")*")
+USE_RE = re.compile(r"\bUSE\s+(" + _NAME_PART + r")", re.IGNORECASE)
+
+# Characters that open comments, literals or quoted identifiers, plus line breaks
+_SCAN_RE = re.compile(r"--|/\*|'|\"|\[|\n")
+_BLOCK_COMMENT_RE = re.compile(r"/\*|\*/")
+
+def _skip_delimited(text, pos, closer):
+    """Return the position after a literal opened just before pos; doubled closers are escapes"""
+    while True:
+        end = text.find(closer, pos)
+        if end == -1:
+            return len(text)
+        if text.startswith(closer, end + 1):
+            pos = end + 2
+            continue
+        return end + 1
+
+def _skip_block_comment(text, pos):
+    """Return the position after a (possibly nested) block comment opened just before pos"""
+    depth = 1
+    while depth:
+        match = _BLOCK_COMMENT_RE.search(text, pos)
+        if not match:
+            return len(text)
+        depth += 1 if match.group() == "/*" else -1
+        pos = match.end()
+    return pos
+
+def split_batches(sql_content):
+    """Split a script into (batch, separator) pairs the way sqlcmd does
+
+    GO is only recognised at the start of a line outside comments, string
+    literals and quoted identifiers. Separators are returned verbatim, so
+    ''.join(batch + separator for batch, separator in pairs) == sql_content.
+    """
+    batches = []
+    batch_start = 0
+    pos = 0
+    at_line_start = True
+    length = len(sql_content)
+
+    while pos <= length:
+        if at_line_start:
+            match = GO_LINE_RE.match(sql_content, pos)
+            if match and match.end() > pos:
+                batches.append((sql_content[batch_start:pos], match.group()))
+                pos = batch_start = match.end()
+                if pos >= length:
+                    break
+                continue
+            at_line_start = False
+
+        match = _SCAN_RE.search(sql_content, pos)
+        if not match:
+            break
+        token = match.group()
+        pos = match.end()
+        if token == "\n":
+            at_line_start = True
+        elif token == "--":
+            newline = sql_content.find("\n", pos)
+            pos = length if newline == -1 else newline
+        elif token == "/*":
+            pos = _skip_block_comment(sql_content, pos)
+        elif token == "[":
+            pos = _skip_delimited(sql_content, pos, "]")
+        else:
+            pos = _skip_delimited(sql_content, pos, token)
+
+    if batch_start < length or not batches:
+        batches.append((sql_content[batch_start:], ""))
+    return batches
+
+def mask_comments_and_strings(sql_content):
+    """Blank out comments and string literals, keeping offsets and line breaks intact"""
+    pieces = []
+    last = 0
+    pos = 0
+    length = len(sql_content)
+
+    while pos < length:
+        match = _SCAN_RE.search(sql_content, pos)
+        if not match:
+            break
+        token = match.group()
+        start = match.start()
+        pos = match.end()
+        if token == "--":
+            newline = sql_content.find("\n", pos)
+            pos = length if newline == -1 else newline
+        elif token == "/*":
+            pos = _skip_block_comment(sql_content, pos)
+        elif token == "'":
+            pos = _skip_delimited(sql_content, pos, "'")
+        elif token == "[":
+            pos = _skip_delimited(sql_content, pos, "]")
+            continue
+        elif token == '"':
+            pos = _skip_delimited(sql_content, pos, '"')
+            continue
+        else:
+            continue
+        pieces.append(sql_content[last:start])
+        pieces.append(re.sub(r"[^\n]", " ", sql_content[start:pos]))
+        last = pos
+
+    pieces.append(sql_content[last:])
+    return "".join(pieces)
+
+def split_name(qualified_name):
+    """Split [db].[schema].[name] / schema.name / name into (schema, name), unquoted"""
+    parts = [part.strip().strip('[]"') for part in re.findall(_NAME_PART, qualified_name)]
+    if len(parts) == 1:
+        return "dbo", parts[0]
+    return parts[-2], parts[-1]
+
+def find_objects(batch):
+    """Return (kind, schema, name) for each object a batch creates, in order; temp tables are skipped"""
+    objects = []
+    for match in CREATE_OBJECT_RE.finditer(mask_comments_and_strings(batch)):
+        if match.group(2).lstrip('["').startswith("#"):
+            continue
+        kind = match.group(1).upper()
+        if kind == "PROC":
+            kind = "PROCEDURE"
+        if kind in ("DATABASE", "SCHEMA"):
+            objects.append((kind, None, split_name(match.group(2))[1]))
+        else:
+            objects.append((kind,) + split_name(match.group(2)))
+    return objects
+
+def find_references(batch):
+    """Lower-cased name parts of every identifier a batch mentions outside comments and literals"""
+    references = set()
+    for match in IDENTIFIER_RE.finditer(mask_comments_and_strings(batch)):
+        for part in re.findall(_NAME_PART, match.group()):
+            references.add(part.strip('[]"').lower())
+    return references
+
+def find_database(batch):
+    """The database the last USE statement of a batch switches to, or None"""
+    matches = USE_RE.findall(mask_comments_and_strings(batch))
+    return matches[-1].strip('[]"') if matches else None
+
+# One token: whitespace, a line break, a comment, the opening of a block comment, a string
+# literal or quoted identifier, a variable, a word, a number or any other single character
+_TOKEN_RE = re.compile(
+    r"(?P<space>[ \t\r\f\v]+)|(?P<newline>\n)|(?P<comment>--[^\n]*)|(?P<block>/\*)"
+    r"|(?P<string>[Nn]?')|(?P<quoted>[\[\"])|(?P<variable>@@?[\w@#$]*)|(?P<word>[^\W\d][\w@#$]*|#[\w@#$]*)"
+    r"|(?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)|(?P<symbol>.)"
+)
+
+class Token:
+    """One token of a script; start and end are offsets into it, line is 1-based"""
+
+    def __init__(self, kind, text, start, end, line):
+        self.kind = kind
+        self.text = text
+        self.start = start
+        self.end = end
+        self.line = line
+
+    def is_word(self, *words):
+        return self.kind == "word" and self.text.upper() in words
+
+    @property
+    def name(self):
+        """The identifier a word or quoted identifier stands for"""
+        if self.kind == "quoted":
+            closer = "]" if self.text.startswith("[") else '"'
+            return self.text[1:-1].replace(closer * 2, closer)
+        return self.text
+
+def tokenize(sql_content):
+    """Yield the tokens of a script one at a time, in a single pass
+
+    Whitespace and line breaks are skipped. Comments, string literals and
+    quoted identifiers come out whole, and a batch separator line, as
+    split_batches recognises it, comes out as one "go" token.
+    """
+    pos = 0
+    line = 1
+    at_line_start = True
+    length = len(sql_content)
+
+    while pos < length:
+        if at_line_start:
+            match = GO_LINE_RE.match(sql_content, pos)
+            if match and match.end() > pos:
+                yield Token("go", match.group(), pos, match.end(), line)
+                line += match.group().count("\n")
+                pos = match.end()
+                continue
+            at_line_start = False
+
+        match = _TOKEN_RE.match(sql_content, pos)
+        kind = match.lastgroup
+        end = match.end()
+        if kind == "block":
+            kind = "comment"
+            end = _skip_block_comment(sql_content, end)
+        elif kind == "string":
+            end = _skip_delimited(sql_content, end, "'")
+        elif kind == "quoted":
+            end = _skip_delimited(sql_content, end, "]" if match.group() == "[" else '"')
+
+        if kind == "newline":
+            at_line_start = True
+        elif kind != "space":
+            yield Token(kind, sql_content[pos:end], pos, end, line)
+        line += sql_content.count("\n", pos, end)
+        pos = end
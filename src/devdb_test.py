@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+DevDB Test Runner
+'devdb test': installs the tSQLt test classes in tests/*.sql and runs them in parallel,
+one cloned database per worker, reporting per-test timings as JUnit XML
+"""
+
+import re
+import json
+import time
+import queue
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import DEFAULT_DATABASE, DatabaseError, expand_includes, find_project_root, open_executor, quote_name
+    from .devdb_schema import sql_literal
+    from .devdb_sql import find_database, mask_comments_and_strings
+    from .devdb_utils import print_error, print_success, print_info, print_warning
+    from . import devdb_trace as trace
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import DEFAULT_DATABASE, DatabaseError, expand_includes, find_project_root, open_executor, quote_name
+    from devdb_schema import sql_literal
+    from devdb_sql import find_database, mask_comments_and_strings
+    from devdb_utils import print_error, print_success, print_info, print_warning
+    import devdb_trace as trace
+
+TEST_DIR = "tests"
+DEFAULT_JUNIT_FILE = "output/test-results.xml"
+SLOWEST_TESTS = 10
+
+# Test durations from the previous run; the slowest classes are started first
+TIMINGS_FILE = ".devdb/cache/test-timings.json"
+
+# EXEC tSQLt.NewTestClass [@ClassName =] 'Name'
+NEW_TEST_CLASS_RE = re.compile(r"\btSQLt\.NewTestClass\s+(?:@ClassName\s*=\s*)?N?'((?:[^']|'')+)'", re.IGNORECASE)
+
+# tSQLt.Run starts by emptying tSQLt.TestResult, so a database runs one class at a time
+RUN_CLASS_SQL = "EXEC tSQLt.Run @TestName = {name}, @TestResultFormatter = N'tSQLt.NullTestResultFormatter';"
+RESULTS_SQL = (
+    "SELECT Class, TestCase, Result, Msg, DATEDIFF(MILLISECOND, TestStartTime, ISNULL(TestEndTime, TestStartTime)) "
+    "FROM tSQLt.TestResult ORDER BY Id"
+)
+
+class TestClass:
+    """A tSQLt test class, the database it lives in and the file that creates it"""
+
+    def __init__(self, name, database, file_path):
+        self.name = name
+        self.database = database
+        self.file_path = file_path
+
+class TestCase:
+    """The outcome of one test"""
+
+    def __init__(self, class_name, name, result, message, milliseconds):
+        self.class_name = class_name
+        self.name = name
+        self.result = result
+        self.message = message
+        self.milliseconds = milliseconds
+
+    @property
+    def failed(self):
+        return self.result in ("Failure", "Error")
+
+def find_test_files(project_root, paths=None):
+    """Test files to run: the given files and directories, or every .sql file under tests/"""
+    files = []
+    for path in [Path(path) for path in paths] if paths else [Path(project_root) / TEST_DIR]:
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.sql")))
+        elif path.exists():
+            files.append(path)
+        else:
+            raise DatabaseError(f"Test file not found: {path}")
+    return files
+
+def discover_classes(test_file, sql_content):
+    """The test classes a file creates with tSQLt.NewTestClass, each in the database USEd before it"""
+    masked = mask_comments_and_strings(sql_content)
+    classes = []
+    for match in NEW_TEST_CLASS_RE.finditer(sql_content):
+        # Skip calls inside comments; the class name itself is a literal, so compare the start only
+        if masked[match.start():match.start() + 5] != sql_content[match.start():match.start() + 5]:
+            continue
+        database = find_database(sql_content[:match.start()]) or DEFAULT_DATABASE
+        classes.append(TestClass(match.group(1).replace("''", "'"), database, test_file))
+    return classes
+
+def clone_database(executor, database, count):
+    """Restore count copies of database from a fresh backup; returns their names"""
+    rows = executor.fetch(
+        "SELECT CAST(SERVERPROPERTY('InstanceDefaultBackupPath') AS NVARCHAR(4000)), CAST(is_trustworthy_on AS INT) "
+        f"FROM sys.databases WHERE name = {sql_literal(database)}"
+    )
+    if not rows:
+        raise DatabaseError(f"Database not found: {database}")
+    backup_dir, trustworthy = rows[0]
+    separator = "\\" if "\\" in backup_dir else "/"
+    backup_file = backup_dir.rstrip("/\\") + separator + "devdb_test_" + re.sub(r"\W", "_", database) + ".bak"
+
+    executor.run_script(
+        f"BACKUP DATABASE {quote_name(database)} TO DISK = {sql_literal(backup_file)} WITH COPY_ONLY, INIT, FORMAT;",
+        out=None
+    )
+    try:
+        return _restore_clones(executor, database, count, backup_file, trustworthy == "1")
+    finally:
+        # The backup is only needed until the clones are restored; it is a full copy of the database
+        try:
+            executor.run_script(f"EXEC master.sys.xp_delete_file 0, {sql_literal(backup_file)};", out=None)
+        except DatabaseError as e:
+            print_warning(f"Could not delete {backup_file}: {e}")
+
+def _restore_clones(executor, database, count, backup_file, trustworthy):
+    """Restore count copies of database from backup_file, concurrently; returns their names"""
+    files = executor.fetch(f"RESTORE FILELISTONLY FROM DISK = {sql_literal(backup_file)}")
+
+    def restore(clone):
+        moves = []
+        for logical_name, physical_name in (row[:2] for row in files):
+            cut = max(physical_name.rfind("/"), physical_name.rfind("\\"))
+            extension = Path(physical_name[cut + 1:]).suffix
+            target = physical_name[:cut + 1] + clone + "_" + logical_name + extension
+            moves.append(f"MOVE {sql_literal(logical_name)} TO {sql_literal(target)}")
+        script = f"RESTORE DATABASE {quote_name(clone)} FROM DISK = {sql_literal(backup_file)} WITH REPLACE, {', '.join(moves)};"
+        if trustworthy:
+            # Restored databases are never trustworthy; tSQLt's CLR may rely on it
+            script += f"\nGO\nALTER DATABASE {quote_name(clone)} SET TRUSTWORTHY ON;"
+        executor.run_script(script, out=None)
+        return clone
+
+    clones = [f"{database}__devdb_test_{number}" for number in range(1, count + 1)]
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        return list(pool.map(restore, clones))
+
+def drop_databases(executor, names):
+    """Drop the given databases, disconnecting anyone still using them"""
+    for name in names:
+        try:
+            executor.run_script(
+                f"IF DB_ID({sql_literal(name)}) IS NOT NULL BEGIN\n"
+                f"    ALTER DATABASE {quote_name(name)} SET SINGLE_USER WITH ROLLBACK IMMEDIATE;\n"
+                f"    DROP DATABASE {quote_name(name)};\nEND",
+                out=None
+            )
+        except DatabaseError as e:
+            print_warning(f"Could not drop {name}: {e}")
+
+def run_class(executor, test_class, database):
+    """Run one test class in database and return its test cases"""
+    start = time.monotonic()
+    try:
+        with trace.span("test.class", test_class=test_class.name, database=database):
+            executor.run_script(RUN_CLASS_SQL.format(name=sql_literal(quote_name(test_class.name))), database, out=None)
+            rows = executor.fetch(RESULTS_SQL, database)
+            trace.count("tests", len(rows))
+    except DatabaseError as e:
+        milliseconds = int((time.monotonic() - start) * 1000)
+        return [TestCase(test_class.name, "(class)", "Error", str(e), milliseconds)]
+    return [
+        TestCase(class_name, name, result or "Error", message or "", int(milliseconds or 0))
+        for class_name, name, result, message, milliseconds in rows
+    ]
+
+def load_timings(project_root):
+    try:
+        with open(Path(project_root) / TIMINGS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_timings(project_root, cases):
+    totals = {}
+    for case in cases:
+        totals[case.class_name] = totals.get(case.class_name, 0) + case.milliseconds
+    timings = load_timings(project_root)
+    timings.update(totals)
+    path = Path(project_root) / TIMINGS_FILE
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, indent=2, sort_keys=True)
+    except OSError:
+        pass
+
+def write_junit(cases, path, seconds):
+    """Write test cases as a JUnit XML report, one testsuite per class"""
+    def counts(group):
+        return {
+            "tests": str(len(group)),
+            "failures": str(sum(case.result == "Failure" for case in group)),
+            "errors": str(sum(case.result == "Error" for case in group)),
+            "skipped": str(sum(case.result == "Skipped" for case in group)),
+        }
+
+    suites = ET.Element("testsuites", name="tSQLt", time=f"{seconds:.3f}", **counts(cases))
+    by_class = {}
+    for case in cases:
+        by_class.setdefault(case.class_name, []).append(case)
+    for class_name, group in by_class.items():
+        suite_time = sum(case.milliseconds for case in group) / 1000
+        suite = ET.SubElement(suites, "testsuite", name=class_name, time=f"{suite_time:.3f}", **counts(group))
+        for case in group:
+            element = ET.SubElement(
+                suite, "testcase", classname=class_name, name=case.name, time=f"{case.milliseconds / 1000:.3f}"
+            )
+            if case.result in ("Failure", "Error", "Skipped"):
+                child = ET.SubElement(element, case.result.lower(), message=case.message)
+                child.text = case.message
+
+    if hasattr(ET, "indent"):
+        ET.indent(suites)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    ET.ElementTree(suites).write(path, encoding="utf-8", xml_declaration=True)
+
+def execute_tests(project_root, paths=None, jobs=None):
+    """Install the test files and run their tSQLt classes in parallel; returns the classes and their cases
+
+    Every file is executed once to (re)create its classes. With more than one
+    job, each worker runs classes in its own copy of the database, restored
+    from a backup taken after installation, since tSQLt keeps its results in
+    a table that every run clears.
+    """
+    test_files = find_test_files(project_root, paths)
+    sources = {}
+    classes = []
+    with trace.span("test.discover", files=len(test_files)):
+        for test_file in test_files:
+            sources[test_file] = expand_includes(test_file.read_text(encoding='utf-8-sig'), project_root)
+            trace.count("bytes.read", test_file.stat().st_size)
+            classes.extend(discover_classes(test_file, sources[test_file]))
+    if not classes:
+        return classes, []
+    executor = open_executor(project_root, pool_size=jobs)
+
+    cases = []
+    cases_lock = threading.Lock()
+    with executor:
+        print_info(f"Installing {len(classes)} test class(es) from {len(test_files)} file(s) using {executor.description}")
+
+        def install(test_file):
+            try:
+                with trace.span("test.install", file=test_file.name):
+                    executor.run_script(sources[test_file], out=None)
+                return None
+            except DatabaseError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=executor.size) as pool:
+            install_errors = dict(zip(test_files, pool.map(install, test_files)))
+
+        runnable = []
+        for test_class in classes:
+            error = install_errors[test_class.file_path]
+            if error:
+                print_error(f"Install failed: {test_class.file_path} - {error}")
+                cases.append(TestCase(test_class.name, "(install)", "Error", error, 0))
+            else:
+                runnable.append(test_class)
+
+        # Slowest classes first, so the last class to finish is a short one
+        timings = load_timings(project_root)
+        runnable.sort(key=lambda test_class: -timings.get(test_class.name, 0))
+
+        by_database = {}
+        for test_class in runnable:
+            by_database.setdefault(test_class.database, []).append(test_class)
+
+        for database, database_classes in by_database.items():
+            workers = min(executor.size, len(database_classes))
+            clones = []
+            if workers > 1:
+                try:
+                    print_info(f"Cloning {database} for {workers} workers...")
+                    with trace.span("test.clone", database=database, copies=workers):
+                        clones = clone_database(executor, database, workers)
+                except DatabaseError as e:
+                    print_warning(f"Cannot clone {database}, running its classes one at a time: {e}")
+                    drop_databases(executor, [f"{database}__devdb_test_{n}" for n in range(1, workers + 1)])
+                    clones = []
+            targets = clones or [database]
+
+            work = queue.Queue()
+            for test_class in database_classes:
+                work.put(test_class)
+
+            def worker(target):
+                while True:
+                    try:
+                        test_class = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    class_cases = run_class(executor, test_class, target)
+                    failed = sum(case.failed for case in class_cases)
+                    with cases_lock:
+                        cases.extend(class_cases)
+                        if failed:
+                            print_error(f"{test_class.name}: {failed} of {len(class_cases)} test(s) failed")
+                        else:
+                            print_success(f"{test_class.name}: {len(class_cases)} test(s) passed")
+
+            try:
+                with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+                    list(pool.map(worker, targets))
+            finally:
+                drop_databases(executor, clones)
+
+    return classes, cases
+
+def run_tests(paths=None, project_dir=None, jobs=None, junit_file=None, slowest=None):
+    """Run the project's tSQLt tests (see execute_tests), then report them and write the JUnit file"""
+    if slowest is None:
+        slowest = SLOWEST_TESTS
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        classes, cases = execute_tests(project_root, paths, jobs)
+    except (DatabaseError, OSError) as e:
+        print_error(str(e))
+        return False
+
+    if not classes:
+        print_warning("No tSQLt test classes found (tSQLt.NewTestClass)")
+        return True
+
+    seconds = time.monotonic() - start
+    save_timings(project_root, cases)
+    junit_path = Path(junit_file) if junit_file else project_root / DEFAULT_JUNIT_FILE
+    try:
+        write_junit(cases, junit_path, seconds)
+        print_info(f"JUnit report: {junit_path}")
+    except OSError as e:
+        print_warning(f"Cannot write {junit_path}: {e}")
+
+    failures = [case for case in cases if case.failed]
+    for case in failures:
+        print_error(f"{case.result}: [{case.class_name}].[{case.name}] - {case.message}")
+
+    if slowest:
+        print_info("Slowest tests:")
+        for case in sorted(cases, key=lambda case: -case.milliseconds)[:slowest]:
+            print(f"  {case.milliseconds / 1000:8.3f}s  [{case.class_name}].[{case.name}]")
+
+    summary = f"{len(cases)} test(s), {len(failures)} failed, in {seconds:.1f}s"
+    if failures:
+        print_error(summary)
+        return False
+    print_success(summary)
+    return True
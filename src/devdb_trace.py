@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+DevDB Tracing
+Nested timing spans and counters (bytes read, rows affected, tokens sent, ...) for profiling devdb
+commands and the project scripts. Tracing is off unless started with a file, from --trace or the
+DEVDB_TRACE environment variable; the spans are then written as a Chrome trace (open it in
+chrome://tracing or https://ui.perfetto.dev) or, for a .jsonl file, as one JSON object per line.
+
+Shared by the devdb CLI and the project scripts: src/devdb_trace.py is copied to
+src/templates/advanced/.devdb/scripts/devdb_trace.py and must stay identical.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+
+# Set by devdb.sh and other wrappers so every devdb process they run adds to one trace
+TRACE_ENV = "DEVDB_TRACE"
+
+class _NullSpan:
+    """What span() returns while tracing is off: nothing is timed or recorded"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class Span:
+    """A timed region; counters added while it is the innermost open span on its thread land on it"""
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.counters = {}
+        self.start = None
+
+    def set(self, **attrs):
+        """Attach attributes known only once the work is under way"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        stack = self.tracer._stack()
+        # Coroutines sharing a thread can close their spans out of order
+        if self in stack:
+            stack.remove(self)
+        if exc_type is not None:
+            self.attrs["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._finish(self, end)
+        return False
+
+class Tracer:
+    """Collects the spans of this process and adds them to the trace at path
+
+    Events are added to what the file already holds, so a script running
+    several devdb processes ends up with one trace.
+    """
+
+    def __init__(self, path, process_name=None):
+        self.path = path
+        self.pid = os.getpid()
+        self.events = []
+        self.totals = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # Wall-clock anchor, so spans from different processes line up in one trace
+        self.epoch = time.time() - time.perf_counter()
+        self.process_name = process_name or os.path.basename(sys.argv[0] or "python")
+
+    def _stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def _timestamp(self, perf):
+        return int((self.epoch + perf) * 1_000_000)
+
+    def _finish(self, span, end):
+        args = dict(span.attrs)
+        args.update(span.counters)
+        event = {
+            "name": span.name, "ph": "X", "ts": self._timestamp(span.start),
+            "dur": int((end - span.start) * 1_000_000), "pid": self.pid, "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            self.events.append(event)
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def count(self, name, value=1):
+        stack = self._stack()
+        with self.lock:
+            if stack:
+                stack[-1].counters[name] = stack[-1].counters.get(name, 0) + value
+            self.totals[name] = self.totals.get(name, 0) + value
+
+    def trace_events(self):
+        with self.lock:
+            events = list(self.events)
+            totals = dict(self.totals)
+        metadata = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": self.process_name}}]
+        if totals:
+            # One counter sample with the process totals, shown as a track of its own
+            end = max((event["ts"] + event["dur"] for event in events), default=self._timestamp(time.perf_counter()))
+            metadata.append({"name": "totals", "ph": "C", "ts": end, "pid": self.pid, "args": totals})
+        return metadata + sorted(events, key=lambda event: event["ts"])
+
+    def save(self):
+        """Write the trace; .jsonl files get one event per line, anything else the Chrome trace format"""
+        events = self.trace_events()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self.path.endswith(".jsonl"):
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json.dumps(event) + "\n")
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                existing = json.load(f).get("traceEvents", [])
+        except (OSError, ValueError, AttributeError):
+            existing = []
+        temp_path = f"{self.path}.{self.pid}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": existing + events, "displayTimeUnit": "ms"}, f)
+        os.replace(temp_path, self.path)
+
+_tracer = None
+
+def start(path=None, process_name=None):
+    """Start tracing to path, else to $DEVDB_TRACE; does nothing when neither is set
+
+    A path given here starts a new trace; one from the environment is added
+    to, since it is shared by every process of the run. The trace is written
+    at exit.
+    """
+    global _tracer
+    if _tracer is not None:
+        return _tracer
+    if path:
+        path = os.path.abspath(path)
+        if os.path.exists(path):
+            os.remove(path)
+    else:
+        if not os.environ.get(TRACE_ENV):
+            return None
+        path = os.path.abspath(os.environ[TRACE_ENV])
+    _tracer = Tracer(path, process_name=process_name)
+    # Child processes (devdb.sh running devdb, the polisher's helpers) add to the same file
+    os.environ[TRACE_ENV] = _tracer.path
+    atexit.register(stop)
+    return _tracer
+
+def stop():
+    """Write the trace and stop tracing"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return
+    try:
+        tracer.save()
+    except OSError as e:
+        sys.stderr.write(f"Cannot write trace {tracer.path}: {e}\n")
+
+def enabled():
+    return _tracer is not None
+
+def span(name, **attrs):
+    """Time a block: with span("schema.unit", unit=label): ..."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, **attrs)
+
+def count(name, value=1):
+    """Add value to a counter on the current span and to the process totals"""
+    if _tracer is not None:
+        _tracer.count(name, value)
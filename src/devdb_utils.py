@@ -5,10 +5,9 @@ Common utilities for the DevDB CLI tool
 """
 
 import os
+import re
 import sys
-import shutil
-import subprocess
-from pathlib import Path
+import functools
 
 # Color output helpers
 def print_color(text, color_code):
@@ -30,8 +29,12 @@ def print_info(text):
 def print_header(text):
     print_color(f"\n🚀 {text}", "36")
 
+# Environment probes fork processes; each runs once per CLI invocation, however many projects it creates
+@functools.lru_cache(maxsize=None)
 def check_docker():
     """Check if Docker is installed and running"""
+    # Imported here, not at module level, to keep 'devdb version' and --help fast
+    import subprocess
     try:
         # Check if docker command exists
         subprocess.run(['docker', '--version'], 
@@ -53,6 +56,7 @@ def check_docker():
         print_error("Docker command failed. Please check your Docker installation.")
         return False
 
+@functools.lru_cache(maxsize=None)
 def check_python_dependencies():
     """Check if required Python packages are available"""
     required_packages = ['sqlparse']
@@ -87,6 +91,9 @@ def download_tsqlt(target_dir):
     
     for filename in placeholder_files:
         file_path = tsqlt_dir / filename
+        if file_path.exists():
+            # Shipped with the template; never replace the real framework with a placeholder
+            continue
         if filename == "tSQLt.class.sql":
             # Create a minimal tSQLt installation script
             file_path.write_text("""-- tSQLt Testing Framework Installation
@@ -125,29 +132,89 @@ def generate_strong_password():
     
     return ''.join(password_list)
 
+# {{NAME}} placeholders; split() on it alternates literal text and variable names
+TEMPLATE_VARIABLE_RE = re.compile(r"\{\{(\w+)\}\}")
+TEMPLATE_VARIABLE_BYTES_RE = re.compile(rb"\{\{\w+\}\}")
+
+class Template:
+    """A template parsed once into literal runs and variable slots"""
+
+    def __init__(self, content):
+        # Even indexes are literal text, odd indexes variable names
+        self.parts = TEMPLATE_VARIABLE_RE.split(content)
+
+    @property
+    def has_variables(self):
+        return len(self.parts) > 1
+
+    def render(self, variables):
+        """Fill the slots in a single pass; unknown variables are left as they are"""
+        rendered = self.parts[:]
+        for index in range(1, len(rendered), 2):
+            name = rendered[index]
+            rendered[index] = str(variables[name]) if name in variables else f"{{{{{name}}}}}"
+        return "".join(rendered)
+
+# Parsed templates keyed by source path, size and mtime; None for files without placeholders
+_template_cache = {}
+
+def load_template(src_path):
+    """The parsed template for a file, or None when it has no placeholders to fill"""
+    stat = os.stat(src_path)
+    key = (os.fspath(src_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _template_cache:
+        with open(src_path, 'rb') as f:
+            data = f.read()
+        # Scan the raw bytes first; only decode files that actually contain placeholders
+        if TEMPLATE_VARIABLE_BYTES_RE.search(data):
+            _template_cache[key] = Template(data.decode('utf-8'))
+        else:
+            _template_cache[key] = None
+    return _template_cache[key]
+
+def copy_file_contents(src_path, dest_path):
+    """Copy a file's bytes, in the kernel where the platform allows it"""
+    with open(src_path, 'rb') as src, open(dest_path, 'wb') as dest:
+        remaining = os.fstat(src.fileno()).st_size
+        copy_range = getattr(os, 'copy_file_range', None)
+        try:
+            while remaining > 0:
+                if copy_range:
+                    copied = copy_range(src.fileno(), dest.fileno(), remaining)
+                else:
+                    copied = os.sendfile(dest.fileno(), src.fileno(), None, remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except (AttributeError, OSError):
+            # No copy_file_range or sendfile for these files (other platforms, some filesystems)
+            import shutil
+            src.seek(0)
+            dest.seek(0)
+            dest.truncate()
+            shutil.copyfileobj(src, dest)
+
 def replace_template_variables(content, variables):
     """Replace template variables in content string"""
-    for key, value in variables.items():
-        placeholder = f"{{{{{key}}}}}"
-        content = content.replace(placeholder, str(value))
-    return content
+    return Template(content).render(variables)
 
 def copy_and_process_template(src_path, dest_path, variables):
-    """Copy template file and replace variables"""
-    # Read template content
-    with open(src_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Replace variables
-    processed_content = replace_template_variables(content, variables)
-    
-    # Write to destination
+    """Copy template file and replace variables
+
+    Files without placeholders are copied byte for byte without being decoded.
+    """
+    template = load_template(src_path)
     dest_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(dest_path, 'w', encoding='utf-8') as f:
-        f.write(processed_content)
+    if template is None:
+        copy_file_contents(src_path, dest_path)
+        return
+    with open(dest_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(template.render(variables))
 
+@functools.lru_cache(maxsize=None)
 def get_git_user_info():
     """Get git user name and email if available"""
+    import subprocess
     try:
         name_result = subprocess.run(['git', 'config', 'user.name'], 
                                    capture_output=True, text=True, check=True)
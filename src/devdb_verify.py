@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+DevDB Object Verification
+'devdb verify': checks that every object schemas/*.sql creates exists on the server, with one
+set-based query against the catalog views of each database
+"""
+
+import json
+import time
+from pathlib import Path
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import DatabaseError, find_project_root, open_executor, quote_name
+    from .devdb_schema import find_schema_files, plan_deployment, schema_hash, sql_literal
+    from .devdb_utils import print_error, print_success, print_info, print_warning
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import DatabaseError, find_project_root, open_executor, quote_name
+    from devdb_schema import find_schema_files, plan_deployment, schema_hash, sql_literal
+    from devdb_utils import print_error, print_success, print_info, print_warning
+
+# The expected objects, derived from the schema files and reused while they are unchanged
+MANIFEST_FILE = ".devdb/cache/expected-objects.json"
+
+# sys.objects types each kind of CREATE can produce
+OBJECT_TYPES = {
+    "TABLE": "U",
+    "VIEW": "V",
+    "PROCEDURE": "P,PC,X",
+    "FUNCTION": "FN,IF,TF,FS,FT,AF",
+    "TRIGGER": "TR,TA",
+    "SYNONYM": "SN",
+    "SEQUENCE": "SO",
+}
+
+# Marks the expected objects found in one database; run through EXEC so a missing database
+# is skipped at run time rather than failing the whole batch when it is compiled. Catalog
+# names are compared in the collation of the temporary table, whatever the database's is.
+_FIND_IN_DATABASE_SQL = """UPDATE e SET found = 1 FROM #devdb_expected e
+WHERE e.db = {db_literal} AND e.found = 0 AND (
+    (e.kind = N'SCHEMA' AND EXISTS (
+        SELECT 1 FROM {db}.sys.schemas s WHERE s.name COLLATE DATABASE_DEFAULT = e.name))
+    OR (e.kind = N'TYPE' AND EXISTS (
+        SELECT 1 FROM {db}.sys.types t JOIN {db}.sys.schemas s ON s.schema_id = t.schema_id
+        WHERE t.is_user_defined = 1 AND t.name COLLATE DATABASE_DEFAULT = e.name
+        AND s.name COLLATE DATABASE_DEFAULT = e.sch))
+    OR EXISTS (
+        SELECT 1 FROM {db}.sys.objects o JOIN {db}.sys.schemas s ON s.schema_id = o.schema_id
+        WHERE o.name COLLATE DATABASE_DEFAULT = e.name AND s.name COLLATE DATABASE_DEFAULT = e.sch
+        AND N',' + e.types + N',' LIKE N'%,' + RTRIM(o.type) COLLATE DATABASE_DEFAULT + N',%'))"""
+
+def expected_objects(project_root):
+    """(database, kind, schema, name) of every object the schema files create, once each"""
+    seen = {}
+    for unit in plan_deployment(find_schema_files(project_root), project_root):
+        for kind, schema, name in unit.objects:
+            if kind == "DATABASE":
+                entry = (None, kind, None, name)
+            elif kind == "SCHEMA":
+                entry = (unit.database, kind, None, name)
+            else:
+                entry = (unit.database, kind, schema or "dbo", name)
+            seen.setdefault(tuple((part or "").lower() for part in entry), entry)
+    return list(seen.values())
+
+def load_expected(project_root, manifest_file=None):
+    """The expected objects, from manifest_file if given, else from the cached manifest of the schemas
+
+    The cached manifest is rebuilt whenever the schema files (includes
+    expanded) no longer match the hash it was built from.
+    """
+    if manifest_file:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return [tuple(entry) for entry in json.load(f)["objects"]]
+
+    current_hash = schema_hash(find_schema_files(project_root), project_root)
+    manifest_path = Path(project_root) / MANIFEST_FILE
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("schema_hash") == current_hash:
+            return [tuple(entry) for entry in manifest["objects"]]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    objects = expected_objects(project_root)
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({"schema_hash": current_hash, "objects": objects}, f, indent=1)
+    except OSError as e:
+        print_warning(f"Cannot save {manifest_path}: {e}")
+    return objects
+
+def verify_query(objects):
+    """One batch returning the (database, kind, schema, name) of the expected objects that do not exist"""
+    rows = ",\n".join(
+        "(" + ", ".join("NULL" if part is None else sql_literal(part) for part in entry) + ", "
+        + sql_literal(OBJECT_TYPES.get(entry[1], "")) + ")"
+        for entry in objects
+    )
+    databases = {}
+    for database, kind, _, _ in objects:
+        if database:
+            databases.setdefault(database.lower(), database)
+    lookups = []
+    for database in databases.values():
+        lookup = _FIND_IN_DATABASE_SQL.format(db=quote_name(database), db_literal=sql_literal(database))
+        lookups.append(f"IF DB_ID({sql_literal(database)}) IS NOT NULL EXEC({sql_literal(lookup)});")
+    return (
+        "SET NOCOUNT ON;\n"
+        "IF OBJECT_ID(N'tempdb..#devdb_expected') IS NOT NULL DROP TABLE #devdb_expected;\n"
+        "CREATE TABLE #devdb_expected (db SYSNAME COLLATE DATABASE_DEFAULT NULL, kind NVARCHAR(16) NOT NULL, "
+        "sch SYSNAME COLLATE DATABASE_DEFAULT NULL, name SYSNAME COLLATE DATABASE_DEFAULT NOT NULL, "
+        "types NVARCHAR(32) COLLATE DATABASE_DEFAULT NOT NULL, found BIT NOT NULL DEFAULT 0);\n"
+        "INSERT INTO #devdb_expected (db, kind, sch, name, types)\n"
+        f"SELECT db, kind, sch, name, types FROM (VALUES\n{rows}\n) AS v (db, kind, sch, name, types);\n"
+        "UPDATE #devdb_expected SET found = 1 WHERE kind = N'DATABASE' AND DB_ID(name) IS NOT NULL;\n"
+        + "\n".join(lookups) + "\n"
+        "SELECT db, kind, sch, name FROM #devdb_expected WHERE found = 0 ORDER BY db, kind, sch, name;\n"
+        "DROP TABLE #devdb_expected;"
+    )
+
+def find_missing(executor, objects):
+    """The expected objects that are not on the server, in one round trip"""
+    if not objects:
+        return []
+    return [tuple(row) for row in executor.fetch(verify_query(objects))]
+
+def describe(entry):
+    database, kind, schema, name = entry
+    return f"{kind.lower()} " + ".".join(part for part in (database, schema, name) if part)
+
+def verify_objects(project_dir=None, manifest_file=None):
+    """Check every expected object exists; True if none is missing"""
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        objects = load_expected(project_root, manifest_file)
+        executor = open_executor(project_root, pool_size=1)
+        with executor:
+            missing = find_missing(executor, objects)
+    except (DatabaseError, OSError, ValueError, KeyError) as e:
+        print_error(f"Cannot verify objects: {e}")
+        return False
+
+    seconds = time.monotonic() - start
+    if not objects:
+        print_warning("No objects found in schemas/*.sql")
+        return True
+    databases = len({database.lower() for database, _, _, _ in objects if database})
+    print_info(f"Checked {len(objects)} object(s) across {databases} database(s) in {seconds:.2f}s")
+    for entry in missing:
+        print_error(f"Missing {describe(entry)}")
+    if missing:
+        print_error(f"{len(missing)} of {len(objects)} object(s) missing")
+        return False
+    print_success(f"All {len(objects)} object(s) exist")
+    return True
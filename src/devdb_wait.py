@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+DevDB Readiness Wait
+'devdb wait': returns as soon as the project's SQL Server accepts logins, woken by the container
+log instead of waiting out the Docker health check interval
+"""
+
+import time
+import socket
+import struct
+import threading
+import subprocess
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_db import CONTAINER_NAME, DatabaseError, ConnectionSettings, find_project_root, open_executor
+    from .devdb_utils import print_error, print_success, print_info
+    from . import devdb_trace as trace
+except ImportError:
+    # Fallback to direct imports (development mode)
+    from devdb_db import CONTAINER_NAME, DatabaseError, ConnectionSettings, find_project_root, open_executor
+    from devdb_utils import print_error, print_success, print_info
+    import devdb_trace as trace
+
+DEFAULT_TIMEOUT = 180
+
+# The line SQL Server logs once it listens for connections
+READY_MESSAGE = "SQL Server is now ready for client connections"
+
+# Probe backoff: start fast, since a warm container is ready within a second or two
+INITIAL_DELAY = 0.1
+MAX_DELAY = 2.0
+PROBE_TIMEOUT = 2.0
+
+# A TDS PRELOGIN packet offering VERSION and ENCRYPTION, the smallest message SQL Server answers.
+# Docker's port proxy accepts TCP connections before the server listens, so a bare connect proves nothing.
+_PRELOGIN_PAYLOAD = (
+    bytes([0x00]) + struct.pack(">HH", 11, 6) +
+    bytes([0x01]) + struct.pack(">HH", 17, 1) +
+    bytes([0xFF]) +
+    bytes(6) +
+    bytes([0x02])
+)
+PRELOGIN_PACKET = struct.pack(">BBHHBB", 0x12, 0x01, 8 + len(_PRELOGIN_PAYLOAD), 0, 1, 0) + _PRELOGIN_PAYLOAD
+TDS_RESPONSE = 0x04
+
+def tds_probe(host, port, timeout=PROBE_TIMEOUT):
+    """True if something speaking TDS answers a PRELOGIN on host:port"""
+    trace.count("wait.probes")
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            sock.sendall(PRELOGIN_PACKET)
+            header = sock.recv(8)
+    except OSError:
+        return False
+    return len(header) >= 1 and header[0] == TDS_RESPONSE
+
+class LogWatcher:
+    """Follows the container log since its last start and flags the ready message"""
+
+    def __init__(self, container=CONTAINER_NAME):
+        self.container = container
+        self.ready = threading.Event()
+        self.process = None
+
+    def start(self):
+        try:
+            started = subprocess.run(
+                ["docker", "inspect", "--format", "{{.State.StartedAt}}", self.container],
+                capture_output=True, text=True
+            )
+            if started.returncode != 0:
+                return False
+            self.process = subprocess.Popen(
+                ["docker", "logs", "--follow", "--since", started.stdout.strip(), self.container],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors='replace'
+            )
+        except FileNotFoundError:
+            return False
+        threading.Thread(target=self._read, daemon=True).start()
+        return True
+
+    def _read(self):
+        for line in self.process.stdout:
+            if READY_MESSAGE in line:
+                self.ready.set()
+                return
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+def wait_for_server(project_dir=None, timeout=None):
+    """Block until SQL Server accepts a login, or timeout seconds pass
+
+    The port is probed with a TDS PRELOGIN under exponential backoff; the
+    container log wakes the wait early the moment SQL Server reports it is
+    ready. A login is only attempted once one of the two says the server is up.
+    """
+    timeout = timeout or DEFAULT_TIMEOUT
+    start = time.monotonic()
+    try:
+        project_root = find_project_root(project_dir)
+        settings = ConnectionSettings.from_project(project_root)
+        executor = open_executor(project_root, pool_size=1)
+    except DatabaseError as e:
+        print_error(str(e))
+        return False
+
+    watcher = LogWatcher(settings.container)
+    if not watcher.start():
+        print_info(f"Cannot follow the {settings.container} log; probing {settings.host}:{settings.port} only")
+
+    print_info(f"Waiting for SQL Server at {settings.host}:{settings.port}...")
+    delay = INITIAL_DELAY
+    last_error = "no response"
+    try:
+        with executor:
+            while True:
+                if watcher.ready.is_set() or tds_probe(settings.host, settings.port):
+                    try:
+                        trace.count("wait.logins")
+                        executor.fetch("SELECT 1")
+                        print_success(f"SQL Server is accepting logins ({time.monotonic() - start:.1f}s)")
+                        return True
+                    except DatabaseError as e:
+                        # Listening but still recovering databases or setting up logins
+                        last_error = str(e)
+
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    print_error(f"SQL Server was not ready after {timeout}s: {last_error}")
+                    return False
+                # Sleep until the next probe, or until the log says the server is ready
+                if watcher.ready.is_set():
+                    time.sleep(min(delay, remaining))
+                elif watcher.ready.wait(min(delay, remaining)):
+                    continue
+                delay = min(delay * 2, MAX_DELAY)
+    finally:
+        watcher.stop()
@@ -10,7 +10,8 @@
     3. Execute the INSERT statements in your DevDB Docker environment
     
     Note: This script generates basic INSERT statements. For large datasets,
-          consider using BCP or SSIS for better performance.
+          use 'devdb data export' and 'devdb data import', which move the
+          data in bcp native format and load it with BULK INSERT.
 */
 
 SET NOCOUNT ON;
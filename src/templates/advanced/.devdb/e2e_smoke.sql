@@ -0,0 +1,37 @@
+-- E2E smoke script for 'devdb e2e'
+-- Exercises the deployed procedures, views and functions. The harness runs it inside a
+-- transaction and rolls it back, so the test data below never needs cleaning up.
+-- Any error fails the smoke stage.
+
+USE DevDB;
+GO
+
+SET NOCOUNT ON;
+
+-- Direct data insertion
+INSERT INTO Products (ProductName, Price, Stock) VALUES ('E2E Test Product', 29.99, 100);
+
+-- Stored procedures
+EXEC AddNewUser @Username = 'e2euser', @Email = 'e2e@test.com';
+
+DECLARE @UserID INT;
+EXEC CreateUserWithValidation @Username = 'e2euser_advanced', @Email = 'advanced@e2e.com', @NewUserID = @UserID OUTPUT;
+SELECT @UserID AS NewUserID;
+
+DECLARE @ProductID INT, @NewStock INT;
+SELECT @ProductID = ProductID FROM Products WHERE ProductName = 'E2E Test Product';
+EXEC ManageProductInventory @ProductID = @ProductID, @Action = 'ADD', @Quantity = 50, @NewStock = @NewStock OUTPUT;
+SELECT @NewStock AS UpdatedStock;
+
+-- Views
+SELECT * FROM PricedProducts WHERE ProductName = 'E2E Test Product';
+SELECT Username, UserCategory, DaysActive FROM UserStats WHERE Username IN ('e2euser', 'e2euser_advanced');
+SELECT ProductName, StockStatus, InventoryValue FROM ProductAnalytics WHERE ProductName = 'E2E Test Product';
+
+-- Functions
+SELECT dbo.FormatProductName('E2E Test Product', 29.99) AS FormattedName;
+SELECT * FROM dbo.GetActiveProducts(50) WHERE ProductName = 'E2E Test Product';
+
+-- Data retrieval
+SELECT Username, Email FROM Users WHERE Username IN ('e2euser', 'e2euser_advanced');
+GO
@@ -1,22 +1,33 @@
 #!/usr/bin/env python3
 """
 SQL Code Polisher for DevDB
-Formats SQL files and standardizes headers using Gemini AI
+Formats SQL files and standardizes their headers. Headers are built locally from the SQL object
+index and the existing header; Gemini AI only writes the Description when a file has none
 """
 
 import os
+import re
 import sys
+import json
+import time
+import asyncio
+import hashlib
 import argparse
 import glob
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 try:
     from google import genai
     from google.genai import types
 except ImportError:
-    print("Error: google-generativeai library not installed. Run: pip install google-generativeai")
-    sys.exit(1)
+    # Only needed when calling Gemini; --format-only works without it
+    genai = None
+    types = None
+
+import devdb_trace as trace
+from devdb_index import SqlIndex, describe_object
+from gemini_scheduler import RequestScheduler
 
 try:
     import sqlparse
@@ -24,9 +35,24 @@ except ImportError:
     print("Error: sqlparse library not installed. Run: pip install sqlparse")
     sys.exit(1)
 
+from sql_chunker import CHARS_PER_TOKEN, estimate_tokens, split_leading_comment
+from sql_header import ExistingHeader, build_header, local_description
+from sql_formatter import FORMAT_OPTIONS, SqlFormatter
+
 # Configuration
 MODEL_NAME = "gemini-2.0-flash-exp"
-MAX_WORKERS = 3
+TEMPERATURE = 0.1
+
+# Headers are built locally; Gemini only writes the Description, from the parsed objects
+# and at most this much of the SQL
+DESCRIPTION_SOURCE_TOKENS = 1000
+DESCRIPTION_MAX_TOKENS = 512
+
+# Bump whenever the shape of polished output changes so stale cache entries are ignored
+CACHE_VERSION = "4"
+
+# Bounded queue size between pipeline stages
+FILE_QUEUE_SIZE = 4
 
 # Load configuration from environment
 def load_config():
@@ -34,11 +60,19 @@ def load_config():
     default_source_dir = os.getenv("DEFAULT_SOURCE_DIR", "schemas")
     polish_output_dir = os.getenv("POLISH_OUTPUT_DIR", "output/prod_scripts")
     author_name = os.getenv("AUTHOR_NAME", "Unknown Author")
+    cache_dir = os.getenv("POLISH_CACHE_DIR", ".devdb/cache/polish")
+    cache_max_mb = int(os.getenv("POLISH_CACHE_MAX_MB", "256"))
+    cache_max_age_days = int(os.getenv("POLISH_CACHE_MAX_AGE_DAYS", "30"))
+    format_workers = int(os.getenv("POLISH_FORMAT_WORKERS", "0")) or os.cpu_count() or 1
     
     return {
         "source_dir": os.path.join(os.getcwd(), default_source_dir),
         "output_dir": os.path.join(os.getcwd(), polish_output_dir),
-        "author_name": author_name
+        "author_name": author_name,
+        "cache_dir": os.path.join(os.getcwd(), cache_dir),
+        "cache_max_bytes": cache_max_mb * 1024 * 1024,
+        "cache_max_age": cache_max_age_days * 24 * 60 * 60,
+        "format_workers": format_workers
     }
 
 # Color output helpers
@@ -61,6 +95,10 @@ def print_info(text):
 # Gemini AI setup
 def setup_gemini():
     """Initialize Gemini AI client with API key"""
+    if genai is None:
+        print_error("google-generativeai library not installed. Run: pip install google-generativeai")
+        sys.exit(1)
+    
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
         print_error("GEMINI_API_KEY environment variable not set")
@@ -69,167 +107,333 @@ def setup_gemini():
     
     return genai.Client(api_key=api_key)
 
-def call_gemini(user_prompt, system_instruction, client):
-    """Call Gemini API with error handling"""
-    try:
-        contents = [
-            types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(text=user_prompt),
-                ],
-            ),
-        ]
-        
-        generate_content_config = types.GenerateContentConfig(
-            temperature=0.1,
-            max_output_tokens=8192,
-            response_mime_type="text/plain",
-            system_instruction=[
-                types.Part.from_text(text=system_instruction),
+def describe_with_gemini(user_prompt, system_instruction, client):
+    """Return Gemini's response to a description prompt"""
+    contents = [
+        types.Content(
+            role="user",
+            parts=[
+                types.Part.from_text(text=user_prompt),
             ],
-        )
-
-        # Collect the full response
-        response_text = ""
-        for chunk in client.models.generate_content_stream(
-            model=MODEL_NAME,
-            contents=contents,
-            config=generate_content_config,
-        ):
-            response_text += chunk.text
-
-        return response_text
-    except Exception as e:
-        return f"GEMINI_API_ERROR: {str(e)}"
-
-def format_sql_content(sql_content):
-    """Format SQL using sqlparse library"""
-    try:
-        # Use sqlparse to format the SQL
-        formatted = sqlparse.format(
-            sql_content,
-            reindent=True,
-            keyword_case='upper',
-            identifier_case='lower',
-            strip_comments=False,
-            use_space_around_operators=True,
-            indent_width=4,
-            wrap_after=80,
-            comma_first=False
-        )
-        return formatted
-    except Exception as e:
-        print_warning(f"SQL formatting failed: {str(e)}, using original content")
-        return sql_content
-
-def get_header_prompt(sql_content, author_name):
-    """Generate prompts for header standardization"""
-    system_instruction = """You are a SQL code formatter specializing in header standardization for database schema files.
-
-Your task is to:
-1. Add or update a standardized header comment at the top of the SQL file
-2. Preserve all existing SQL code exactly as-is (no logic changes)
-3. Ensure proper formatting and indentation
-4. Use SQL Server T-SQL syntax
-5. CRITICALLY IMPORTANT: If there is an existing header with a "SUMMARY OF CHANGES" section, preserve it entirely and add a new entry
-
-Header format should be:
-/***************************************************************************************************
-Procedure:          [procedure/object name from the SQL]
-Create Date:        [original create date or current date if new]
-Author:             [author name]
-Description:        [Detailed description of what this does - be verbose and specific]
-Call by:            [Leave empty for now]
-Affected table(s):  [Tables that are modified by this code]
-Used By:            [Leave empty for now]
-Parameter(s):       [List parameters with descriptions if applicable]
-Usage:              [Example of how to execute this code]
-                    [Additional notes or caveats about usage]
-****************************************************************************************************
-SUMMARY OF CHANGES
-Date(yyyy-mm-dd)    Author              Comments
-------------------- ------------------- ------------------------------------------------------------
-[preserve any existing change entries here]
-[current date]      [author name]       Automated polish and formatting.
-***************************************************************************************************/
-
-Requirements:
-- Use /* */ block comments, not -- line comments
-- If a header already exists, update it with current information
-- If there's a SUMMARY OF CHANGES section, preserve ALL existing entries and add a new one
-- Keep the description accurate and verbose based on the SQL content
-- For "Call by" and "Used By" fields, leave empty for now
-- Preserve all existing SQL code structure and logic
-- Maintain proper GO statements and batches
-- Use consistent indentation (4 spaces)
-- Uppercase SQL keywords consistently"""
-
-    current_date = datetime.now().strftime("%Y-%m-%d")
+        ),
+    ]
     
-    user_prompt = f"""Please add or update the standardized header for this SQL file and format it properly.
-
-Author: {author_name}
-Current Date: {current_date}
-
-SQL Content:
-{sql_content}
-
-CRITICAL INSTRUCTIONS:
-1. Use the professional SQL header format with /* */ block comments and asterisk borders
-2. If there is an existing header with change history, preserve ALL of it
-3. Add a new change entry: "{current_date}          {author_name}    Automated polish and formatting."
-4. For "Call by:" and "Used By:" fields, leave them empty for now
-5. Make the description verbose and detailed - explain what, when, where, how and why
-6. Extract the actual procedure/object name from the SQL code
-7. List affected tables if any are modified
-8. Return ONLY the complete, formatted SQL file with the updated header
-9. Do NOT wrap the output in markdown code blocks or add any markdown formatting
-10. Output pure SQL code only"""
-
-    return user_prompt, system_instruction
-
-def polish_sql_file(sql_file_path, output_dir, client, author_name):
-    """Polish a single SQL file - format and standardize header"""
-    try:
-        with open(sql_file_path, 'r', encoding='utf-8') as f:
-            original_sql = f.read()
-
-        # Step 1: Format SQL using sqlparse
-        formatted_sql = format_sql_content(original_sql)
+    generate_content_config = types.GenerateContentConfig(
+        temperature=TEMPERATURE,
+        max_output_tokens=DESCRIPTION_MAX_TOKENS,
+        response_mime_type="text/plain",
+        system_instruction=[
+            types.Part.from_text(text=system_instruction),
+        ],
+    )
+
+    response = client.models.generate_content(
+        model=MODEL_NAME,
+        contents=contents,
+        config=generate_content_config,
+    )
+    return response.text or ""
+
+DESCRIPTION_SYSTEM_INSTRUCTION = """You write the Description field of the standardized header of SQL Server scripts.
+Reply with the description text only: plain sentences, no field label, no markdown, no code."""
+
+DESCRIPTION_USER_PROMPT = """Describe what {filename} does in 2 to 5 sentences: what it creates, what each object is for, \
+which tables it reads and changes, and anything a caller needs to know.
+
+Objects (parsed from the file):
+{objects}
+
+SQL{truncated}:
+{sql_excerpt}"""
+
+def describe_objects(entry):
+    """The objects of a file's index entry, one line each, for the prompts"""
+    if not entry or not entry["objects"]:
+        return "(none)"
+    return "\n".join(f"- {describe_object(obj)}" for obj in entry["objects"])
+
+def get_description_prompt(body, entry, filename):
+    """Generate the prompts asking for a file's Description, from its objects and the start of its SQL"""
+    budget = DESCRIPTION_SOURCE_TOKENS * CHARS_PER_TOKEN
+    user_prompt = DESCRIPTION_USER_PROMPT.format(
+        filename=filename,
+        objects=describe_objects(entry),
+        truncated=" (truncated)" if len(body) > budget else "",
+        sql_excerpt=body[:budget]
+    )
+
+    return user_prompt, DESCRIPTION_SYSTEM_INSTRUCTION
+
+def clean_description(text):
+    """Strip what models wrap a plain-text answer in: code fences, quotes and a Description: label"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+    if text.endswith("```"):
+        text = text[:-3]
+    text = re.sub(r"^\s*Description:\s*", "", text.strip(), flags=re.IGNORECASE)
+    return text.strip().strip('"').strip()
+
+class PolishCache:
+    """Content-addressed on-disk cache of polished SQL output.
+
+    Entries are keyed on the raw source contents together with everything that
+    influences the output (description prompts, model, temperature, author
+    and sqlparse options). The current date is deliberately left out of the key so
+    an unchanged file keeps the output from the day it was last polished.
+    """
+
+    def __init__(self, cache_dir, max_bytes, max_age, read=True, write=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.read = read
+        self.write = write
+
+    @staticmethod
+    def key_for(sql_content, author_name):
+        """Build the cache key for a source file and author"""
+        digest = hashlib.sha256()
+        parts = [
+            CACHE_VERSION,
+            MODEL_NAME,
+            repr(TEMPERATURE),
+            author_name,
+            DESCRIPTION_SYSTEM_INSTRUCTION,
+            DESCRIPTION_USER_PROMPT,
+            repr((DESCRIPTION_SOURCE_TOKENS, DESCRIPTION_MAX_TOKENS)),
+            json.dumps(FORMAT_OPTIONS, sort_keys=True),
+            sqlparse.__version__,
+            sql_content,
+        ]
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.sql")
+
+    def get(self, key):
+        """Return cached output for key, or None on a miss"""
+        if not self.read:
+            return None
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
+        # Touch the entry so eviction treats it as recently used
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+        return content
+
+    def put(self, key, content):
+        """Store output for key atomically"""
+        if not self.write:
+            return
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, entry_path)
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under the size limit"""
+        if not os.path.isdir(self.cache_dir):
+            return 0
         
-        # Step 2: Send to Gemini for header standardization
-        user_prompt, system_instruction = get_header_prompt(formatted_sql, author_name)
-        polished_sql = call_gemini(user_prompt, system_instruction, client)
+        now = time.time()
+        entries = []
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                entry_path = os.path.join(root, name)
+                try:
+                    stat = os.stat(entry_path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age:
+                    os.remove(entry_path)
+                    removed += 1
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry_path))
         
-        if "GEMINI_API_ERROR" in polished_sql:
-            return (sql_file_path, f"API Error: {polished_sql}")
-
-        # Step 3: Clean up any markdown artifacts that might have slipped through
-        polished_sql = polished_sql.strip()
-        if polished_sql.startswith('```sql'):
-            polished_sql = polished_sql[6:]  # Remove ```sql
-        if polished_sql.startswith('```'):
-            polished_sql = polished_sql[3:]   # Remove ```
-        if polished_sql.endswith('```'):
-            polished_sql = polished_sql[:-3]  # Remove trailing ```
-        polished_sql = polished_sql.strip()
-
-        # Step 4: Create output file path
-        filename = os.path.basename(sql_file_path)
-        output_file_path = os.path.join(output_dir, filename)
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            os.remove(entry_path)
+            total_size -= size
+            removed += 1
         
-        # Ensure output directory exists
-        os.makedirs(output_dir, exist_ok=True)
+        return removed
+
+def read_source(sql_file_path):
+    """Read a SQL source file"""
+    with open(sql_file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    trace.count("bytes.read", os.path.getsize(sql_file_path))
+    return content
+
+def output_path_for(sql_file_path, output_dir):
+    """Output path of a polished file"""
+    return os.path.join(output_dir, os.path.basename(sql_file_path))
+
+def write_output_file(sql_file_path, output_dir, content):
+    """Atomically write polished content next to the other outputs and return its path"""
+    output_file_path = output_path_for(sql_file_path, output_dir)
+    
+    # Ensure output directory exists
+    os.makedirs(output_dir, exist_ok=True)
+    
+    tmp_path = f"{output_file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, output_file_path)
+    trace.count("bytes.written", os.path.getsize(output_file_path))
+    
+    return output_file_path
+
+def format_traced(formatter, job):
+    """Format a job's SQL under a span of its own"""
+    with trace.span("polish.format", file=os.path.basename(job.path)):
+        return formatter.format(job.content)
+
+class PolishJob:
+    """A file moving through the polishing pipeline"""
+
+    def __init__(self, path, content, cache_key=None, entry=None):
+        self.path = path
+        self.content = content
+        self.cache_key = cache_key
+        # The file's SQL object index entry
+        self.entry = entry
+
+async def polish_files(sql_files, output_dir, formatter, client, scheduler, author_name, cache, report,
+                       format_only=False, index=None, redescribe=False):
+    """Polish files through read -> format -> header -> atomic write stages
+
+    Stages are connected by bounded queues, so only a handful of files are held
+    in memory at once. Headers are built locally from each file's entry in
+    index, the SQL object index, and its existing header; Gemini is asked
+    only for a Description the header does not have yet (or for every file
+    with redescribe), and without a client the Description is derived from
+    the index. With format_only the header stage is skipped and formatted
+    SQL is written.
+    """
+    loop = asyncio.get_event_loop()
+    today = datetime.now().strftime("%Y-%m-%d")
+    format_workers = formatter.workers
+    header_workers = 0 if format_only else (scheduler.max_concurrency if scheduler else 1)
+    llm_pool = ThreadPoolExecutor(max_workers=header_workers) if scheduler and header_workers else None
+    format_queue = asyncio.Queue(maxsize=FILE_QUEUE_SIZE)
+    header_queue = asyncio.Queue(maxsize=FILE_QUEUE_SIZE)
+
+    async def read_stage():
+        for sql_file_path in sql_files:
+            try:
+                original_sql = await loop.run_in_executor(None, read_source, sql_file_path)
+                job = PolishJob(sql_file_path, original_sql, entry=index.entry(sql_file_path) if index else None)
+                
+                # Unchanged files are served straight from the cache
+                if cache and not format_only:
+                    job.cache_key = cache.key_for(original_sql, author_name)
+                    cached_sql = await loop.run_in_executor(None, cache.get, job.cache_key)
+                    if cached_sql is not None:
+                        trace.count("cache.hits")
+                        output_file_path = await loop.run_in_executor(
+                            None, write_output_file, sql_file_path, output_dir, cached_sql
+                        )
+                        report(sql_file_path, "Cached", output_file_path)
+                        continue
+            except Exception as e:
+                report(sql_file_path, f"Error: {str(e)}", None)
+                continue
+            await format_queue.put(job)
+        for _ in range(format_workers):
+            await format_queue.put(None)
+
+    async def format_worker():
+        while True:
+            job = await format_queue.get()
+            if job is None:
+                return
+            try:
+                # The formatter fans work out to its process pool
+                job.content = await loop.run_in_executor(None, format_traced, formatter, job)
+                if format_only:
+                    output_file_path = await loop.run_in_executor(
+                        None, write_output_file, job.path, output_dir, job.content
+                    )
+                    report(job.path, "Formatted", output_file_path)
+                    continue
+            except Exception as e:
+                report(job.path, f"Error: {str(e)}", None)
+                continue
+            await header_queue.put(job)
+
+    async def format_stage():
+        await asyncio.gather(*(format_worker() for _ in range(format_workers)))
+        for _ in range(header_workers):
+            await header_queue.put(None)
+
+    async def describe(job, body):
+        user_prompt, system_instruction = get_description_prompt(body, job.entry, os.path.basename(job.path))
         
-        # Step 5: Write to output file
-        with open(output_file_path, 'w', encoding='utf-8') as f:
-            f.write(polished_sql)
-
-        return (sql_file_path, "Success", output_file_path)
+        def request():
+            # Counted on the scheduler's llm.request span, which this runs inside
+            trace.count("llm.tokens_sent", estimate_tokens(system_instruction) + estimate_tokens(user_prompt))
+            text = describe_with_gemini(user_prompt, system_instruction, client)
+            trace.count("llm.tokens_received", estimate_tokens(text))
+            return text
         
-    except Exception as e:
-        return (sql_file_path, f"Error: {str(e)}", None)
+        # Rate limiting, concurrency and retries are handled by the scheduler
+        return clean_description(await loop.run_in_executor(llm_pool, scheduler.call, request))
+
+    async def header_job(job):
+        filename = os.path.basename(job.path)
+        existing_text, body = split_leading_comment(job.content)
+        existing = ExistingHeader(existing_text)
+        description = existing.description
+        status = "Local"
+        if client and (redescribe or not description):
+            try:
+                description = await describe(job, body)
+            except Exception as e:
+                report(job.path, f"API Error: GEMINI_API_ERROR: {str(e)}", None)
+                return
+            status = "Success"
+        if not description:
+            description = local_description(job.entry, filename)
+        
+        with trace.span("polish.header", file=filename):
+            header = build_header(job.entry, existing, author_name, today, description, filename)
+        content = header + "\n\n" + body.lstrip("\n") if body.strip() else header + "\n"
+        output_file_path = await loop.run_in_executor(None, write_output_file, job.path, output_dir, content)
+        if cache:
+            await loop.run_in_executor(None, cache.put, job.cache_key, content)
+        report(job.path, status, output_file_path)
+
+    async def header_stage():
+        while True:
+            job = await header_queue.get()
+            if job is None:
+                return
+            try:
+                await header_job(job)
+            except Exception as e:
+                report(job.path, f"Error: {str(e)}", None)
+
+    try:
+        await asyncio.gather(read_stage(), format_stage(), *(header_stage() for _ in range(header_workers)))
+    finally:
+        if llm_pool:
+            llm_pool.shutdown(wait=True)
 
 def find_sql_files(target_path, default_source_dir):
     """Find SQL files to process"""
@@ -258,14 +462,43 @@ def find_sql_files(target_path, default_source_dir):
 def main():
     parser = argparse.ArgumentParser(description="Format SQL files and standardize headers")
     parser.add_argument("path", nargs="?", help="SQL file or directory to polish (default: use DEFAULT_SOURCE_DIR from .env)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read from or write to the polish cache")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results but store the fresh ones")
+    parser.add_argument("--format-only", action="store_true", help="Only reformat with sqlparse; skip header standardization")
+    parser.add_argument("--local", action="store_true", help="Build headers without Gemini; missing descriptions are derived from the parsed objects")
+    parser.add_argument("--redescribe", action="store_true", help="Ask Gemini for a new Description even where the header has one (implies --refresh)")
+    parser.add_argument("--trace", metavar="FILE", help="Record timing spans and counters to FILE (Chrome trace format, or JSON lines for .jsonl)")
     
     args = parser.parse_args()
+    trace.start(args.trace, process_name="code_polisher")
     
     # Load configuration
     config = load_config()
     
     # Setup
-    client = setup_gemini()
+    if args.local and args.redescribe:
+        print_error("--local and --redescribe cannot be combined")
+        sys.exit(1)
+    
+    client = None
+    scheduler = None
+    if not args.format_only and not args.local:
+        client = setup_gemini()
+        try:
+            scheduler = RequestScheduler.from_env()
+        except ValueError as e:
+            print_error(f"Invalid Gemini scheduler setting: {e}")
+            sys.exit(1)
+    
+    # Local headers cost no more to rebuild than to fetch, so only Gemini output is cached
+    cache = None
+    if not args.no_cache and client:
+        cache = PolishCache(
+            config["cache_dir"],
+            config["cache_max_bytes"],
+            config["cache_max_age"],
+            read=not (args.refresh or args.redescribe)
+        )
     
     # Find files to process
     sql_files = find_sql_files(args.path, config["source_dir"])
@@ -274,6 +507,16 @@ def main():
         print_error("No files to process")
         sys.exit(1)
     
+    # Object names, parameters and tables for the headers, parsed once and reused while files are unchanged
+    index = None
+    if not args.format_only:
+        index = SqlIndex(os.getcwd())
+        index.update(sql_files)
+        try:
+            index.save()
+        except OSError as e:
+            print_warning(f"Cannot save the SQL object index {index.path}: {e}")
+    
     if args.path:
         if os.path.isfile(args.path):
             print_info(f"Polishing single file: {args.path}")
@@ -287,36 +530,48 @@ def main():
     print_info(f"Output directory: {config['output_dir']}")
     
     success_count = 0
+    cached_count = 0
+    local_count = 0
     error_count = 0
     
-    if len(sql_files) == 1:
-        # Single file - no threading needed
-        file_path, status, output_path = polish_sql_file(sql_files[0], config["output_dir"], client, config["author_name"])
+    def report(file_path, status, output_path):
+        nonlocal success_count, cached_count, local_count, error_count
         if status == "Success":
             print_success(f"Polished: {os.path.basename(file_path)} -> {os.path.basename(output_path)}")
             success_count += 1
+        elif status == "Local":
+            print_success(f"Polished (local header): {os.path.basename(file_path)} -> {os.path.basename(output_path)}")
+            success_count += 1
+            local_count += 1
+        elif status == "Cached":
+            print_success(f"Cached: {os.path.basename(file_path)} -> {os.path.basename(output_path)}")
+            success_count += 1
+            cached_count += 1
+        elif status == "Formatted":
+            print_success(f"Formatted: {os.path.basename(file_path)} -> {os.path.basename(output_path)}")
+            success_count += 1
         else:
             print_error(f"Failed: {os.path.basename(file_path)} - {status}")
             error_count += 1
-    else:
-        # Multiple files - use threading
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            future_to_file = {
-                executor.submit(polish_sql_file, file_path, config["output_dir"], client, config["author_name"]): file_path 
-                for file_path in sql_files
-            }
-            
-            for future in as_completed(future_to_file):
-                file_path, status, output_path = future.result()
-                if status == "Success":
-                    print_success(f"Polished: {os.path.basename(file_path)} -> {os.path.basename(output_path)}")
-                    success_count += 1
-                else:
-                    print_error(f"Failed: {os.path.basename(file_path)} - {status}")
-                    error_count += 1
+    
+    with trace.span("polish", files=len(sql_files)), SqlFormatter(workers=config["format_workers"]) as formatter:
+        asyncio.run(polish_files(
+            sql_files, config["output_dir"], formatter, client, scheduler, config["author_name"], cache, report,
+            format_only=args.format_only, index=index, redescribe=args.redescribe
+        ))
+    
+    if cache:
+        evicted = cache.evict()
+        if evicted:
+            print_info(f"Evicted {evicted} stale cache entr{'y' if evicted == 1 else 'ies'}")
     
     # Summary
-    print_info(f"Polish complete: {success_count} succeeded, {error_count} failed")
+    if scheduler:
+        scheduler.report(print_info)
+    print_info(
+        f"Polish complete: {success_count} succeeded ({cached_count} from cache, {local_count} without Gemini), "
+        f"{error_count} failed"
+    )
     print_info(f"Output files saved to: {config['output_dir']}")
     
     if error_count > 0:
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+DevDB SQL Object Index
+A parsed index of SQL scripts: the objects each file creates with their parameters, the tables they
+read and write, the procedures they call, the offsets of its GO batches and content hashes. Files are
+parsed in one pass over their tokens; the index is kept in .devdb/cache/sql-index.json and only files
+whose size, mtime and hash changed are parsed again, so every tool shares one parse of the SQL.
+
+Shared by the devdb CLI and the project scripts: src/devdb_index.py is copied to
+src/templates/advanced/.devdb/scripts/devdb_index.py and must stay identical.
+"""
+
+import os
+import re
+import json
+import hashlib
+
+try:
+    # Try relative imports first (when installed as package)
+    from .devdb_sql import tokenize
+    from . import devdb_trace as trace
+except ImportError:
+    # Fallback to direct imports (development mode and the project scripts)
+    from devdb_sql import tokenize
+    import devdb_trace as trace
+
+INDEX_FILE = ".devdb/cache/sql-index.json"
+
+# Bump whenever what is parsed or how entries are laid out changes, so old indexes are rebuilt
+INDEX_VERSION = 1
+
+OBJECT_KINDS = {"TABLE", "VIEW", "PROCEDURE", "PROC", "FUNCTION", "TRIGGER", "SCHEMA", "TYPE", "SYNONYM",
+                "SEQUENCE", "DATABASE"}
+
+# Words that end a table reference, so they are never taken for its alias
+_CLAUSE_WORDS = {
+    "WHERE", "ON", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS", "OUTER", "APPLY", "GROUP", "ORDER",
+    "HAVING", "UNION", "EXCEPT", "INTERSECT", "SET", "WITH", "OUTPUT", "VALUES", "SELECT", "INSERT", "UPDATE",
+    "DELETE", "MERGE", "USING", "WHEN", "THEN", "OPTION", "FOR", "AS", "BEGIN", "END", "IF", "ELSE", "RETURN",
+    "DECLARE", "EXEC", "EXECUTE", "GO", "PIVOT", "UNPIVOT", "TABLESAMPLE", "FROM", "INTO", "WHILE", "COMMIT",
+    "ROLLBACK", "PRINT", "RAISERROR", "THROW", "TRUNCATE", "CREATE", "ALTER", "DROP", "USE",
+}
+
+# Rowset functions that are not objects of the project
+_BUILTIN_ROWSETS = {"OPENJSON", "OPENROWSET", "OPENQUERY", "OPENXML", "OPENDATASOURCE", "STRING_SPLIT",
+                    "GENERATE_SERIES", "CONTAINSTABLE", "FREETEXTTABLE"}
+
+def _read_name(tokens, i):
+    """Read a [db.][schema.]name starting at tokens[i]; returns (parts, index after it)"""
+    parts = []
+    while i < len(tokens) and tokens[i].kind in ("word", "quoted"):
+        parts.append(tokens[i].name)
+        i += 1
+        if i < len(tokens) and tokens[i].text == ".":
+            i += 1
+            # db..name leaves the schema out
+            while i < len(tokens) and tokens[i].text == ".":
+                parts.append("")
+                i += 1
+            continue
+        break
+    return parts, i
+
+def _is_system(parts):
+    """True for what the server provides: sys.*, INFORMATION_SCHEMA.*, sp_*, xp_* and trigger pseudo tables"""
+    if len(parts) > 1 and parts[-2].lower() in ("sys", "information_schema"):
+        return True
+    name = parts[-1].lower()
+    return len(parts) == 1 and (name.startswith(("sp_", "xp_")) or name in ("inserted", "deleted"))
+
+def _qualified(parts):
+    return ".".join(part for part in parts[-2:] if part)
+
+def _source(sql_content, tokens):
+    """The source text a run of tokens spans, with whitespace collapsed"""
+    if not tokens:
+        return ""
+    return re.sub(r"\s+", " ", sql_content[tokens[0].start:tokens[-1].end]).strip()
+
+def _split_commas(tokens):
+    """Split tokens on the commas outside parentheses"""
+    items = [[]]
+    depth = 0
+    for token in tokens:
+        if token.text == "(":
+            depth += 1
+        elif token.text == ")":
+            depth -= 1
+        elif token.text == "," and depth == 0:
+            items.append([])
+            continue
+        items[-1].append(token)
+    return [item for item in items if item]
+
+def _parameters(sql_content, tokens):
+    """Parameters declared by a run of tokens: @name [AS] type [= default] [OUT[PUT]] [READONLY]"""
+    parameters = []
+    for item in _split_commas(tokens):
+        if item[0].kind != "variable":
+            continue
+        rest = item[1:]
+        if rest and rest[0].is_word("AS"):
+            rest = rest[1:]
+        flags = set()
+        while rest and rest[-1].is_word("OUTPUT", "OUT", "READONLY"):
+            flags.add("READONLY" if rest[-1].is_word("READONLY") else "OUTPUT")
+            rest = rest[:-1]
+        default = None
+        for position, token in enumerate(rest):
+            if token.text == "=":
+                default = _source(sql_content, rest[position + 1:])
+                rest = rest[:position]
+                break
+        parameters.append({
+            "name": item[0].text,
+            "type": _source(sql_content, rest),
+            "default": default,
+            "output": "OUTPUT" in flags,
+            "readonly": "READONLY" in flags,
+        })
+    return parameters
+
+def _until_depth_zero(tokens, i, stop_words):
+    """Index of the first stop word at parenthesis depth zero from tokens[i], or len(tokens)"""
+    depth = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.text == "(":
+            depth += 1
+        elif token.text == ")":
+            depth -= 1
+        elif depth == 0 and token.is_word(*stop_words):
+            return i
+        i += 1
+    return i
+
+def _matching_paren(tokens, i):
+    """Index of the ) closing the ( at tokens[i]"""
+    depth = 0
+    for j in range(i, len(tokens)):
+        if tokens[j].text == "(":
+            depth += 1
+        elif tokens[j].text == ")":
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(tokens)
+
+def _signature(sql_content, tokens, kind, i):
+    """Parameters, return type and parent table declared after the name of a created object"""
+    details = {}
+    if kind == "PROCEDURE":
+        if i < len(tokens) and tokens[i].text == "(":
+            end = _matching_paren(tokens, i)
+            details["parameters"] = _parameters(sql_content, tokens[i + 1:end])
+        else:
+            end = _until_depth_zero(tokens, i, ("AS", "WITH", "FOR"))
+            details["parameters"] = _parameters(sql_content, tokens[i:end])
+    elif kind == "FUNCTION":
+        end = i
+        if i < len(tokens) and tokens[i].text == "(":
+            end = _matching_paren(tokens, i)
+            details["parameters"] = _parameters(sql_content, tokens[i + 1:end])
+            end += 1
+        else:
+            details["parameters"] = []
+        returns = _until_depth_zero(tokens, end, ("RETURNS",))
+        if returns < len(tokens):
+            body = _until_depth_zero(tokens, returns + 1, ("AS", "WITH", "BEGIN", "RETURN"))
+            details["returns"] = _source(sql_content, tokens[returns + 1:body])
+    elif kind == "TRIGGER" and i < len(tokens) and tokens[i].is_word("ON"):
+        parts, _ = _read_name(tokens, i + 1)
+        if parts:
+            details["table"] = _qualified(parts)
+    return details
+
+def _index_batch(sql_content, tokens):
+    """Objects created by one batch, the tables it reads and writes, the procedures it calls and its USE"""
+    objects = []
+    reads = []
+    writes = []
+    calls = []
+    aliases = {}
+    local_names = set()
+    database = None
+
+    def table_at(i, into):
+        """Record the table reference at tokens[i] and the alias after it; returns the index after it"""
+        if i < len(tokens) and tokens[i].is_word(*_CLAUSE_WORDS):
+            return i
+        parts, j = _read_name(tokens, i)
+        if not parts:
+            return i
+        name = _qualified(parts)
+        if name.startswith("#") or _is_system(parts) or (j < len(tokens) and tokens[j].text == "(" and len(parts) == 1
+                                    and parts[0].upper() in _BUILTIN_ROWSETS):
+            return j
+        into.append(name)
+        if j < len(tokens) and tokens[j].text == "(":
+            j = _matching_paren(tokens, j) + 1
+        if j < len(tokens) and tokens[j].is_word("AS"):
+            j += 1
+        if j < len(tokens) and tokens[j].kind in ("word", "quoted") and not tokens[j].is_word(*_CLAUSE_WORDS):
+            aliases[tokens[j].name.lower()] = name
+            j += 1
+        return j
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        previous = tokens[i - 1] if i else None
+        if token.kind != "word":
+            i += 1
+            continue
+        word = token.text.upper()
+
+        if word == "CREATE":
+            j = i + 1
+            if j + 1 < len(tokens) and tokens[j].is_word("OR") and tokens[j + 1].is_word("ALTER"):
+                j += 2
+            if j < len(tokens) and tokens[j].kind == "word" and tokens[j].text.upper() in OBJECT_KINDS:
+                kind = tokens[j].text.upper()
+                kind = "PROCEDURE" if kind == "PROC" else kind
+                parts, k = _read_name(tokens, j + 1)
+                if parts and not parts[-1].startswith("#"):
+                    schema = None
+                    if kind not in ("DATABASE", "SCHEMA"):
+                        schema = parts[-2] if len(parts) > 1 and parts[-2] else "dbo"
+                    entry = {"kind": kind, "schema": schema, "name": parts[-1], "line": token.line}
+                    entry.update(_signature(sql_content, tokens, kind, k))
+                    if "table" in entry:
+                        reads.append(entry["table"])
+                    objects.append(entry)
+                i = k if parts else j + 1
+                continue
+        elif word == "USE" and i + 1 < len(tokens) and tokens[i + 1].kind in ("word", "quoted"):
+            database = tokens[i + 1].name
+        elif word in ("FROM", "JOIN", "APPLY", "REFERENCES", "USING"):
+            i = table_at(i + 1, reads)
+            continue
+        elif word in ("INSERT", "MERGE"):
+            j = i + 1
+            if j < len(tokens) and tokens[j].is_word("INTO"):
+                j += 1
+            i = table_at(j, writes)
+            continue
+        elif word == "INTO" and previous is not None and not previous.is_word("INSERT", "MERGE"):
+            # SELECT ... INTO creates and fills a table
+            i = table_at(i + 1, writes)
+            continue
+        elif word == "UPDATE" and not (previous is not None and previous.is_word("FOR", "AFTER", "OF", "ON")):
+            i = table_at(i + 1, writes)
+            continue
+        elif word == "DELETE" and not (previous is not None and previous.is_word("FOR", "AFTER", "OF", "ON")):
+            j = i + 1
+            if j < len(tokens) and tokens[j].is_word("FROM"):
+                j += 1
+            i = table_at(j, writes)
+            continue
+        elif word == "TRUNCATE" and i + 1 < len(tokens) and tokens[i + 1].is_word("TABLE"):
+            i = table_at(i + 2, writes)
+            continue
+        elif word in ("EXEC", "EXECUTE"):
+            j = i + 1
+            # EXEC @status = proc
+            if j + 1 < len(tokens) and tokens[j].kind == "variable" and tokens[j + 1].text == "=":
+                j += 2
+            parts, k = _read_name(tokens, j)
+            if parts and tokens[j].is_word(*_CLAUSE_WORDS):
+                # EXECUTE AS, GRANT EXECUTE ON
+                parts = []
+            if parts and not parts[-1].startswith("#") and not _is_system(parts):
+                calls.append(_qualified(parts))
+            i = max(k, i + 1)
+            continue
+        elif word == "AS" and i + 1 < len(tokens) and tokens[i + 1].text == "(":
+            # WITH name [(columns)] AS ( ... ): the CTE is not a table of the project
+            j = i - 1
+            if j >= 0 and tokens[j].text == ")":
+                depth = 0
+                while j >= 0:
+                    depth += tokens[j].text == ")"
+                    depth -= tokens[j].text == "("
+                    if depth == 0:
+                        break
+                    j -= 1
+                j -= 1
+            if j >= 1 and tokens[j].kind in ("word", "quoted") and (tokens[j - 1].is_word("WITH")
+                                                                 or tokens[j - 1].text == ","):
+                local_names.add(tokens[j].name.lower())
+        i += 1
+
+    # Writes through an alias (UPDATE u ... FROM dbo.Users u) land on the aliased table
+    writes = [aliases.get(name.lower(), name) if "." not in name else name for name in writes]
+    def project_tables(names):
+        kept = []
+        for name in names:
+            base = name.split(".")[-1].lower()
+            if base in local_names or name.lower() in aliases or name in kept:
+                continue
+            kept.append(name)
+        return kept
+
+    return objects, project_tables(reads), project_tables(writes), project_tables(calls), database
+
+def index_source(sql_content):
+    """Parse a script into its batches and objects, streaming its tokens batch by batch
+
+    Each object carries the tables read and written, and the procedures
+    called, by the batch that creates it. The file-wide lists also cover
+    batches that create nothing, such as seed data; its reads leave out the
+    objects the file creates itself.
+    """
+    batches = []
+    objects = []
+    reads = []
+    writes = []
+    calls = []
+    database = None
+
+    def add(names, into):
+        for name in names:
+            if name not in into:
+                into.append(name)
+
+    def close_batch(start, end, line, tokens):
+        nonlocal database
+        batch_objects, batch_reads, batch_writes, batch_calls, use = _index_batch(sql_content, tokens)
+        for entry in batch_objects:
+            entry.update(database=database, batch=len(batches))
+            own = {entry["name"].lower(), f"{entry['schema'] or ''}.{entry['name']}".lower()}
+            entry["reads"] = [name for name in batch_reads if name.lower() not in own]
+            entry["writes"] = [name for name in batch_writes if name.lower() not in own]
+            entry["calls"] = [name for name in batch_calls if name.lower() not in own]
+            objects.append(entry)
+        add(batch_reads, reads)
+        add(batch_writes, writes)
+        add(batch_calls, calls)
+        batches.append({
+            "start": start,
+            "end": end,
+            "line": line,
+            "sha256": hashlib.sha256(sql_content[start:end].encode('utf-8')).hexdigest(),
+        })
+        database = use or database
+
+    batch_start = 0
+    batch_line = 1
+    tokens = []
+    for token in tokenize(sql_content):
+        if token.kind == "go":
+            close_batch(batch_start, token.start, batch_line, tokens)
+            batch_start = token.end
+            batch_line = token.line + token.text.count("\n")
+            tokens = []
+        elif token.kind != "comment":
+            tokens.append(token)
+    if batch_start < len(sql_content) or not batches:
+        close_batch(batch_start, len(sql_content), batch_line, tokens)
+
+    defined = {f"{entry['schema'] or ''}.{entry['name']}".lower() for entry in objects}
+    defined |= {entry["name"].lower() for entry in objects}
+    return {
+        "batches": batches,
+        "objects": objects,
+        "reads": [name for name in reads if name.lower() not in defined],
+        "writes": writes,
+        "calls": calls,
+    }
+
+def object_name(entry):
+    """schema.name of an indexed object, or just its name for databases and schemas"""
+    return entry["name"] if entry["schema"] is None else f"{entry['schema']}.{entry['name']}"
+
+def describe_parameter(parameter):
+    text = f"{parameter['name']} {parameter['type']}".strip()
+    if parameter["default"] is not None:
+        text += f" = {parameter['default']}"
+    if parameter["output"]:
+        text += " OUTPUT"
+    if parameter["readonly"]:
+        text += " READONLY"
+    return text
+
+def describe_object(entry):
+    """One line summing up an indexed object: kind, name, parameters, and the tables it touches"""
+    text = f"{entry['kind']} {object_name(entry)}"
+    if "parameters" in entry:
+        text += "(" + ", ".join(describe_parameter(parameter) for parameter in entry["parameters"]) + ")"
+    if entry.get("returns"):
+        text += f" RETURNS {entry['returns']}"
+    if entry.get("table"):
+        text += f" ON {entry['table']}"
+    details = [
+        f"{label} {', '.join(entry[key])}"
+        for label, key in (("reads", "reads"), ("writes", "writes"), ("calls", "calls")) if entry.get(key)
+    ]
+    return text + (" - " + "; ".join(details) if details else "")
+
+class SqlIndex:
+    """The index of a project's SQL files, keyed by their path relative to the project root
+
+    An entry is reused while its file keeps the same size and mtime, or the
+    same SHA-256 when only the mtime moved; anything else is parsed again.
+    """
+
+    def __init__(self, root, path=None):
+        self.root = os.path.abspath(root)
+        self.path = path or os.path.join(self.root, INDEX_FILE)
+        self.files = {}
+        self.parsed = 0
+        self.reused = 0
+        self.changed = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.files = data["files"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def key(self, path):
+        """Where an entry is filed: the path relative to the root, or absolute for files outside it"""
+        path = os.path.abspath(path)
+        relative = os.path.relpath(path, self.root)
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return path
+        return relative.replace(os.sep, "/")
+
+    def entry(self, path):
+        return self.files.get(self.key(path))
+
+    def update(self, paths, rebuild=False):
+        """Bring the entries of paths up to date and return them in the same order"""
+        with trace.span("index.update", files=len(paths)):
+            return [self._update_file(path, rebuild) for path in paths]
+
+    def _update_file(self, path, rebuild):
+        key = self.key(path)
+        stat = os.stat(path)
+        entry = self.files.get(key)
+        if not rebuild and entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            self.reused += 1
+            trace.count("index.reused")
+            return entry
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        trace.count("bytes.read", len(data))
+        digest = hashlib.sha256(data).hexdigest()
+        if not rebuild and entry and entry["sha256"] == digest:
+            # Touched but unchanged
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            self.reused += 1
+            self.changed = True
+            trace.count("index.reused")
+            return entry
+
+        with trace.span("index.parse", file=key):
+            entry = index_source(data.decode('utf-8-sig'))
+        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=digest)
+        self.files[key] = entry
+        self.parsed += 1
+        self.changed = True
+        trace.count("index.parsed")
+        return entry
+
+    def objects(self):
+        """(file key, object entry) for every indexed object"""
+        for key in sorted(self.files):
+            for entry in self.files[key]["objects"]:
+                yield key, entry
+
+    def save(self):
+        """Write the index if anything changed, dropping entries whose files are gone"""
+        for key in list(self.files):
+            if not os.path.exists(os.path.join(self.root, key)):
+                del self.files[key]
+                self.changed = True
+        if not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "files": self.files}, f, indent=1)
+        os.replace(temp_path, self.path)
+        self.changed = False
@@ -6,6 +6,8 @@ Generates comprehensive documentation from SQL files using Gemini AI
 
 import os
 import sys
+import json
+import hashlib
 import argparse
 import glob
 from datetime import datetime
@@ -18,9 +20,25 @@ except ImportError:
     print("Error: google-generativeai library not installed. Run: pip install google-generativeai")
     sys.exit(1)
 
+import devdb_trace as trace
+from devdb_index import SqlIndex
+from gemini_scheduler import RequestScheduler
+from sql_chunker import estimate_tokens, object_chunks, pack_chunks
+
 # Configuration
 MODEL_NAME = "gemini-2.0-flash-exp"
-MAX_WORKERS = 3
+TEMPERATURE = 0.3
+MAX_OUTPUT_TOKENS = 8192
+
+# Files larger than this are documented in per-object parts, each at most this size,
+# so the generated Markdown for one part stays well inside MAX_OUTPUT_TOKENS
+DOCS_CHUNK_TOKENS = 3000
+
+# Bump whenever the manifest layout or rendered section shape changes
+MANIFEST_VERSION = 2
+
+# Indexed objects that count as something a file defines, for dependency tracking
+DOCUMENTED_KINDS = {"TABLE", "VIEW", "PROCEDURE", "FUNCTION", "TRIGGER"}
 
 # Load configuration from environment
 def load_config():
@@ -31,7 +49,8 @@ def load_config():
     return {
         "source_dir": os.path.join(os.getcwd(), default_source_dir),
         "output_dir": os.path.join(os.getcwd(), docs_output_dir),
-        "manual_file": os.path.join(os.getcwd(), docs_output_dir, "Database_Manual.md")
+        "manual_file": os.path.join(os.getcwd(), docs_output_dir, "Database_Manual.md"),
+        "manifest_file": os.path.join(os.getcwd(), docs_output_dir, ".doc_manifest.json")
     }
 
 # Color output helpers
@@ -62,8 +81,8 @@ def setup_gemini():
     
     return genai.Client(api_key=api_key)
 
-def call_gemini(user_prompt, system_instruction, client):
-    """Call Gemini API with error handling"""
+def call_gemini(user_prompt, system_instruction, client, scheduler):
+    """Call Gemini API through the shared request scheduler, with error handling"""
     try:
         contents = [
             types.Content(
@@ -75,30 +94,35 @@ def call_gemini(user_prompt, system_instruction, client):
         ]
         
         generate_content_config = types.GenerateContentConfig(
-            temperature=0.3,
-            max_output_tokens=8192,
+            temperature=TEMPERATURE,
+            max_output_tokens=MAX_OUTPUT_TOKENS,
             response_mime_type="text/plain",
             system_instruction=[
                 types.Part.from_text(text=system_instruction),
             ],
         )
 
-        # Collect the full response
-        response_text = ""
-        for chunk in client.models.generate_content_stream(
-            model=MODEL_NAME,
-            contents=contents,
-            config=generate_content_config,
-        ):
-            response_text += chunk.text
-
-        return response_text
+        def generate():
+            # Collect the full response
+            trace.count("llm.tokens_sent", estimate_tokens(system_instruction) + estimate_tokens(user_prompt))
+            chunks = []
+            for chunk in client.models.generate_content_stream(
+                model=MODEL_NAME,
+                contents=contents,
+                config=generate_content_config,
+            ):
+                if chunk.text:
+                    chunks.append(chunk.text)
+            response = "".join(chunks)
+            trace.count("llm.tokens_received", estimate_tokens(response))
+            return response
+
+        # Rate limiting, concurrency and retries are handled by the scheduler
+        return scheduler.call(generate)
     except Exception as e:
         return f"GEMINI_API_ERROR: {str(e)}"
 
-def get_docs_prompt(sql_content, filename):
-    """Generate prompts for documentation generation"""
-    system_instruction = """You are a database documentation specialist who creates comprehensive, professional documentation for SQL schema files.
+DOCS_SYSTEM_INSTRUCTION = """You are a database documentation specialist who creates comprehensive, professional documentation for SQL schema files.
 
 Your task is to analyze SQL code and generate detailed Markdown documentation that includes:
 
@@ -131,7 +155,7 @@ Format requirements:
 - Include practical usage examples
 - Highlight important constraints or business rules"""
 
-    user_prompt = f"""Please generate comprehensive documentation for this SQL schema file: {filename}
+DOCS_USER_PROMPT = """Please generate comprehensive documentation for this SQL schema file: {filename}
 
 Analyze the SQL code and create detailed Markdown documentation following the specified format.
 
@@ -140,25 +164,96 @@ SQL Content:
 
 Return only the Markdown documentation."""
 
-    return user_prompt, system_instruction
+DOCS_CHUNK_USER_PROMPT = """Please generate documentation for part {part} of {parts} of the SQL schema file: {filename}
+
+The file is too large to document in one response, so it has been split between its objects.
+The whole file creates: {object_list}
+
+{scope}
+
+SQL Content (part {part} of {parts}):
+{sql_content}
+
+Return only the Markdown documentation."""
+
+DOCS_FIRST_PART_SCOPE = "Start with the Overview of the whole file, then document the objects in this part following the specified format."
+DOCS_OTHER_PART_SCOPE = "Document only the objects in this part following the specified format. Do not repeat the Overview; it is written with part 1."
+
+def get_docs_prompt(sql_content, filename):
+    """Generate prompts for documentation generation"""
+    user_prompt = DOCS_USER_PROMPT.format(filename=filename, sql_content=sql_content)
+
+    return user_prompt, DOCS_SYSTEM_INSTRUCTION
+
+def get_docs_chunk_prompts(chunks, filename):
+    """Generate one documentation prompt per chunk of an oversized file"""
+    object_list = ", ".join(name for chunk in chunks for name in chunk.names) or "(no named objects)"
+    prompts = []
+    for part, chunk in enumerate(chunks, 1):
+        user_prompt = DOCS_CHUNK_USER_PROMPT.format(
+            part=part,
+            parts=len(chunks),
+            filename=filename,
+            object_list=object_list,
+            scope=DOCS_FIRST_PART_SCOPE if part == 1 else DOCS_OTHER_PART_SCOPE,
+            sql_content=chunk.text
+        )
+        prompts.append((user_prompt, DOCS_SYSTEM_INSTRUCTION))
+    return prompts
+
+def prompt_fingerprint():
+    """Hash of everything besides the SQL that shapes the generated docs"""
+    digest = hashlib.sha256()
+    parts = (
+        str(MANIFEST_VERSION), MODEL_NAME, repr(TEMPERATURE), repr(DOCS_CHUNK_TOKENS), DOCS_SYSTEM_INSTRUCTION,
+        DOCS_USER_PROMPT, DOCS_CHUNK_USER_PROMPT, DOCS_FIRST_PART_SCOPE, DOCS_OTHER_PART_SCOPE
+    )
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def extract_dependencies(entry):
+    """Return (defined objects, referenced objects) of a SQL file from its index entry, as base names"""
+    defines = {obj["name"].lower() for obj in entry["objects"] if obj["kind"] in DOCUMENTED_KINDS}
+    references = {name.split('.')[-1].lower() for name in entry["reads"] + entry["writes"] + entry["calls"]}
+    return defines, references - defines
+
+def generate_docs_in_parts(sql_content, filename, client, scheduler, chunk_executor):
+    """Document an oversized file part by part in parallel and stitch the parts in order"""
+    chunks = pack_chunks(object_chunks(sql_content), DOCS_CHUNK_TOKENS)
+    prompts = get_docs_chunk_prompts(chunks, filename)
+    print_info(f"{filename} is ~{estimate_tokens(sql_content)} tokens; documenting in {len(prompts)} parts")
+    
+    futures = [
+        chunk_executor.submit(call_gemini, user_prompt, system_instruction, client, scheduler)
+        for user_prompt, system_instruction in prompts
+    ]
+    parts = [future.result() for future in futures]
+    
+    for part in parts:
+        if "GEMINI_API_ERROR" in part:
+            return part
+    return "\n\n".join(part.strip() for part in parts)
 
-def generate_doc_for_file(sql_file_path, output_dir, client):
+def generate_doc_for_file(sql_file_path, output_dir, client, scheduler, chunk_executor):
     """Generate documentation for a single SQL file"""
     try:
         with open(sql_file_path, 'r', encoding='utf-8') as f:
             sql_content = f.read()
 
         filename = os.path.basename(sql_file_path)
-        user_prompt, system_instruction = get_docs_prompt(sql_content, filename)
-        markdown_docs = call_gemini(user_prompt, system_instruction, client)
+        if estimate_tokens(sql_content) > DOCS_CHUNK_TOKENS:
+            markdown_docs = generate_docs_in_parts(sql_content, filename, client, scheduler, chunk_executor)
+        else:
+            user_prompt, system_instruction = get_docs_prompt(sql_content, filename)
+            markdown_docs = call_gemini(user_prompt, system_instruction, client, scheduler)
         
         if "GEMINI_API_ERROR" in markdown_docs:
             return (sql_file_path, f"API Error: {markdown_docs}", "", None)
 
         # Add file separator for consolidated manual
-        header = f"\n\n# {filename}\n\n"
-        footer = "\n\n---\n\n"
-        formatted_docs = header + markdown_docs + footer
+        formatted_docs = format_manual_section(filename, markdown_docs)
 
         # Save individual documentation file
         doc_filename = filename.replace('.sql', '.md')
@@ -176,6 +271,12 @@ def generate_doc_for_file(sql_file_path, output_dir, client):
     except Exception as e:
         return (sql_file_path, f"Error: {str(e)}", "", None)
 
+def format_manual_section(filename, markdown_docs):
+    """Wrap a file's documentation as a section of the consolidated manual"""
+    header = f"\n\n# {filename}\n\n"
+    footer = "\n\n---\n\n"
+    return header + markdown_docs + footer
+
 def find_sql_files(target_path, default_source_dir):
     """Find SQL files to process"""
     if target_path:
@@ -221,18 +322,128 @@ DevDB is an automated development database deployment system that provides a one
 
 # Remove save_individual_doc function - now handled in generate_doc_for_file
 
+def load_manifest(manifest_file):
+    """Load the build manifest from the previous run, or start an empty one"""
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+    
+    if manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "files": {}}
+    return manifest
+
+def save_manifest(manifest_file, manifest):
+    """Atomically write the build manifest"""
+    os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+    tmp_path = f"{manifest_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_file)
+
+def plan_build(sql_files, index, manifest, output_dir, force=False):
+    """Work out which files need their documentation regenerated
+
+    A file is stale when its contents or the prompt changed, or its doc is missing.
+    Files that reference objects added or removed elsewhere are stale too, so the
+    Dependencies section of their docs stays accurate. Hashes and dependencies come
+    from the SQL object index, so unchanged files are not read at all.
+    
+    Returns (sources, stale) where sources maps filename -> source details.
+    """
+    previous = manifest.get("files", {})
+    prompt_changed = manifest.get("prompt_hash") != prompt_fingerprint()
+    sources = {}
+    stale = set()
+    changed_objects = set()
+    
+    for sql_file_path, indexed in zip(sql_files, index.update(sql_files)):
+        filename = os.path.basename(sql_file_path)
+        defines, references = extract_dependencies(indexed)
+        source_hash = indexed["sha256"]
+        sources[filename] = {
+            "path": sql_file_path,
+            "source_hash": source_hash,
+            "defines": defines,
+            "references": references
+        }
+        
+        entry = previous.get(filename)
+        if (force or prompt_changed or entry is None
+                or entry.get("source_hash") != source_hash
+                or not os.path.exists(os.path.join(output_dir, entry.get("output_path", "")))):
+            stale.add(filename)
+        
+        previous_defines = set(entry.get("defines", [])) if entry else set()
+        changed_objects |= defines ^ previous_defines
+    
+    # Objects from deleted files disappear too
+    for filename, entry in previous.items():
+        if filename not in sources:
+            changed_objects |= set(entry.get("defines", []))
+    
+    # Only identifiers that name a known object count as dependencies
+    known_objects = changed_objects.union(*(source["defines"] for source in sources.values()))
+    for filename, source in sources.items():
+        source["references"] &= known_objects
+        if source["references"] & changed_objects:
+            stale.add(filename)
+    
+    return sources, stale
+
+def read_cached_sections(manual_file, manifest):
+    """Return filename -> section text spliced out of the previous manual, if it is intact"""
+    try:
+        with open(manual_file, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return {}
+    
+    if hashlib.sha256(data).hexdigest() != manifest.get("manual_sha256"):
+        return {}
+    
+    sections = {}
+    for filename, entry in manifest.get("files", {}).items():
+        start, length = entry.get("section", [0, 0])
+        if length:
+            sections[filename] = data[start:start + length].decode('utf-8')
+    return sections
+
+def write_manual(manual_file, sections):
+    """Write the consolidated manual and return (byte offsets per section, manual hash)"""
+    offsets = {}
+    digest = hashlib.sha256()
+    tmp_path = f"{manual_file}.tmp"
+    
+    with open(tmp_path, 'wb') as f:
+        header = create_manual_header().encode('utf-8')
+        f.write(header)
+        digest.update(header)
+        position = len(header)
+        
+        for filename, docs in sections:
+            data = docs.encode('utf-8')
+            f.write(data)
+            digest.update(data)
+            offsets[filename] = [position, len(data)]
+            position += len(data)
+    
+    os.replace(tmp_path, manual_file)
+    return offsets, digest.hexdigest()
+
 def main():
     parser = argparse.ArgumentParser(description="Generate documentation for SQL files")
     parser.add_argument("directory", nargs="?", help="Directory containing SQL files to document (default: use DEFAULT_SOURCE_DIR from .env)")
+    parser.add_argument("--force", action="store_true", help="Regenerate documentation for every file, ignoring the build manifest")
+    parser.add_argument("--trace", metavar="FILE", help="Record timing spans and counters to FILE (Chrome trace format, or JSON lines for .jsonl)")
     
     args = parser.parse_args()
+    trace.start(args.trace, process_name="doc_generator")
     
     # Load configuration
     config = load_config()
     
-    # Setup
-    client = setup_gemini()
-    
     # Find files to process
     sql_files = find_sql_files(args.directory, config["source_dir"])
     
@@ -245,50 +456,112 @@ def main():
     else:
         print_info(f"Generating documentation for default directory: {config['source_dir']}")
     
+    # Work out what changed since the last build
+    manifest = load_manifest(config["manifest_file"])
+    index = SqlIndex(os.getcwd())
+    sources, stale = plan_build(sql_files, index, manifest, config["output_dir"], args.force)
+    try:
+        index.save()
+    except OSError as e:
+        print_warning(f"Cannot save the SQL object index {index.path}: {e}")
+    cached_sections = read_cached_sections(config["manual_file"], manifest)
+    
+    if not stale and set(manifest["files"]) == set(sources) and set(cached_sections) == set(sources):
+        print_success("Documentation is up to date - nothing to regenerate")
+        print_info(f"Consolidated manual: {config['manual_file']}")
+        return
+    
     # Process files
-    print_info(f"Processing {len(sql_files)} file(s)")
+    print_info(f"Processing {len(stale)} of {len(sources)} file(s); {len(sources) - len(stale)} unchanged")
     print_info(f"Output directory: {config['output_dir']}")
     
     success_count = 0
     error_count = 0
-    all_documentation = []
+    new_sections = {}
     
-    # Multiple files - use threading and create consolidated manual
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_file = {
-            executor.submit(generate_doc_for_file, file_path, config["output_dir"], client): file_path 
-            for file_path in sql_files
-        }
+    if stale:
+        # Setup
+        client = setup_gemini()
+        try:
+            scheduler = RequestScheduler.from_env()
+        except ValueError as e:
+            print_error(f"Invalid Gemini scheduler setting: {e}")
+            sys.exit(1)
+        
+        # Multiple files - use threading and create consolidated manual. Parts of oversized
+        # files get their own pool so file workers waiting on them cannot starve it
+        with ThreadPoolExecutor(max_workers=scheduler.max_concurrency) as executor, \
+                ThreadPoolExecutor(max_workers=scheduler.max_concurrency) as chunk_executor:
+            future_to_file = {
+                executor.submit(
+                    generate_doc_for_file, sources[filename]["path"], config["output_dir"], client, scheduler, chunk_executor
+                ): filename
+                for filename in sorted(stale)
+            }
+            
+            for future in as_completed(future_to_file):
+                file_path, status, docs, output_path = future.result()
+                if status == "Success":
+                    print_success(f"Documented: {os.path.basename(file_path)} -> {os.path.basename(output_path)}")
+                    new_sections[future_to_file[future]] = docs
+                    success_count += 1
+                else:
+                    print_error(f"Failed: {os.path.basename(file_path)} - {status}")
+                    error_count += 1
         
-        for future in as_completed(future_to_file):
-            file_path, status, docs, output_path = future.result()
-            if status == "Success":
-                print_success(f"Documented: {os.path.basename(file_path)} -> {os.path.basename(output_path)}")
-                all_documentation.append((file_path, docs))
-                success_count += 1
-            else:
-                print_error(f"Failed: {os.path.basename(file_path)} - {status}")
-                error_count += 1
+        scheduler.report(print_info)
+    
+    # Splice the consolidated manual together from new and cached sections
+    previous = manifest["files"]
+    files = {}
+    sections = []
+    for filename in sorted(sources):
+        source = sources[filename]
+        if filename in new_sections:
+            docs = new_sections[filename]
+            entry = {
+                "source_hash": source["source_hash"],
+                "output_path": filename.replace('.sql', '.md'),
+                "defines": sorted(source["defines"]),
+                "references": sorted(source["references"])
+            }
+        elif filename in previous:
+            # Unchanged, or failed this time - keep the last good docs, but forget
+            # the hash of a failed file so the next run retries it
+            entry = dict(previous[filename])
+            if filename in stale:
+                entry["source_hash"] = None
+            docs = cached_sections.get(filename)
+            if docs is None:
+                doc_path = os.path.join(config["output_dir"], entry["output_path"])
+                if not os.path.exists(doc_path):
+                    continue
+                with open(doc_path, 'r', encoding='utf-8') as f:
+                    docs = format_manual_section(filename, f.read())
+        else:
+            continue
+        files[filename] = entry
+        sections.append((filename, docs))
     
-    # Create consolidated manual
-    if all_documentation:
+    if sections:
         try:
-            with open(config["manual_file"], 'w', encoding='utf-8') as f:
-                f.write(create_manual_header())
-                
-                # Sort by filename for consistent order
-                all_documentation.sort(key=lambda x: os.path.basename(x[0]))
-                
-                for _, docs in all_documentation:
-                    f.write(docs)
+            offsets, manual_hash = write_manual(config["manual_file"], sections)
+            for filename, entry in files.items():
+                entry["section"] = offsets[filename]
             
+            save_manifest(config["manifest_file"], {
+                "version": MANIFEST_VERSION,
+                "prompt_hash": prompt_fingerprint(),
+                "manual_sha256": manual_hash,
+                "files": files
+            })
             print_success(f"Consolidated manual saved: {config['manual_file']}")
         except Exception as e:
             print_error(f"Failed to create consolidated manual: {str(e)}")
             error_count += 1
     
     # Summary
-    print_info(f"Documentation complete: {success_count} succeeded, {error_count} failed")
+    print_info(f"Documentation complete: {success_count} regenerated, {len(sources) - len(stale)} reused, {error_count} failed")
     print_info(f"Individual docs saved to: {config['output_dir']}")
     print_info(f"Consolidated manual: {config['manual_file']}")
     
@@ -296,4 +569,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
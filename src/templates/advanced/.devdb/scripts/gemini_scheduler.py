@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Gemini Request Scheduler for DevDB
+Shared rate limiting, adaptive concurrency and retries for the Gemini-backed scripts
+"""
+
+import os
+import re
+import random
+import threading
+import time
+
+import devdb_trace as trace
+
+# Status codes and error markers the Gemini SDK surfaces for transient failures
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Matched as whole words, so a file name or token count that happens to contain one does not count;
+# a bare 429 only counts where a status code would be, as in "429 RESOURCE_EXHAUSTED" or "HTTP 429"
+RETRYABLE_RE = re.compile(r"\b(?:RESOURCE_EXHAUSTED|UNAVAILABLE|DEADLINE_EXCEEDED|INTERNAL|TIMEOUT|TIMED OUT)\b")
+THROTTLED_RE = re.compile(
+    r"(?:^\s*|\b(?:HTTP|STATUS|CODE|ERROR)[\s:=]*)429\b|\bRESOURCE_EXHAUSTED\b|\bRATE[ _-]?LIMIT|\bQUOTA\b"
+)
+
+def _status_code(exc):
+    """Best-effort HTTP status code of an SDK exception"""
+    for attr in ("code", "status_code"):
+        code = getattr(exc, attr, None)
+        if isinstance(code, int):
+            return code
+    return None
+
+def is_throttled(exc):
+    """True if the exception is a rate-limit (429) response"""
+    if _status_code(exc) == 429:
+        return True
+    return THROTTLED_RE.search(str(exc).upper()) is not None
+
+def is_retryable(exc):
+    """True if the request that raised exc is worth retrying"""
+    flag = getattr(exc, "retryable", None)
+    if flag is not None:
+        return flag
+    if _status_code(exc) in RETRYABLE_STATUS_CODES or is_throttled(exc):
+        return True
+    return RETRYABLE_RE.search(str(exc).upper()) is not None
+
+class TokenBucket:
+    """Paces requests to a sustained rate while allowing short bursts"""
+
+    def __init__(self, rate_per_minute, burst):
+        if rate_per_minute <= 0:
+            raise ValueError(f"The request rate must be greater than 0 per minute, not {rate_per_minute}")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by observed latency and rate-limit responses
+
+    Every fast success grows the limit by 1/limit (about +1 per round of
+    requests). A rate-limit response halves it; a response much slower than
+    the running average trims it by 10%.
+    """
+
+    def __init__(self, initial, minimum, maximum, latency_target=None):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.average_latency = None
+        self.in_flight = 0
+        self.peak = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        """Block until a concurrency slot is free"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def release(self, latency=None, throttled=False):
+        """Free a slot and adapt the limit to the outcome of the request"""
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif latency is not None:
+                target = self.latency_target
+                if target is None and self.average_latency is not None:
+                    target = self.average_latency * 3
+                if target is not None and latency > target:
+                    self.limit = max(self.minimum, self.limit * 0.9)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                if self.average_latency is None:
+                    self.average_latency = latency
+                else:
+                    self.average_latency = 0.8 * self.average_latency + 0.2 * latency
+            self.condition.notify_all()
+
+class RequestScheduler:
+    """Runs Gemini requests under a token bucket, an adaptive limiter and jittered retries"""
+
+    def __init__(self, rate_per_minute=60, burst=None, initial_concurrency=3, max_concurrency=16,
+                 max_retries=5, base_delay=1.0, max_delay=60.0, latency_target=None):
+        if initial_concurrency < 1 or max_concurrency < 1:
+            raise ValueError(
+                f"Concurrency must be at least 1, not {initial_concurrency} (initial) and {max_concurrency} (max)"
+            )
+        # Starting above the ceiling would let the first round exceed it
+        initial_concurrency = min(initial_concurrency, max_concurrency)
+        self.bucket = TokenBucket(rate_per_minute, burst or initial_concurrency)
+        self.limiter = AdaptiveLimiter(initial_concurrency, 1, max_concurrency, latency_target)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.stats = {
+            "requests": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "throttled": 0,
+            "latency": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls):
+        """Build a scheduler from GEMINI_* environment settings; raises ValueError for invalid ones"""
+        latency_target = os.getenv("GEMINI_LATENCY_TARGET")
+        rate_per_minute = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+        if rate_per_minute <= 0:
+            raise ValueError(f"GEMINI_REQUESTS_PER_MINUTE must be greater than 0, not {rate_per_minute:g}")
+        concurrency = {}
+        for name, default in (("GEMINI_INITIAL_CONCURRENCY", "3"), ("GEMINI_MAX_CONCURRENCY", "16")):
+            concurrency[name] = int(os.getenv(name, default))
+            if concurrency[name] < 1:
+                raise ValueError(f"{name} must be at least 1, not {concurrency[name]}")
+        return cls(
+            rate_per_minute=rate_per_minute,
+            initial_concurrency=concurrency["GEMINI_INITIAL_CONCURRENCY"],
+            max_concurrency=concurrency["GEMINI_MAX_CONCURRENCY"],
+            max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "5")),
+            latency_target=float(latency_target) if latency_target else None,
+        )
+
+    def _record(self, **increments):
+        with self.lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay for a retry attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn under the scheduler, retrying transient failures; re-raises the last error"""
+        attempt = 0
+        while True:
+            # Time spent held back by the rate and concurrency limits, apart from the request itself
+            with trace.span("llm.queue"):
+                self.bucket.acquire()
+                self.limiter.acquire()
+            start = time.monotonic()
+            try:
+                with trace.span("llm.request", attempt=attempt + 1):
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                latency = time.monotonic() - start
+                throttled = is_throttled(e)
+                self.limiter.release(throttled=throttled)
+                self._record(requests=1, latency=latency, throttled=int(throttled))
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self._record(failed=1)
+                    raise
+                attempt += 1
+                self._record(retries=1)
+                time.sleep(self.backoff(attempt))
+                continue
+
+            latency = time.monotonic() - start
+            self.limiter.release(latency=latency)
+            self._record(requests=1, succeeded=1, latency=latency)
+            return result
+
+    def summary(self):
+        """Throughput statistics for the run so far"""
+        with self.lock:
+            stats = dict(self.stats)
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        stats["elapsed"] = elapsed
+        stats["throughput"] = stats["succeeded"] / elapsed * 60
+        stats["average_latency"] = stats["latency"] / stats["requests"] if stats["requests"] else 0.0
+        stats["peak_concurrency"] = self.limiter.peak
+        stats["final_limit"] = self.limiter.limit
+        return stats
+
+    def report(self, print_fn=print):
+        """Print throughput statistics using the caller's output helper"""
+        stats = self.summary()
+        print_fn(
+            f"Gemini requests: {stats['requests']} sent, {stats['succeeded']} succeeded, "
+            f"{stats['failed']} failed, {stats['retries']} retried, {stats['throttled']} rate-limited"
+        )
+        print_fn(
+            f"Gemini throughput: {stats['throughput']:.1f} req/min over {stats['elapsed']:.1f}s, "
+            f"avg latency {stats['average_latency']:.2f}s, peak concurrency {stats['peak_concurrency']}, "
+            f"final limit {stats['final_limit']:.1f}"
+        )
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+SQL Chunker for DevDB
+Token-aware splitting of SQL scripts into per-object chunks for Gemini prompts
+"""
+
+import re
+
+from devdb_sql import find_objects, split_batches
+
+# Rough characters-per-token ratio for SQL; deliberately pessimistic
+CHARS_PER_TOKEN = 4
+
+# Comments at the top of a script, before any code
+_LEADING_COMMENT_RE = re.compile(r"\s*(?:--[^\n]*|/\*.*?\*/)", re.DOTALL)
+
+def estimate_tokens(text):
+    """Estimate the number of model tokens in text"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+class SqlChunk:
+    """Consecutive batches of a script, with the objects they create"""
+
+    def __init__(self, text="", objects=None):
+        self.text = text
+        self.objects = objects or []
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self.text)
+
+    @property
+    def names(self):
+        return [name if schema is None else f"{schema}.{name}" for _, schema, name in self.objects]
+
+def split_leading_comment(sql_content):
+    """Split a script into its leading comment block (the existing header) and the rest"""
+    pos = 0
+    while True:
+        match = _LEADING_COMMENT_RE.match(sql_content, pos)
+        if not match:
+            break
+        pos = match.end()
+    return sql_content[:pos].strip(), sql_content[pos:].lstrip()
+
+def object_chunks(sql_content):
+    """Split a script into one chunk per created object
+
+    Batches that create nothing (PRINT, USE, SET options) travel with the next
+    object so each chunk is self-contained; trailing ones join the last chunk.
+    Scripts without any objects yield one chunk per batch.
+    """
+    chunks = []
+    pending = ""
+    for batch, separator in split_batches(sql_content):
+        objects = find_objects(batch)
+        pending += batch + separator
+        if objects:
+            chunks.append(SqlChunk(pending, objects))
+            pending = ""
+
+    if not chunks:
+        return [SqlChunk(batch + separator) for batch, separator in split_batches(sql_content)]
+    if pending:
+        chunks[-1].text += pending
+    return chunks
+
+def pack_chunks(chunks, max_tokens):
+    """Merge consecutive chunks while they fit in max_tokens
+
+    A single object larger than the budget still gets a chunk of its own;
+    objects are never split, since half a procedure cannot be documented.
+    """
+    packed = []
+    for chunk in chunks:
+        if packed and packed[-1].tokens + chunk.tokens <= max_tokens:
+            packed[-1].text += chunk.text
+            packed[-1].objects.extend(chunk.objects)
+        else:
+            packed.append(SqlChunk(chunk.text, list(chunk.objects)))
+    return packed
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+SQL Formatting Engine for DevDB
+Formats SQL batch by batch with sqlparse, spreading the work across CPU cores
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import sqlparse
+
+from devdb_sql import split_batches
+
+# sqlparse options applied to every batch
+FORMAT_OPTIONS = {
+    "reindent": True,
+    "keyword_case": "upper",
+    "identifier_case": "lower",
+    "strip_comments": False,
+    "use_space_around_operators": True,
+    "indent_width": 4,
+    "wrap_after": 80,
+    "comma_first": False,
+}
+
+# Files above this size are split at GO boundaries and their batches formatted in parallel
+SPLIT_THRESHOLD = 256 * 1024
+
+def format_batch(batch):
+    """Format one batch, keeping its surrounding whitespace; returns the batch unchanged on failure"""
+    core = batch.strip()
+    if not core:
+        return batch
+    leading = batch[:len(batch) - len(batch.lstrip())]
+    trailing = batch[len(batch.rstrip()):]
+    try:
+        return leading + sqlparse.format(core, **FORMAT_OPTIONS) + trailing
+    except Exception:
+        return batch
+
+def format_script(sql_content):
+    """Format a whole script batch by batch in the current process"""
+    return "".join(format_batch(batch) + separator for batch, separator in split_batches(sql_content))
+
+class SqlFormatter:
+    """Formats SQL scripts in a process pool
+
+    Small scripts are formatted as a single task; large ones are split at GO
+    boundaries, the batches are fanned out across the pool and reassembled in
+    their original order with the original separators.
+    """
+
+    def __init__(self, workers=None, split_threshold=SPLIT_THRESHOLD):
+        self.workers = workers or os.cpu_count() or 1
+        self.split_threshold = split_threshold
+        self.pool = None
+
+    def _get_pool(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    def format(self, sql_content):
+        """Format a script and return the result"""
+        if self.workers == 1:
+            return format_script(sql_content)
+
+        if len(sql_content) < self.split_threshold:
+            return self._get_pool().submit(format_script, sql_content).result()
+
+        batches = split_batches(sql_content)
+        chunksize = max(1, len(batches) // (self.workers * 4))
+        formatted = self._get_pool().map(format_batch, [batch for batch, _ in batches], chunksize=chunksize)
+        return "".join(text + separator for text, (_, separator) in zip(formatted, batches))
+
+    def close(self):
+        """Shut down the worker processes"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
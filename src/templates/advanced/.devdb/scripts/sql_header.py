@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+SQL Header Generator for DevDB
+Builds the standardized header block of a SQL file from its SQL object index entry and its existing
+header: every field but the Description is derived locally, and the change history is carried over
+"""
+
+import re
+import textwrap
+
+from devdb_index import describe_parameter, object_name
+
+BORDER_TOP = "/" + "*" * 99
+BORDER_MIDDLE = "*" * 100
+BORDER_BOTTOM = "*" * 99 + "/"
+LABEL_WIDTH = 20
+DESCRIPTION_WIDTH = 80
+
+CHANGES_TITLE = "SUMMARY OF CHANGES"
+CHANGES_COLUMNS = "Date(yyyy-mm-dd)    Author              Comments"
+CHANGES_RULE = "-" * 19 + " " + "-" * 19 + " " + "-" * 60
+CHANGE_COMMENT = "Automated polish and formatting."
+
+# Header fields in output order; older headers may use the alternative labels
+FIELDS = ["Procedure", "Create Date", "Author", "Description", "Call by", "Affected table(s)", "Used By",
+          "Parameter(s)", "Usage"]
+_FIELD_ALIASES = {"created": "Create Date", "create date": "Create Date", "called by": "Call by"}
+_LABELS = {field.lower(): field for field in FIELDS}
+_LABELS.update(_FIELD_ALIASES)
+# Labels dropped on regeneration: the file name and modification date are implied
+_OBSOLETE_LABELS = {"file", "last modified", "modified"}
+
+_LABEL_RE = re.compile(r"^([A-Za-z][A-Za-z ()]*?):\s*(.*)$")
+_CHANGE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})\s+(.+?)(?:\s{2,}(.*))?$")
+_PARAMETER_NOTE_RE = re.compile(r"^(@[\w@#$]+)\b.*?\s-\s+(.*)$")
+_DECORATION_RE = re.compile(r"^[\s/*=\-]*$")
+
+class ExistingHeader:
+    """The fields and change history found in a file's leading comment"""
+
+    def __init__(self, text=""):
+        self.text = text
+        self.fields = {}
+        self.changes = []
+        self.recognised = False
+        block, rest = text, ""
+        if text.lstrip().startswith("/*") and "*/" in text:
+            end = text.index("*/") + 2
+            block, rest = text[:end], text[end:].strip()
+        self._parse(block)
+        # Comments that are not part of the header, kept below it on regeneration
+        self.trailing = rest if self.recognised else text
+
+    @staticmethod
+    def _lines(text):
+        """The header's lines without comment markers and borders"""
+        for line in text.splitlines():
+            line = re.sub(r"^\s*(?:--|/\*+|\*+/?)?", "", line)
+            line = re.sub(r"\*+/\s*$", "", line).rstrip()
+            yield line
+
+    def _parse(self, text):
+        field = None
+        in_changes = False
+        for line in self._lines(text):
+            stripped = line.strip()
+            if stripped.upper() == CHANGES_TITLE:
+                in_changes = True
+                field = None
+                self.recognised = True
+                continue
+            if in_changes:
+                if not stripped or stripped.startswith("Date(") or _DECORATION_RE.match(stripped):
+                    continue
+                match = _CHANGE_RE.match(stripped)
+                if match:
+                    self.changes.append((match.group(1), match.group(2).strip(), (match.group(3) or "").strip()))
+                elif self.changes:
+                    # A comment wrapped onto the next line
+                    date, author, comment = self.changes[-1]
+                    self.changes[-1] = (date, author, f"{comment} {stripped}".strip())
+                continue
+            if _DECORATION_RE.match(stripped):
+                field = None
+                continue
+            match = _LABEL_RE.match(stripped)
+            label = match.group(1).strip().lower() if match else None
+            if label in _LABELS:
+                field = _LABELS[label]
+                self.fields[field] = [match.group(2).strip()] if match.group(2).strip() else []
+                self.recognised = True
+            elif label in _OBSOLETE_LABELS:
+                field = None
+            elif field:
+                # Continuation of the field above
+                self.fields[field].append(stripped)
+
+    def field(self, name):
+        """A field's text, lines joined with newlines; empty when missing or still a placeholder"""
+        lines = [line for line in self.fields.get(name, []) if not (line.startswith("[") and line.endswith("]"))]
+        return "\n".join(lines).strip()
+
+    @property
+    def description(self):
+        return self.field("Description")
+
+    def parameter_notes(self):
+        """@name -> the description an existing Parameter(s) field gives it"""
+        notes = {}
+        for line in self.fields.get("Parameter(s)", []):
+            match = _PARAMETER_NOTE_RE.match(line)
+            if match:
+                notes[match.group(1).lower()] = match.group(2).strip()
+        return notes
+
+def header_objects(entry):
+    """The objects a header is about: everything the file creates but databases and schemas"""
+    if not entry:
+        return []
+    return [obj for obj in entry["objects"] if obj["kind"] not in ("DATABASE", "SCHEMA")]
+
+def _sql_name(obj):
+    """schema.name, bracketing parts that are not plain identifiers (tSQLt tests have spaces in theirs)"""
+    parts = [obj["name"]] if obj["schema"] is None else [obj["schema"], obj["name"]]
+    return ".".join(part if re.match(r"^[^\W\d][\w@#$]*$", part) else f"[{part.replace(']', ']]')}]" for part in parts)
+
+def _usage(obj):
+    """An example call of a procedure, function or view"""
+    arguments = ", ".join(parameter["name"] for parameter in obj.get("parameters", []))
+    name = _sql_name(obj)
+    if obj["kind"] == "PROCEDURE":
+        assignments = ", ".join(
+            f"{parameter['name']} = {parameter['name']}" + (" OUTPUT" if parameter["output"] else "")
+            for parameter in obj["parameters"]
+        )
+        return f"EXEC {name}{' ' + assignments if assignments else ''};"
+    if obj["kind"] == "FUNCTION":
+        returns = obj.get("returns", "").upper()
+        if returns == "TABLE" or returns.startswith("@"):
+            return f"SELECT * FROM {name}({arguments});"
+        return f"SELECT {name}({arguments});"
+    if obj["kind"] == "VIEW":
+        return f"SELECT * FROM {name};"
+    return None
+
+def local_description(entry, filename):
+    """A plain description from the index alone, for when Gemini is not asked"""
+    objects = header_objects(entry)
+    if not objects:
+        return f"Script {filename}."
+    sentences = ["Creates " + ", ".join(f"{obj['kind'].lower()} {object_name(obj)}" for obj in objects) + "."]
+    reads = sorted({name for obj in objects for name in obj["reads"]})
+    writes = sorted({name for obj in objects for name in obj["writes"]})
+    if reads:
+        sentences.append(f"Reads {', '.join(reads)}.")
+    if writes:
+        sentences.append(f"Modifies {', '.join(writes)}.")
+    return " ".join(sentences)
+
+def _field_lines(label, values):
+    """Format a field: the label padded to the value column, continuation lines indented under it"""
+    values = values or [""]
+    lines = [f"{label + ':':<{LABEL_WIDTH}}{values[0]}".rstrip()]
+    lines.extend((" " * LABEL_WIDTH + value).rstrip() for value in values[1:])
+    return lines
+
+def _wrap(text):
+    """Wrap a description; line breaks already in it are kept"""
+    lines = []
+    for paragraph in text.splitlines():
+        lines.extend(textwrap.wrap(paragraph, DESCRIPTION_WIDTH) or [""])
+    return lines
+
+def _change_line(date, author, comment):
+    return f"{date:<{LABEL_WIDTH}}{author.ljust(max(LABEL_WIDTH, len(author) + 2))}{comment}".rstrip()
+
+def build_header(entry, existing, author_name, today, description, filename):
+    """The standardized header for a file
+
+    Fields the index can answer (object, tables, parameters, usage) are
+    derived from entry; Create Date, Author, Call by and Used By, and the
+    change history, are kept from the existing header when it has them. A
+    change entry for today is added unless the last one already says so.
+    """
+    objects = header_objects(entry)
+    names = [object_name(obj) for obj in objects] or [re.sub(r"\.sql$", "", filename, flags=re.IGNORECASE)]
+
+    writes = []
+    for obj in objects:
+        writes.extend(name for name in obj["writes"] if name not in writes)
+
+    notes = existing.parameter_notes()
+    with_parameters = [obj for obj in objects if obj.get("parameters")]
+    parameters = []
+    for obj in with_parameters:
+        for parameter in obj["parameters"]:
+            line = describe_parameter(parameter)
+            if len(with_parameters) > 1:
+                line = f"{object_name(obj)}: {line}"
+            note = notes.get(parameter["name"].lower())
+            parameters.append(f"{line} - {note}" if note else line)
+
+    usage = [line for line in (_usage(obj) for obj in objects) if line]
+
+    lines = [BORDER_TOP]
+    lines += _field_lines("Procedure", names)
+    lines += _field_lines("Create Date", [existing.field("Create Date") or today])
+    lines += _field_lines("Author", [existing.field("Author") or author_name])
+    lines += _field_lines("Description", _wrap(description))
+    lines += _field_lines("Call by", existing.field("Call by").splitlines())
+    lines += _field_lines("Affected table(s)", [", ".join(writes) or "None"])
+    lines += _field_lines("Used By", existing.field("Used By").splitlines())
+    lines += _field_lines("Parameter(s)", parameters or ["None"])
+    lines += _field_lines("Usage", usage)
+    lines += [BORDER_MIDDLE, CHANGES_TITLE, CHANGES_COLUMNS, CHANGES_RULE]
+
+    changes = list(existing.changes)
+    if not changes or changes[-1] != (today, author_name, CHANGE_COMMENT):
+        changes.append((today, author_name, CHANGE_COMMENT))
+    lines += [_change_line(*change) for change in changes]
+    lines.append(BORDER_BOTTOM)
+
+    header = "\n".join(lines)
+    if existing.trailing:
+        # A leading comment in some other shape is kept below the header rather than lost
+        header += "\n" + existing.trailing
+    return header
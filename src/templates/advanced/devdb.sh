@@ -37,6 +37,11 @@ error() {
   exit 1
 }
 
+# The devdb CLI runs SQL over pooled connections instead of a docker exec per statement
+has_devdb_cli() {
+  command -v devdb &> /dev/null
+}
+
 # --- Command Functions ---
 
 # Print the help message
@@ -48,17 +53,36 @@ usage() {
   echo "Commands:"
   echo "  up           Start and provision the database services."
   echo "  down         Stop and remove the database services."
-  echo "  reset        Reset the entire environment (down then up)."
+  echo "  reset        Reset the environment: restore the baseline snapshot, or down then up."
   echo "  schema       Initialize/re-initialize database schemas."
   echo "  test [file]  Run a specific SQL test file from the ./tests directory."
   echo "  test all     Run all .sql tests in the ./tests directory."
   echo "  query \"<SQL>\" Execute an ad-hoc SQL query string."
+  echo "  verify       Check that every object in ./schemas exists (needs the devdb CLI)."
+  echo "  index        List the objects, parameters and tables in ./schemas (needs the devdb CLI)."
   echo "  status       Show the status of the running containers."
+  echo "  snapshot save|restore|list [name]"
+  echo "               Save or restore the databases in place (needs the devdb CLI)."
   echo "  polish [path] Format SQL files and standardize headers. Path can be file or directory."
+  echo "               Options: --format-only (sqlparse only, no Gemini), --local (headers without Gemini),"
+  echo "               --redescribe (new Gemini descriptions), --no-cache, --refresh"
   echo "  help         Show this help message."
   echo ""
 }
 
+print_connection_details() {
+  echo -e "--------------------------------------------------"
+  echo -e "  ${COLOR_YELLOW}SQL Server Connection Details:${COLOR_NC}"
+  echo -e "    Host:     localhost"
+  echo -e "    Port:     $(grep DB_PORT "$ENV_FILE" | cut -d '=' -f2)"
+  echo -e "    User:     sa"
+  echo -e "    Password: (from your .env file)"
+  echo ""
+  echo -e "  ${COLOR_YELLOW}Web GUI:${COLOR_NC}"
+  echo -e "    URL:      http://localhost:$(grep GUI_PORT "$ENV_FILE" | cut -d '=' -f2)"
+  echo -e "--------------------------------------------------"
+}
+
 # Start the database environment
 cmd_up() {
   info "Starting DevDB environment..."
@@ -69,8 +93,36 @@ cmd_up() {
       error "Docker daemon is not running. Please start Docker and try again."
   fi
 
+  # A container created by this run starts empty; once provisioned it becomes the reset baseline
+  local fresh_container=false
+  if [ -z "$(docker ps -aq --filter "name=^devdb-sqlserver$")" ]; then
+    fresh_container=true
+  fi
+
+  if [ "$fresh_container" == "true" ]; then
+    # An image from 'devdb image build' for the current schemas comes with everything deployed
+    if has_devdb_cli && DEVDB_IMAGE="$(devdb image resolve --project-dir "$SCRIPT_DIR")"; then
+      info "Using provisioned image: $DEVDB_IMAGE"
+      export DEVDB_IMAGE
+    fi
+  else
+    # Keep the image the existing container was created from, so compose does not recreate it
+    DEVDB_IMAGE="$(docker inspect --format '{{.Config.Image}}' devdb-sqlserver)"
+    export DEVDB_IMAGE
+  fi
+
   docker compose -f "$COMPOSE_FILE" --env-file "$ENV_FILE" up -d
 
+  if has_devdb_cli; then
+    # Returns the moment SQL Server accepts logins instead of waiting for the next health check
+    devdb wait --project-dir "$SCRIPT_DIR" || error "SQL Server did not become ready. Check logs with 'docker logs devdb-sqlserver'."
+    success "Database is up and running!"
+    print_connection_details
+    init_schemas
+    save_baseline "$fresh_container"
+    return 0
+  fi
+
   info "Waiting for SQL Server to be healthy... (this may take a minute on first run)"
   # shellcheck source=.devdb/.env
   source "$ENV_FILE"
@@ -82,41 +134,23 @@ cmd_up() {
     # If health check passes, we're good
     if [ "$HEALTH_STATUS" == "healthy" ]; then
       success "Database is up and running!"
-      echo -e "--------------------------------------------------"
-      echo -e "  ${COLOR_YELLOW}SQL Server Connection Details:${COLOR_NC}"
-      echo -e "    Host:     localhost"
-      echo -e "    Port:     $(grep DB_PORT "$ENV_FILE" | cut -d '=' -f2)"
-      echo -e "    User:     sa"
-      echo -e "    Password: (from your .env file)"
-      echo ""
-      echo -e "  ${COLOR_YELLOW}Web GUI:${COLOR_NC}"
-      echo -e "    URL:      http://localhost:$(grep GUI_PORT "$ENV_FILE" | cut -d '=' -f2)"
-      echo -e "--------------------------------------------------"
+      print_connection_details
       
       # Initialize schemas
       init_schemas
+      save_baseline "$fresh_container"
       exit 0
     fi
     
-    # If health check is failing but container is running, try direct connection
-    if [ "$HEALTH_STATUS" == "unhealthy" ] && [ "$i" -gt 20 ]; then
-      info "Health check failing, testing direct connection..."
+    # The health check only runs every few seconds; a direct login may succeed before it does
+    if [ "$HEALTH_STATUS" != "healthy" ]; then
       if docker exec devdb-sqlserver /opt/mssql-tools18/bin/sqlcmd -S localhost -U sa -P "${SA_PASSWORD}" -Q "SELECT 1" -C -l 5 >/dev/null 2>&1; then
         success "Database is responding to direct connection!"
-        echo -e "--------------------------------------------------"
-        echo -e "  ${COLOR_YELLOW}SQL Server Connection Details:${COLOR_NC}"
-        echo -e "    Host:     localhost"
-        echo -e "    Port:     $(grep DB_PORT "$ENV_FILE" | cut -d '=' -f2)"
-        echo -e "    User:     sa"
-        echo -e "    Password: (from your .env file)"
-        echo ""
-        echo -e "  ${COLOR_YELLOW}Web GUI:${COLOR_NC}"
-        echo -e "    URL:      http://localhost:$(grep GUI_PORT "$ENV_FILE" | cut -d '=' -f2)"
-        echo -e "--------------------------------------------------"
-        warn "Health check is failing but database is accessible"
+        print_connection_details
         
         # Initialize schemas
         init_schemas
+        save_baseline "$fresh_container"
         exit 0
       fi
     fi
@@ -135,6 +169,49 @@ cmd_down() {
   success "DevDB environment has been shut down."
 }
 
+# Snapshot a newly provisioned database so 'reset' can restore it instead of rebuilding
+save_baseline() {
+  if [ "$1" == "true" ] && has_devdb_cli; then
+    devdb snapshot save baseline --project-dir "$SCRIPT_DIR" || warn "Could not save the baseline snapshot; 'reset' will rebuild from scratch."
+  fi
+}
+
+# Reset to the baseline snapshot in place; rebuild when there is none or the schemas changed
+cmd_reset() {
+  info "Resetting environment..."
+  if has_devdb_cli && devdb snapshot restore baseline --if-current --project-dir "$SCRIPT_DIR"; then
+    success "Environment reset from the baseline snapshot."
+    return 0
+  fi
+  info "Rebuilding the environment..."
+  cmd_down
+  cmd_up
+}
+
+# Save, restore or list database snapshots
+cmd_snapshot() {
+  if ! has_devdb_cli; then
+    error "Snapshots need the devdb CLI. Install it with: pip install devdb-cli[db]"
+  fi
+  devdb snapshot "${@:-list}" --project-dir "$SCRIPT_DIR"
+}
+
+# Check every object in schemas/ exists
+cmd_verify() {
+  if ! has_devdb_cli; then
+    error "Verification needs the devdb CLI. Install it with: pip install devdb-cli[db]"
+  fi
+  devdb verify --project-dir "$SCRIPT_DIR" "$@"
+}
+
+# Index the objects in schemas/
+cmd_index() {
+  if ! has_devdb_cli; then
+    error "Indexing needs the devdb CLI. Install it with: pip install devdb-cli"
+  fi
+  devdb index --project-dir "$SCRIPT_DIR" "$@"
+}
+
 # Run tests
 cmd_test() {
   if [ -z "$1" ]; then
@@ -145,6 +222,17 @@ cmd_test() {
   # shellcheck source=.devdb/.env
   source "$ENV_FILE"
 
+  if has_devdb_cli; then
+    # Runs tSQLt classes in parallel, one database copy per worker, and writes a JUnit report
+    if [ "$1" == "all" ]; then
+      devdb test --project-dir "$SCRIPT_DIR" || error "Tests FAILED. Check output above for details."
+    else
+      devdb test "$SCRIPT_DIR/tests/$1" --project-dir "$SCRIPT_DIR" || error "Test FAILED: ./tests/$1. Check output above for details."
+    fi
+    success "All tests passed."
+    return 0
+  fi
+
   if [ "$1" == "all" ]; then
     info "Running all tests in ./tests directory..."
     for test_file in ./tests/**/*.sql ./tests/*.sql; do
@@ -178,6 +266,12 @@ init_schemas() {
   # shellcheck source=.devdb/.env
   source "$ENV_FILE"
   
+  if has_devdb_cli; then
+    # Deploys objects in dependency order over pooled connections; stops on the first failure
+    devdb schema --project-dir "$SCRIPT_DIR" || error "Schema initialization failed. Check output above for details."
+    return 0
+  fi
+  
   # Execute schema files in order
   for schema_file in ./schemas/*.sql; do
     if [ -f "$schema_file" ]; then
@@ -199,6 +293,10 @@ cmd_query() {
   fi
   # shellcheck source=.devdb/.env
   source "$ENV_FILE"
+  if has_devdb_cli; then
+    devdb query "$1" --project-dir "$SCRIPT_DIR"
+    return
+  fi
   info "Executing query..."
   docker exec devdb-sqlserver /opt/mssql-tools18/bin/sqlcmd -S localhost -U sa -P "${SA_PASSWORD}" -d master -Q "$1" -C
 }
@@ -219,16 +317,19 @@ check_api_key() {
 
 # Polish SQL files - format and standardize headers
 cmd_polish() {
-  check_api_key
+  # Formatting alone and locally built headers do not need Gemini
+  if [[ ! " $* " =~ " --format-only " && ! " $* " =~ " --local " ]]; then
+    check_api_key
+  fi
+  # Export everything in .env so optional settings (GEMINI_*, POLISH_CACHE_*)
+  # reach the script, not just the ones listed here
+  set -a
   # shellcheck source=.devdb/.env
   source "$ENV_FILE"
+  set +a
   
   info "Invoking the Code Polisher..."
-  env DEFAULT_SOURCE_DIR="$DEFAULT_SOURCE_DIR" \
-      POLISH_OUTPUT_DIR="$POLISH_OUTPUT_DIR" \
-      AUTHOR_NAME="$AUTHOR_NAME" \
-      GEMINI_API_KEY="$GEMINI_API_KEY" \
-      python3 ./.devdb/scripts/code_polisher.py "$1"
+  python3 ./.devdb/scripts/code_polisher.py "$@"
   success "Polish command complete."
 }
 
@@ -260,9 +361,7 @@ case "$1" in
     cmd_down
     ;;
   reset)
-    info "Resetting environment..."
-    cmd_down
-    cmd_up
+    cmd_reset
     ;;
   schema)
     init_schemas
@@ -273,11 +372,20 @@ case "$1" in
   query)
     cmd_query "$2"
     ;;
+  verify)
+    cmd_verify "${@:2}"
+    ;;
+  index)
+    cmd_index "${@:2}"
+    ;;
   status)
     docker compose -f "$COMPOSE_FILE" --env-file "$ENV_FILE" ps
     ;;
+  snapshot)
+    cmd_snapshot "${@:2}"
+    ;;
   polish)
-    cmd_polish "$2"
+    cmd_polish "${@:2}"
     ;;
   help|--help|-h|*)
     usage
@@ -7,6 +7,10 @@
 # 3. User script execution
 # 4. Test validation
 #
+# With the devdb CLI installed this runs 'devdb e2e' instead, which reuses a running
+# container, checks every deployed object with one catalog query and runs the smoke
+# script and the tests concurrently. Pass --cold for a clean environment first.
+#
 
 # --- Configuration ---
 set -e
@@ -206,6 +210,11 @@ cleanup_test_data() {
 
 # --- Main Execution ---
 main() {
+  if command -v devdb &>/dev/null; then
+    exec devdb e2e --project-dir "$SCRIPT_DIR" --expect-fail test_product_stock_fail.sql "$@"
+  fi
+  warn "devdb CLI not found; running the sequential shell stages (install devdb-cli for 'devdb e2e')"
+
   info "Starting E2E Test Suite for DevDB"
   info "=================================="
   
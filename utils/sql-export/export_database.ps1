@@ -63,7 +63,8 @@ function Export-SqlScript {
     
     Write-Host "🔄 Exporting $Description..." -ForegroundColor Yellow
     
-    $ScriptPath = Join-Path $PSScriptRoot $ScriptName
+    # The extraction scripts ship with the CLI package, which 'devdb export' runs them from
+    $ScriptPath = Join-Path $PSScriptRoot "..\..\src\sql_export\$ScriptName"
     $OutputFilePath = Join-Path $OutputPath $OutputFile
     
     try {
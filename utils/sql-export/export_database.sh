@@ -157,7 +157,8 @@ export_sql_script() {
     
     echo -e "${YELLOW}🔄 Exporting $description...${NC}"
     
-    local script_dir="$(dirname "$0")"
+    # The extraction scripts ship with the CLI package, which 'devdb export' runs them from
+    local script_dir="$(dirname "$0")/../../src/sql_export"
     local script_path="$script_dir/$script_name"
     local output_path="$OUTPUT_PATH/$output_file"
     